@@ -0,0 +1,128 @@
+"""Benchmark for the syntax highlighting engine.
+
+Builds a large source file by repeating the repository's own Python sources, then
+measures full-document highlighting in blocks/second for the RuleHighlighter and for
+the old one-QRegularExpression-per-rule approach, and how many blocks an edit makes
+the engine revisit.
+
+    python DEV/highlight_benchmark.py --lines 50000 --output highlight.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QPlainTextDocumentLayout
+from PyQt6.QtCore import QRegularExpression
+from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QTextDocument, QTextCursor, QColor
+from GUX.syntax_highlighter import RuleHighlighter, LANGUAGES
+
+class CountingHighlighter(RuleHighlighter):
+    def __init__(self, parent=None, language='python'):
+        super().__init__(parent, language)
+        self.blocks = 0
+
+    def highlightBlock(self, text):
+        self.blocks += 1
+        super().highlightBlock(text)
+
+class PerRuleHighlighter(QSyntaxHighlighter):
+    """The previous approach, for comparison: every rule is a separate pass with a
+    QRegularExpression built on each call."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        fmt = QTextCharFormat()
+        fmt.setForeground(QColor(0, 0, 255))
+        self.rules = [(rf"\b{word}\b", fmt) for word in ["def", "class", "import", "from", "return", "if", "else", "elif"]]
+        self.rules += [(r"#.*", fmt), (r'"[^"]*"', fmt), (r"'[^']*'", fmt)]
+
+    def highlightBlock(self, text):
+        for pattern, fmt in self.rules:
+            iterator = QRegularExpression(pattern).globalMatch(text)
+            while iterator.hasNext():
+                match = iterator.next()
+                self.setFormat(match.capturedStart(), match.capturedLength(), fmt)
+
+def corpus(lines):
+    root = Path(__file__).resolve().parent.parent
+    sources = []
+    for folder in ('GUX', 'HMC', 'NITTY_GRITTY'):
+        for path in sorted((root / folder).glob('*.py')):
+            sources.extend(path.read_text(encoding='utf-8', errors='replace').splitlines())
+    repeated = (sources * (lines // max(len(sources), 1) + 1))[:lines]
+    return '\n'.join(repeated)
+
+def full_pass(document, highlighter_class):
+    highlighter = highlighter_class(None)
+    highlighter.setDocument(document)  # only schedules a highlight
+    start = time.perf_counter()
+    highlighter.rehighlight()
+    elapsed = time.perf_counter() - start
+    highlighter.setDocument(None)
+    return elapsed
+
+def edit_cost(document, highlighter, position, text, undo=True):
+    """Blocks re-highlighted and seconds taken by inserting `text` at `position`."""
+    highlighter.blocks = 0
+    cursor = QTextCursor(document)
+    cursor.setPosition(position)
+    start = time.perf_counter()
+    cursor.insertText(text)
+    elapsed = time.perf_counter() - start
+    report = {'blocks': highlighter.blocks, 's': round(elapsed, 6)}
+    if undo:
+        document.undo()
+    return report
+
+def run_benchmark(args):
+    app = QApplication.instance() or QApplication([])
+    text = corpus(args.lines)
+    document = QTextDocument()
+    # The layout QPlainTextEdit uses; without one the document reports no edits to the highlighter
+    document.setDocumentLayout(QPlainTextDocumentLayout(document))
+    document.setPlainText(text)
+    blocks = document.blockCount()
+
+    report = {'platform': platform.platform(), 'python': platform.python_version(),
+              'lines': blocks, 'bytes': len(text.encode('utf-8')), 'languages': sorted(LANGUAGES)}
+    rule_times = [full_pass(document, RuleHighlighter) for _ in range(args.repeat)]
+    report['full'] = {'s': round(min(rule_times), 4), 'blocks_per_s': round(blocks / min(rule_times))}
+    if not args.skip_baseline:
+        baseline_times = [full_pass(document, PerRuleHighlighter) for _ in range(args.repeat)]
+        report['per_rule_baseline'] = {'s': round(min(baseline_times), 4),
+                                       'blocks_per_s': round(blocks / min(baseline_times))}
+
+    highlighter = CountingHighlighter(document)
+    app.processEvents()  # runs the initial highlight; edits are ignored while it is pending
+    middle = document.findBlockByNumber(blocks // 2).position()
+    report['edits'] = {
+        'keystroke': edit_cost(document, highlighter, middle, 'x'),
+        'new_line': edit_cost(document, highlighter, middle, '\n'),
+        # Opening a triple-quoted string runs to the next one; nothing beyond it is revisited
+        'open_string': edit_cost(document, highlighter, middle, '"""'),
+    }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark syntax highlighting.")
+    parser.add_argument('--lines', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-baseline', action='store_true', help="don't time the per-rule highlighter")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    text = json.dumps(run_benchmark(args), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""Benchmark for vault indexing and search.
+
+Generates a reproducible synthetic vault, then times the index build, an incremental
+update, and filename / fuzzy / content / regex queries, and writes the results to JSON.
+
+    python DEV/search_benchmark.py --files 20000 --output bench.json
+    python DEV/search_benchmark.py --files 20000 --baseline bench.json   # regression gate
+
+With --baseline, every timing is compared against the earlier run and the exit
+status is 1 if any got slower than --tolerance times the baseline.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import struct
+import logging
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import psutil
+from HMC.vault_manager import Vault
+from NITTY_GRITTY.content_search import SearchCache, search_names
+from NITTY_GRITTY.fuzzy_finder import PathTable, fuzzy_find
+from NITTY_GRITTY.index_extractors import extractor_fingerprint, shutdown_pool
+from NITTY_GRITTY.vault_indexer import MTIME_SLACK, schema_fingerprint
+from NITTY_GRITTY.vault_watcher import VaultWatcher
+
+TEXT_EXTENSIONS = ['.md', '.md', '.md', '.txt', '.py', '.js', '.rs']
+BINARY_EXTENSIONS = ['.png', '.wav', '.txt']  # a .txt with NUL bytes exercises binary sniffing
+VOCABULARY_SIZE = 20000
+
+# --- corpus --------------------------------------------------------------------
+
+def make_vocabulary(rng):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+def zipf_weights(count):
+    """Cumulative weights for rng.choices: word frequencies in real text roughly follow 1/rank."""
+    total = 0.0
+    cumulative = []
+    for rank in range(1, count + 1):
+        total += 1.0 / rank
+        cumulative.append(total)
+    return cumulative
+
+def text_body(rng, words, weights, size, ext):
+    lines = []
+    length = 0
+    while length < size:
+        line = ' '.join(rng.choices(words, cum_weights=weights, k=rng.randint(4, 14)))
+        if ext == '.py' and rng.random() < 0.1:
+            line = f"def {rng.choice(words)}_{rng.choice(words)}(self, {rng.choice(words)}):"
+        elif ext == '.md' and rng.random() < 0.05:
+            line = f"## {line}\n[[{rng.choice(words)}]]"
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines)
+
+def binary_body(rng, size, ext):
+    payload = rng.randbytes(max(size, 64))
+    if ext == '.png':
+        return b'\x89PNG\r\n\x1a\n' + struct.pack('>I4sII', 13, b'IHDR', 640, 480) + payload
+    if ext == '.wav':
+        return b'RIFF' + struct.pack('<I', len(payload) + 36) + b'WAVE' + payload
+    return b'\0' + payload
+
+def generate_corpus(root, args):
+    """Writes args.files files under `root` and returns the text vocabulary used."""
+    rng = random.Random(args.seed)
+    words = make_vocabulary(rng)
+    weights = zipf_weights(len(words))
+    dirs = ['']
+    for i in range(max(1, args.files // args.files_per_dir)):
+        parent = rng.choice(dirs) if len(dirs) < 2 or rng.random() < 0.7 else ''
+        if parent.count('/') >= args.max_depth:
+            parent = ''
+        dirs.append(f"{parent}{rng.choice(words)}_{i}/")
+    for i in range(args.files):
+        rel_dir = rng.choice(dirs)
+        os.makedirs(os.path.join(root, rel_dir), exist_ok=True)
+        size = min(int(rng.lognormvariate(args.size_mu, args.size_sigma)), args.max_size)
+        if rng.random() < args.binary_ratio:
+            ext = rng.choice(BINARY_EXTENSIONS)
+            with open(os.path.join(root, f"{rel_dir}{rng.choice(words)}_{i}{ext}"), 'wb') as f:
+                f.write(binary_body(rng, size, ext))
+        else:
+            ext = rng.choice(TEXT_EXTENSIONS)
+            with open(os.path.join(root, f"{rel_dir}{rng.choice(words)}_{i}{ext}"), 'w', encoding='utf-8') as f:
+                f.write(text_body(rng, words, weights, size, ext))
+    return words
+
+def backdate_corpus(root, age=3600):
+    """Moves every mtime in the corpus `age` seconds into the past. Freshly written
+    directories are within MTIME_SLACK of the build and would be relisted on every
+    incremental run, hiding what an update of an older vault really costs."""
+    assert age > MTIME_SLACK
+    stamp = time.time() - age
+    for dirpath, _, filenames in os.walk(root, topdown=False):
+        for name in filenames:
+            os.utime(os.path.join(dirpath, name), (stamp, stamp))
+        os.utime(dirpath, (stamp, stamp))
+
+def mutate_corpus(root, args, words):
+    """Edits, adds and deletes a fraction of the files, like a burst of real work.
+    Returns the relative paths touched, as the watcher would be told about them."""
+    rng = random.Random(args.seed + 1)
+    files = sorted(str(path) for path in Path(root).rglob('*') if path.is_file() and not path.name.startswith('.vault'))
+    count = max(1, int(len(files) * args.churn))
+    changed = set()
+    for path in rng.sample(files, count):
+        if path.endswith(('.md', '.py')):
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('\n' + ' '.join(rng.choices(words, k=12)))
+            changed.add(path)
+    for path in rng.sample(files, count // 4):
+        if os.path.exists(path):
+            os.remove(path)
+            changed.add(path)
+    for i in range(count // 4):
+        path = os.path.join(root, f"added_{i}.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(' '.join(rng.choices(words, k=200)))
+        changed.add(path)
+    return {os.path.relpath(path, root) for path in changed}
+
+# --- measuring -------------------------------------------------------------------
+
+def rss_mb():
+    return round(psutil.Process().memory_info().rss / 2**20, 1)
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000, 3)
+    return {'p50_ms': pick(0.5), 'p90_ms': pick(0.9), 'p99_ms': pick(0.99), 'max_ms': pick(1.0),
+            'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3), 'runs': len(ordered)}
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+def query_latencies(queries, run, repeat):
+    samples = []
+    hits = 0
+    for _ in range(repeat):
+        for query in queries:
+            elapsed, result = timed(lambda: run(query))
+            samples.append(elapsed)
+            hits += len(result)
+    stats = percentiles(samples)
+    stats['mean_hits'] = round(hits / len(samples), 1)
+    return stats
+
+def make_queries(rng, words, paths, count):
+    common = words[:50]
+    medium = words[500:5000]
+    rare = words[-5000:]
+    literal = ([rng.choice(common) for _ in range(count // 3)] + [rng.choice(medium) for _ in range(count // 3)]
+               + [rng.choice(rare) for _ in range(count // 3)] + ['zzqqxxnotthere'])
+    regex = []
+    for _ in range(count):
+        a, b = rng.choice(medium), rng.choice(common)
+        regex.append(rng.choice([fr'\b{a}\s+{b}\b', fr'def {a[:3]}\w*\(', fr'{a[:4]}[a-z]{{2,}}', fr'(?:{a}|{b})\d*']))
+    fuzzy = []
+    for path in rng.sample(paths, min(count, len(paths))):
+        # An in-order pick of a few path characters, as someone would type it
+        picks = sorted(rng.sample(range(len(path)), min(len(path), rng.randint(3, 6))))
+        fuzzy.append(''.join(path[i] for i in picks))
+    names = [word[:3] for word in rng.sample(medium, count)]
+    return {'literal': literal, 'regex': regex, 'fuzzy': fuzzy, 'names': names}
+
+def run_benchmark(args):
+    logging.basicConfig(level=logging.ERROR)
+    root = args.vault or tempfile.mkdtemp(prefix='vault_bench_')
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'cpus': os.cpu_count()},
+    }
+    try:
+        elapsed, words = timed(lambda: generate_corpus(root, args))
+        backdate_corpus(root)
+        size = sum(path.stat().st_size for path in Path(root).rglob('*') if path.is_file())
+        report['corpus'] = {'generate_s': round(elapsed, 3), 'bytes': size, 'path': root}
+        memory = {'start_rss_mb': rss_mb()}
+
+        vault = Vault('benchmark', root, None)
+        index_db = vault.open_index()
+        index_db.apply_extractors(extractor_fingerprint())
+        index_db.apply_file_types(schema_fingerprint(vault.indexer.file_types))
+        scan_s, _ = timed(lambda: vault.update_index_python(full=True))
+        extract_s, _ = timed(vault.update_metadata)
+        report['build'] = {'scan_s': round(scan_s, 3), 'extract_s': round(extract_s, 3),
+                           'total_s': round(scan_s + extract_s, 3), 'files': index_db.count_files(),
+                           'index_bytes': os.path.getsize(vault.index_db_file)}
+        memory['after_build_rss_mb'] = rss_mb()
+
+        # The edits reach the index the way the vault watcher delivers them: the changed
+        # paths plus a structural (directory-mtime) scan for the adds and deletes
+        changed = mutate_corpus(root, args, words)
+        watcher = VaultWatcher(vault)
+
+        def apply_changes():
+            with vault.index_lock:
+                watcher._flush_locked(changed, structural=True)
+        scan_s, _ = timed(apply_changes)
+        extract_s, _ = timed(vault.update_metadata)
+        report['incremental'] = {'changed_files': len(changed), 'scan_s': round(scan_s, 3),
+                                 'extract_s': round(extract_s, 3), 'total_s': round(scan_s + extract_s, 3)}
+
+        table_s, table = timed(lambda: PathTable.from_index(index_db))
+        memory['after_path_table_rss_mb'] = rss_mb()
+        queries = make_queries(random.Random(args.seed + 2), words, index_db.all_paths(), args.queries)
+
+        def uncached(run):
+            def wrapper(query):
+                vault.search_cache = SearchCache()
+                return run(query)
+            return wrapper
+
+        report['queries'] = {
+            'path_table_build': {'s': round(table_s, 3), 'paths': len(table)},
+            'filename': query_latencies(queries['names'], uncached(lambda q: search_names(vault, q)), args.repeat),
+            'fuzzy': query_latencies(queries['fuzzy'], lambda q: fuzzy_find(table, q), args.repeat),
+            'content': query_latencies(queries['literal'], uncached(vault.search_content), args.repeat),
+            'regex': query_latencies(queries['regex'], uncached(lambda q: vault.search_content(q, regex=True)),
+                                     args.repeat),
+        }
+        vault.search_cache = SearchCache(size=len(queries['literal']))
+        for query in queries['literal']:
+            vault.search_content(query)
+        report['queries']['content_cached'] = query_latencies(queries['literal'], vault.search_content, args.repeat)
+        memory['end_rss_mb'] = rss_mb()
+        memory['peak_rss_mb'] = max(memory.values())  # of the samples above
+        report['memory'] = memory
+    finally:
+        shutdown_pool()
+        if not args.keep and not args.vault:
+            shutil.rmtree(root, ignore_errors=True)
+    return report
+
+# --- regression gate -------------------------------------------------------------
+
+def timings(report, prefix=''):
+    """Flattens every *_s / *_ms figure of a report into {'section.key': seconds}."""
+    found = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            found.update(timings(value, f"{name}."))
+        elif key.endswith('_s') or key == 's':
+            found[name] = value
+        elif key.endswith('_ms'):
+            found[name] = value / 1000
+    return found
+
+def compare(report, baseline, tolerance, floor=0.005):
+    """Timings slower than `tolerance` x baseline; ones under `floor` seconds are noise."""
+    before = timings({k: baseline.get(k, {}) for k in ('build', 'incremental', 'queries')})
+    after = timings({k: report.get(k, {}) for k in ('build', 'incremental', 'queries')})
+    regressions = []
+    for name, old in sorted(before.items()):
+        new = after.get(name)
+        if new is not None and new > max(old, floor) * tolerance:
+            regressions.append({'metric': name, 'baseline': old, 'current': new,
+                                'ratio': round(new / old, 2) if old else None})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vault indexing and search.")
+    parser.add_argument('--files', type=int, default=5000)
+    parser.add_argument('--files-per-dir', type=int, default=40)
+    parser.add_argument('--max-depth', type=int, default=6)
+    parser.add_argument('--binary-ratio', type=float, default=0.1)
+    parser.add_argument('--size-mu', type=float, default=8.5, help="log-normal mu of file sizes (e^8.5 ~ 5KB)")
+    parser.add_argument('--size-sigma', type=float, default=1.2)
+    parser.add_argument('--max-size', type=int, default=4 * 2**20)
+    parser.add_argument('--churn', type=float, default=0.02, help="fraction of files changed for the incremental run")
+    parser.add_argument('--queries', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--vault', help="generate the corpus here instead of a temporary directory")
+    parser.add_argument('--keep', action='store_true', help="keep the generated corpus")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--baseline', help="earlier JSON report to compare against")
+    parser.add_argument('--tolerance', type=float, default=1.25)
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            report['regressions'] = compare(report, json.load(f), args.tolerance)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    if report.get('regressions'):
+        for regression in report['regressions']:
+            print(f"REGRESSION {regression['metric']}: {regression['baseline']:.4f}s -> "
+                  f"{regression['current']:.4f}s", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Check for merging text into a restored tab that was never looked at.
+
+Restores a few tabs as TabStubs, then runs what AIChatWidget.apply_code_changes does
+on the second one (pin, read, write back the merge, unpin) and checks the tab became
+a modified editor holding the merged text. A file big enough for a LargeFileView must
+be refused instead. Exits 1 on any failure.
+
+    python DEV/stub_merge_check.py
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QTabWidget
+from GUX.tab_stub import TabStub
+from HMC.editor_manager import EditorManager
+from NITTY_GRITTY.large_file import LARGE_FILE_THRESHOLD
+
+class Settings:
+    def __init__(self, app_data_dir):
+        self.values = {'app_data_dir': app_data_dir}
+
+    def get_value(self, key, default=None):
+        return self.values.get(key, default)
+
+class Lexers:
+    def apply_lexer(self, file_extension, editor):
+        pass
+
+class Core:
+    """The parts of the application core EditorManager reaches for."""
+    def __init__(self, app_data_dir):
+        self.settings_manager = Settings(app_data_dir)
+        self.lexer_manager = Lexers()
+
+class Window:
+    """Just enough of an editor window: a tab widget and the calls EditorManager makes."""
+    def __init__(self):
+        self.tab_widget = QTabWidget()
+
+    def add_new_tab(self, widget, title):
+        return self.tab_widget.addTab(widget, title)
+
+    def set_tab_title(self, index, title):
+        self.tab_widget.setTabText(index, title)
+
+    def set_current_editor(self, editor):
+        self.tab_widget.setCurrentWidget(editor)
+
+    def get_current_tab(self):
+        return self.tab_widget.currentWidget()
+
+def apply_merge(manager, path, merge):
+    """AIChatWidget.apply_code_changes without the dialog; the merge result, or None if refused."""
+    pinned = manager.pin_editor(path) is not None
+    try:
+        current = manager.get_file_content(path)
+        if current is None:
+            return None
+        merged = merge(current)
+        return merged if manager.update_file_content(path, merged) else None
+    finally:
+        if pinned:
+            manager.unpin_editor(path)
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for name in ('first.py', 'second.py', 'third.py'):
+            paths.append(os.path.join(directory, name))
+            with open(paths[-1], 'w', encoding='utf-8') as file:
+                file.write(f"# {name}\nvalue = 1\n")
+        large = os.path.join(directory, 'large.log')
+        with open(large, 'wb') as file:
+            file.truncate(LARGE_FILE_THRESHOLD + 1)
+
+        manager = EditorManager(Core(directory))
+        manager.add_window(Window())
+        manager.restore_tabs(paths + [large])
+        if not isinstance(manager.registry.get(paths[1]), TabStub):
+            failures.append("second tab was not restored as a stub")
+
+        merged = apply_merge(manager, paths[1], lambda text: text.replace('value = 1', 'value = 2'))
+        editor = manager.registry.get(paths[1])
+        if merged is None or isinstance(editor, TabStub):
+            failures.append("merge into the stubbed tab was refused")
+        elif editor.text() != merged or not editor.isModified():
+            failures.append(f"stubbed tab holds {editor.text()!r}, modified={editor.isModified()}")
+        elif manager.registry.record(editor).refs:
+            failures.append("merge left the editor pinned")
+
+        if apply_merge(manager, large, lambda text: text) is not None:
+            failures.append("merge into a large file view was not refused")
+        manager.swap_journal.shutdown()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("ok" if not failures else f"{len(failures)} failure(s)")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
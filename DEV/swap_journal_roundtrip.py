@@ -0,0 +1,102 @@
+"""Round-trip check for the swap journal.
+
+Edits a real QsciScintilla and a QPlainTextEdit the way EditorManager and
+CodeEditorWidget journal them, replays each journal as crash recovery would, and
+checks the result against the editor's text. Exits 1 on any mismatch.
+
+    python DEV/swap_journal_roundtrip.py
+"""
+import os
+import sys
+import random
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtWidgets import QApplication, QPlainTextEdit
+from PyQt6.QtGui import QTextCursor
+from NITTY_GRITTY.swap_journal import SwapJournal, journal_file, journal_scintilla_edit, replay_journal
+
+BASE_TEXT = "line one\nline two ü€\n" + "".join(f"row {i} 😀\n" for i in range(200))
+INSERTS = ["x", "YZ", "ü€", "😀", "\n", "tail 😀\n", "  "]
+
+def finish(journal, path):
+    journal.flush()
+    journal.writer.commands.put(None)
+    journal.writer.wait()
+    return replay_journal(journal_file(journal.swap_dir, path))[1]
+
+def check_scintilla(directory, rng):
+    from PyQt6.Qsci import QsciScintilla
+    path = os.path.join(directory, 'scintilla.txt')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(BASE_TEXT)
+    journal = SwapJournal(os.path.join(directory, 'swap-scintilla'))
+    editor = QsciScintilla()
+    editor.setText(BASE_TEXT)
+    editor.SCN_MODIFIED.connect(lambda position, modification_type, text, length, *args:
+                                journal_scintilla_edit(journal, editor, path, position, modification_type, text, length))
+    for _ in range(300):
+        size = editor.length()
+        if rng.random() < 0.7:
+            # Typing runs as well as scattered inserts; positions stay on character boundaries
+            line = rng.randrange(editor.lines())
+            editor.insertAt(rng.choice(INSERTS), line, rng.randrange(len(editor.text(line)) + 1) if rng.random() < 0.3 else 0)
+        elif size:
+            line = rng.randrange(editor.lines())
+            editor.setSelection(line, 0, line, min(len(editor.text(line)), rng.randrange(1, 4)))
+            editor.removeSelectedText()
+    return finish(journal, path), editor.text()
+
+def check_text_document(directory, rng):
+    path = os.path.join(directory, 'document.txt')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(BASE_TEXT)
+    journal = SwapJournal(os.path.join(directory, 'swap-document'))
+    edit = QPlainTextEdit()
+    edit.setPlainText(BASE_TEXT)
+    document = edit.document()
+
+    def on_change(position, removed, added):
+        if not journal.is_journaling(path):
+            journal.begin(path, 'utf16', edit.toPlainText)
+            return
+        cursor = QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(min(position + added, document.characterCount() - 1), QTextCursor.MoveMode.KeepAnchor)
+        journal.record(path, position, removed, cursor.selectedText().replace('\u2029', '\n'))
+    document.contentsChange.connect(on_change)
+
+    cursor = QTextCursor(document)
+    for _ in range(300):
+        block = document.findBlockByNumber(rng.randrange(document.blockCount()))
+        cursor.setPosition(block.position())
+        if rng.random() < 0.7:
+            cursor.insertText(rng.choice(INSERTS))
+        else:
+            cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock, QTextCursor.MoveMode.KeepAnchor)
+            cursor.removeSelectedText()
+    return finish(journal, path), edit.toPlainText()
+
+def main():
+    app = QApplication.instance() or QApplication([])
+    rng = random.Random(47)
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        checks = [('QTextDocument', check_text_document)]
+        try:
+            import PyQt6.Qsci  # noqa: F401
+            checks.insert(0, ('QScintilla', check_scintilla))
+        except ImportError:
+            print("QScintilla: skipped, PyQt6.Qsci is not installed")
+        for name, check in checks:
+            replayed, expected = check(directory, rng)
+            ok = replayed == expected
+            failures += not ok
+            print(f"{name}: {'ok' if ok else 'MISMATCH'} ({len(expected)} characters)")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,22 @@
 from PyQt6.QtWidgets import QWidget, QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QInputDialog, QListWidget, QListWidgetItem, QHBoxLayout, QFormLayout, QDialogButtonBox, QMessageBox 
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QThreadPool
 from PyQt6.QtWidgets import QMenu
 from PyQt6.QtGui import QAction
 import os
 import subprocess
+import time
 from NITTY_GRITTY.database import DatabaseManager, UserAction
+from NITTY_GRITTY.ThreadTrackers import SafeQRunnable
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+COMPACT_INTERVAL_MS = 10 * 60 * 1000  # Roll up usage events every 10 minutes
+TREND_DAYS = 14
+
+def sparkline(counts):
+    peak = max(counts) if counts else 0
+    if not peak:
+        return SPARK_CHARS[0] * len(counts)
+    return "".join(SPARK_CHARS[round(c / peak * (len(SPARK_CHARS) - 1))] for c in counts)
 
 class ActionPadWidget(QWidget):
     def __init__(self, db_manager, parent=None):
@@ -29,11 +41,24 @@ class ActionPadWidget(QWidget):
         self.layout.addWidget(self.flash_label)
         self.flash_label.hide()  # Hide it initially
 
+        # Usage events are rolled up in the background so the list only reads aggregates
+        self.compact_timer = QTimer(self)
+        self.compact_timer.timeout.connect(self.compact_usage)
+        self.compact_timer.start(COMPACT_INTERVAL_MS)
+        self.compact_usage()
+
         self.populate_action_list()
 
+    def compact_usage(self):
+        QThreadPool.globalInstance().start(SafeQRunnable(self.db_manager.compact_action_usage))
+
     def populate_action_list(self):
         self.action_list.clear()  # Clear the existing items
+        self.weekly_usage = dict(self.db_manager.get_most_used_actions(days=7, limit=None))
+        self.trends = self.db_manager.get_action_trends(days=TREND_DAYS)
         actions = self.db_manager.get_all_actions()
+        # Most used this week first
+        actions.sort(key=lambda action: self.weekly_usage.get(action.action_name, 0), reverse=True)
         for action in actions:
             self.add_action_to_list(action)
 
@@ -45,8 +70,11 @@ class ActionPadWidget(QWidget):
         button = QPushButton(action.action_name)
         button.clicked.connect(lambda _, name=action.action_name: self.execute_action(name))
 
-        count_label = QLabel(f"Count: {action.pressed_count or 0}")
+        weekly_count = getattr(self, 'weekly_usage', {}).get(action.action_name, 0)
+        count_label = QLabel(f"Week: {weekly_count}")
         count_label.setAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        trend = getattr(self, 'trends', {}).get(action.action_name, [0] * TREND_DAYS)
+        count_label.setToolTip(f"Last {TREND_DAYS} days: {sparkline(trend)}\nTotal: {action.pressed_count or 0}")
 
         # Create the hamburger menu button
         menu_button = QPushButton("☰")
@@ -95,7 +123,10 @@ class ActionPadWidget(QWidget):
             self.add_action_to_list(new_action)
 
     def execute_action(self, action_name):
-        """Executes a user action based on its name."""
+        """Executes a user action based on its name and records the run as a usage event."""
+        started_at = time.time()
+        start = time.perf_counter()
+        exit_status = 1
         try:
             # Open a new session
             db = next(self.db_manager.get_db())
@@ -105,8 +136,9 @@ class ActionPadWidget(QWidget):
 
             if action:
                 print(f"Executing action: {action.command}")  # Replace with actual command execution
+                exit_status = 0
 
-                # Increment the pressed_count for the action
+                # pressed_count is kept as the lifetime total; usage stats come from the event log
                 action.pressed_count = (action.pressed_count or 0) + 1
                 db.commit()
             else:
@@ -119,6 +151,7 @@ class ActionPadWidget(QWidget):
             # Ensure the session is closed
             if 'db' in locals():
                 db.close()
+            self.db_manager.record_action_event(action_name, started_at, time.perf_counter() - start, exit_status)
 
     def show_flash_message(self, message):
         """Displays a flash message for a brief period."""
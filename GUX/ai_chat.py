@@ -474,16 +474,24 @@ class AIChatWidget(QWidget):
             QMessageBox.warning(self, "No File Specified", "No file path specified for this code block.")
             return
 
-        current_content = self.editor_manager.get_file_content(file_path)
-        if current_content is None:
-            QMessageBox.warning(self, "File Not Found", f"The file {file_path} could not be found or opened.")
-            return
+        # The merge writes back into the open editor, so its buffer must not be released meanwhile
+        pinned = self.editor_manager.pin_editor(file_path) is not None
+        try:
+            current_content = self.editor_manager.get_file_content(file_path)
+            if current_content is None:
+                QMessageBox.warning(self, "File Not Found", f"The file {file_path} could not be found or opened.")
+                return
 
-        diff_merger = DiffMergerDialog(self.editor_manager, current_content, suggested_code, file_path)
-        if diff_merger.exec() == QDialog.DialogCode.Accepted:
-            merged_content = diff_merger.get_merged_content()
-            self.editor_manager.update_file_content(file_path, merged_content)
-            QMessageBox.information(self, "Changes Applied", f"Changes have been applied to {file_path}")
+            diff_merger = DiffMergerDialog(self.editor_manager, current_content, suggested_code, file_path)
+            if diff_merger.exec() == QDialog.DialogCode.Accepted:
+                merged_content = diff_merger.get_merged_content()
+                if not self.editor_manager.update_file_content(file_path, merged_content):
+                    QMessageBox.warning(self, "Read-Only File", f"{file_path} is open read-only and was not changed.")
+                    return
+                QMessageBox.information(self, "Changes Applied", f"Changes have been applied to {file_path}")
+        finally:
+            if pinned:
+                self.editor_manager.unpin_editor(file_path)
 
     def update_file_content(self, new_content):
         self.current_file_content = new_content
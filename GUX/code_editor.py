@@ -2,41 +2,23 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTabWidget, QTextEdit, QFileD
                              QMessageBox, QInputDialog, QApplication, QWidget, QPlainTextEdit, QTreeWidget, QTreeWidgetItem, QListView, QTextEdit, QHBoxLayout
 )
 from PyQt6.QtCore import QTimer, Qt, QSize, QRegularExpression, QEvent, QSize, QRect, pyqtSignal, QThreadPool, QThread
-from NITTY_GRITTY.text_workers import LineComparisonWorker
-from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QBrush, QColor, QMouseEvent, QFont, QPainter, QTextCursor, QTextFormat
+from GUX.syntax_highlighter import RuleHighlighter, highlighter_for_path
+from NITTY_GRITTY.file_saver import get_save_pipeline
+from NITTY_GRITTY.swap_journal import get_swap_journal
+from NITTY_GRITTY.text_workers import LineComparisonService, OutlineWorker, BOUNDARY_PATTERN, parse_outline
+from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QBrush, QColor, QMouseEvent, QFont, QPainter, QTextCursor, QTextFormat, QStaticText
+from collections import OrderedDict
 import os
 import sys
 import logging
-import time
-class PythonHighlighter(QSyntaxHighlighter):
+
+OUTLINE_DELAY_MS = 300  # typing pause before the outline is reparsed
+GUTTER_PADDING = 3  # pixels right of the line numbers
+NUMBER_CACHE_SIZE = 512  # laid-out line numbers kept for reuse; a few screens' worth
+
+class PythonHighlighter(RuleHighlighter):
     def __init__(self, parent=None):
-        super().__init__(parent)
-        self.highlighting_rules = []
-
-        # Define formats
-        self.keyword_format = QTextCharFormat()
-        self.keyword_format.setForeground(QBrush(QColor(0, 0, 255)))
-        keywords = ["def", "class", "import", "from", "return", "if", "else", "elif"]
-        for keyword in keywords:
-            pattern = rf"\b{keyword}\b"
-            self.highlighting_rules.append((pattern, self.keyword_format))
-
-        self.comment_format = QTextCharFormat()
-        self.comment_format.setForeground(QBrush(QColor(0, 128, 0)))
-        self.highlighting_rules.append((r"#.*", self.comment_format))
-
-        self.string_format = QTextCharFormat()
-        self.string_format.setForeground(QBrush(QColor(255, 0, 0)))
-        self.highlighting_rules.append((r'"[^"]*"', self.string_format))
-        self.highlighting_rules.append((r"'[^']*'", self.string_format))
-
-    def highlightBlock(self, text):
-        for pattern, fmt in self.highlighting_rules:
-            expression = QRegularExpression(pattern)
-            iterator = expression.globalMatch(text)
-            while iterator.hasNext():
-                match = iterator.next()
-                self.setFormat(match.capturedStart(), match.capturedLength(), fmt)
+        super().__init__(parent, 'python')
 
 class CodeEditorWidget(QWidget):
     def __init__(self, parent=None, cccore=None):
@@ -52,6 +34,11 @@ class CodeEditorWidget(QWidget):
         self.tab_widget.currentChanged.connect(self.check_for_unsaved_changes)
         self.layout.addWidget(self.tab_widget)
         self.setAcceptDrops(True)
+        self.saving = {}  # path -> (editor, text snapshot) for saves in flight
+        self.save_pipeline = get_save_pipeline()
+        self.save_pipeline.saved.connect(self.on_file_saved)
+        self.save_pipeline.failed.connect(self.on_save_failed)
+        self.swap_journal = get_swap_journal(cccore.settings_manager.get_value("app_data_dir") if cccore else None)
         self.auto_save_timer = QTimer(self)
         self.auto_save_timer.timeout.connect(self.auto_save)
         self.auto_save_timer.start(300000)  # Auto-save every 5 minutes
@@ -90,13 +77,46 @@ class CodeEditorWidget(QWidget):
         with open(file_path, 'r') as file:
             content = file.read()
         editor = self.tab_widget.currentWidget()
-        editor.setPlainText(content)
+        if editor.property("file_path"):
+            self.swap_journal.end(editor.property("file_path"))  # its buffer is being replaced
+        editor.setProperty("file_path", None)  # loading the file is not an edit to journal
+        editor.text_edit.setPlainText(content)
         editor.setProperty("file_path", file_path)
         self.tab_widget.setTabText(self.tab_widget.currentIndex(), os.path.basename(file_path))
+        self.offer_recovery(editor, file_path)
 
         # Apply syntax highlighting based on file extension
-        if file_path.endswith('.py'):
-            self.apply_syntax_highlighter(editor)
+        self.apply_syntax_highlighter(editor, file_path)
+
+    def offer_recovery(self, editor, file_path):
+        """Offers the unsaved changes a crashed session left in the swap journal."""
+        recovered = self.swap_journal.recover(file_path)
+        if recovered is None:
+            return
+        reply = QMessageBox.question(self, "Recover Unsaved Changes?",
+                                     f"{os.path.basename(file_path)} has unsaved changes from a session that did not "
+                                     "close cleanly. Recover them?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            self.swap_journal.end(file_path)
+            return
+        editor.text_edit.setPlainText(recovered)  # starts a fresh journal from the recovered text
+        editor.text_edit.document().setModified(True)
+
+    def journal_edit(self, editor, position, removed, added):
+        """Records an edit in the buffer's swap journal; positions are QTextDocument's UTF-16 units."""
+        file_path = editor.property("file_path")
+        if not file_path:
+            return
+        document = editor.text_edit.document()
+        if not self.swap_journal.is_journaling(file_path):
+            if os.path.isfile(file_path):
+                self.swap_journal.begin(file_path, 'utf16', editor.text_edit.toPlainText)  # holds this edit already
+            return
+        cursor = QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(min(position + added, document.characterCount() - 1), QTextCursor.MoveMode.KeepAnchor)
+        self.swap_journal.record(file_path, position, removed, cursor.selectedText().replace('\u2029', '\n'))
 
     def paste_text(self, text):
         cursor = self.tab_widget.currentWidget().textCursor()
@@ -106,6 +126,8 @@ class CodeEditorWidget(QWidget):
         new_tab = CompEditor()  # Use CompEditor instead of QTextEdit
         new_tab.text_edit.setPlainText(content)
         new_tab.text_edit.textChanged.connect(lambda: self.prompt_file_name(new_tab))
+        new_tab.text_edit.document().contentsChange.connect(
+            lambda position, removed, added: self.journal_edit(new_tab, position, removed, added))
         new_tab.setProperty("file_path", None)
         self.tab_widget.addTab(new_tab, title)
 
@@ -119,6 +141,9 @@ class CodeEditorWidget(QWidget):
             elif reply == QMessageBox.StandardButton.Cancel:
                 return
         self.tab_widget.removeTab(index)
+        file_path = editor.property("file_path")
+        if file_path and not self.save_pipeline.is_pending(file_path):
+            self.swap_journal.end(file_path)  # saved or discarded
 
     def check_for_unsaved_changes(self):
         current_editor = self.tab_widget.currentWidget()
@@ -133,16 +158,38 @@ class CodeEditorWidget(QWidget):
                 return
             editor.setProperty("file_path", file_path)
         
-        with open(file_path, 'w') as f:
-            f.write(editor.text_edit.toPlainText())
-        editor.text_edit.document().setModified(False)
-        self.tab_widget.setTabText(self.tab_widget.indexOf(editor), os.path.basename(file_path))
+        self.save_snapshots({file_path: editor})
 
     def auto_save(self):
-        for i in range(self.tab_widget.count()):
-            editor = self.tab_widget.widget(i)
-            if editor.text_edit.document().isModified():
-                self.save_file(editor)
+        # One background batch for every dirty tab; untitled ones would need a dialog
+        self.save_snapshots({editor.property("file_path"): editor
+                             for editor in map(self.tab_widget.widget, range(self.tab_widget.count()))
+                             if editor.text_edit.document().isModified() and editor.property("file_path")})
+
+    def save_snapshots(self, editors):
+        """Queues the current text of each {path: editor} for an atomic background write."""
+        if not editors:
+            return
+        snapshots = {path: editor.text_edit.toPlainText() for path, editor in editors.items()}
+        for path, editor in editors.items():
+            self.saving[path] = (editor, snapshots[path])
+        self.save_pipeline.save_batch(snapshots)
+
+    def on_file_saved(self, path, written):
+        editor, text = self.saving.pop(path, (None, None))
+        if editor is None:
+            return
+        # Not edited again while saving; the document revision also moves on re-highlighting
+        if editor.text_edit.toPlainText() == text:
+            editor.text_edit.document().setModified(False)
+            self.swap_journal.end(path)
+        index = self.tab_widget.indexOf(editor)
+        if index != -1:
+            self.tab_widget.setTabText(index, os.path.basename(path))
+
+    def on_save_failed(self, path, message):
+        if self.saving.pop(path, None):
+            QMessageBox.warning(self, "Save Failed", f"Could not save {path}: {message}")
 
     def prompt_file_name(self, editor):
         if not editor.property("file_path") and editor.text_edit.toPlainText():
@@ -151,8 +198,9 @@ class CodeEditorWidget(QWidget):
                 editor.setProperty("file_path", file_path)
                 self.save_file(editor)
 
-    def apply_syntax_highlighter(self, editor):
-        highlighter = PythonHighlighter(editor.document())
+    def apply_syntax_highlighter(self, editor, file_path=None):
+        document = getattr(editor, 'text_edit', editor).document()
+        highlighter = highlighter_for_path(document, file_path) if file_path else PythonHighlighter(document)
         editor.setProperty("highlighter", highlighter)
 
     def eventFilter(self, obj, event):
@@ -210,6 +258,10 @@ class CompEditor(QWidget):
         
         self.text_edit = QPlainTextEdit()
         self.text_edit.setFont(QFont("Courier", 10))
+        self.gutter_widths = {}  # digit count -> pixel width of that many digits
+        self.number_texts = OrderedDict()  # line number -> laid-out QStaticText, least recently drawn first
+        self.gutter_width = None
+        self.line_number_area.setFont(self.text_edit.font())
         self.text_edit.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
         hbox.addWidget(self.text_edit)
         
@@ -220,12 +272,17 @@ class CompEditor(QWidget):
         self.text_edit.blockCountChanged.connect(self.update_line_number_area_width)
         self.text_edit.updateRequest.connect(self.update_line_number_area)
         self.text_edit.cursorPositionChanged.connect(self.highlight_current_line)
-        self.text_edit.textChanged.connect(self.update_file_outline)
+        self.text_edit.document().contentsChange.connect(self.on_contents_change)
+        self.file_outline_widget.line_selected.connect(self.go_to_line)
         
         self.update_line_number_area_width(0)
 
         self.other_file_lines = []
         self.comparison_results = []
+        self.comparison_selections = []
+        self.comparison_service = LineComparisonService(self)
+        self.comparison_service.result.connect(self.on_comparison_finished)
+        self.text_edit.textChanged.connect(self.start_comparison)
 
         self.ui_update_timer = QTimer()
         self.ui_update_timer.setSingleShot(True)
@@ -237,16 +294,48 @@ class CompEditor(QWidget):
         self.start_line = 0
         self.end_line = 0
 
-        self.last_update_time = 0
-        self.update_interval = 100  # milliseconds
+        # The outline is reparsed in the thread pool, and only after edits that can change it
+        self.outline_generation = 0
+        self.outline_boundaries = set()  # lines of the last parse where an edit can change the outline
+        self.outline_block_count = 0
+        self.outline_timer = QTimer(self)
+        self.outline_timer.setSingleShot(True)
+        self.outline_timer.setInterval(OUTLINE_DELAY_MS)
+        self.outline_timer.timeout.connect(self.update_file_outline)
+
+    def on_contents_change(self, position, removed, added):
+        document = self.text_edit.document()
+        block = document.findBlock(position)
+        text = block.text()
+        indent = len(text) - len(text.lstrip())
+        # An edit inside one line's body leaves every definition and line number as it was
+        if (document.findBlock(position + added) != block or document.blockCount() != self.outline_block_count
+                or block.blockNumber() + 1 in self.outline_boundaries
+                or position - block.position() <= indent or BOUNDARY_PATTERN.search(text)):
+            self.outline_timer.start()
 
     def update_file_outline(self):
-        text = self.text_edit.toPlainText()
-        self.file_outline_widget.populate_file_outline(text)
+        self.outline_generation += 1
+        self.outline_block_count = self.text_edit.document().blockCount()
+        worker = OutlineWorker(self.text_edit.toPlainText(), self.outline_generation)
+        worker.signals.result.connect(self.on_outline_parsed)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_outline_parsed(self, result):
+        generation, outline, boundaries = result
+        if generation != self.outline_generation:
+            return  # the text has changed since; a newer parse is on its way
+        self.outline_boundaries = boundaries
+        self.file_outline_widget.update_outline(outline)
+
+    def go_to_line(self, line):
+        cursor = QTextCursor(self.text_edit.document().findBlockByNumber(line - 1))
+        self.text_edit.setTextCursor(cursor)
+        self.text_edit.setFocus()
 
     def highlight_current_line(self):
-        self.start_comparison()
-        extra_selections = []
+        # Moving the cursor changes nothing to compare; the last comparison is reused
+        extra_selections = list(self.comparison_selections)
         if not self.text_edit.isReadOnly():
             selection = QTextEdit.ExtraSelection()
             line_color = QColor(Qt.GlobalColor.yellow).lighter(160)
@@ -257,24 +346,21 @@ class CompEditor(QWidget):
             extra_selections.append(selection)
         self.text_edit.setExtraSelections(extra_selections)
 
+    def set_other_file_lines(self, lines):
+        self.other_file_lines = list(lines)
+        self.start_comparison()
+
     def start_comparison(self):
-        # Create the worker
-        worker = LineComparisonWorker(self.text_edit.toPlainText(), self.other_file_lines)
-        worker.signals.result.connect(self.on_comparison_finished)
-        
-       
-        
-        # Submit the worker to the thread pool
-        QThreadPool.globalInstance().start(worker)  
+        if not self.other_file_lines and not self.comparison_results:
+            return  # nothing to compare against, and no old highlights to clear
+        self.comparison_service.request(self.text_edit.toPlainText(), self.other_file_lines)
 
     def on_comparison_finished(self, result):
         self.comparison_results = result
         self.update_highlights()
-        self.update_line_indicators(result)
 
     def update_highlights(self):
-        cursor = QTextCursor(self.text_edit.document())
-        extra_selections = self.text_edit.extraSelections()
+        extra_selections = []
         for i, status in self.comparison_results:
             cursor = QTextCursor(self.text_edit.document().findBlockByNumber(i))
             selection = QTextEdit.ExtraSelection()
@@ -293,9 +379,11 @@ class CompEditor(QWidget):
             selection = QTextEdit.ExtraSelection()
             selection.cursor = cursor
             selection.format.setBackground(color)
+            selection.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
             extra_selections.append(selection)
 
-        self.text_edit.setExtraSelections(extra_selections)
+        self.comparison_selections = extra_selections
+        self.highlight_current_line()
 
     def update_line_indicators(self, diff_data):
         self.text_edit.setExtraSelections([])
@@ -346,33 +434,30 @@ class CompEditor(QWidget):
 
         return selection
 
+    def digits_width(self, digits):
+        width = self.gutter_widths.get(digits)
+        if width is None:
+            width = self.gutter_widths[digits] = self.line_number_area.fontMetrics().horizontalAdvance('9' * digits)
+        return width
+
     def line_number_area_width(self):
-        digits = 1
-        max_num = max(1, self.text_edit.blockCount())
-        while max_num >= 10:
-            max_num //= 10
-            digits += 1
-        space = 3 + self.fontMetrics().horizontalAdvance('9') * digits
-        return space
+        return GUTTER_PADDING + self.digits_width(len(str(max(1, self.text_edit.blockCount()))))
 
     def update_line_number_area_width(self, _):
-        self.text_edit.setViewportMargins(self.line_number_area_width(), 0, 0, 0)
+        width = self.line_number_area_width()
+        if width != self.gutter_width:  # only when the digit count changes
+            self.gutter_width = width
+            self.text_edit.setViewportMargins(width, 0, 0, 0)
+            self.line_number_area.updateGeometry()
 
     def update_line_number_area(self, rect, dy):
-        current_time = time.time() * 1000  # Convert to milliseconds
-        if current_time - self.last_update_time < self.update_interval:
-            return
-        
-        self.last_update_time = current_time
-
+        # Every request is honoured: scrolling moves the painted pixels and only the newly
+        # exposed strip is repainted, and repeated requests merge into one paint per frame
         if dy:
             self.line_number_area.scroll(0, dy)
         else:
             self.line_number_area.update(0, rect.y(), self.line_number_area.width(), rect.height())
 
-        if rect.contains(self.text_edit.viewport().rect()):
-            self.update_line_number_area_width(0)
-
     def resizeEvent(self, event):
         super().resizeEvent(event)
         cr = self.text_edit.contentsRect()
@@ -382,21 +467,36 @@ class CompEditor(QWidget):
         text = self.text_edit.toPlainText()
         return text.splitlines(keepends=True)  # Keeps newline characters
 
+    def number_text(self, number):
+        """The laid-out text for line `number`, reused while it stays on screen."""
+        text = self.number_texts.get(number)
+        if text is None:
+            text = QStaticText(str(number))
+            text.prepare(font=self.line_number_area.font())
+            self.number_texts[number] = text
+            if len(self.number_texts) > NUMBER_CACHE_SIZE:
+                self.number_texts.popitem(last=False)
+        else:
+            self.number_texts.move_to_end(number)
+        return text
+
     def lineNumberAreaPaintEvent(self, event):
+        dirty = event.rect()
         painter = QPainter(self.line_number_area)
-        painter.fillRect(event.rect(), Qt.GlobalColor.lightGray)
+        painter.fillRect(dirty, Qt.GlobalColor.lightGray)
+        painter.setPen(Qt.GlobalColor.black)
+        right = self.line_number_area.width() - GUTTER_PADDING
 
         block = self.text_edit.firstVisibleBlock()
         block_number = block.blockNumber()
         top = round(self.text_edit.blockBoundingGeometry(block).translated(self.text_edit.contentOffset()).top())
         bottom = top + round(self.text_edit.blockBoundingRect(block).height())
 
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1)
-                painter.setPen(Qt.GlobalColor.black)
-                painter.drawText(0, top, self.line_number_area.width(), self.fontMetrics().height(),
-                                 Qt.AlignmentFlag.AlignRight, number)
+        # Only the lines crossing the dirty rect, which after a scroll is just the exposed strip
+        while block.isValid() and top <= dirty.bottom():
+            if block.isVisible() and bottom >= dirty.top():
+                text = self.number_text(block_number + 1)
+                painter.drawStaticText(right - round(text.size().width()), top, text)
 
             block = block.next()
             top = bottom
@@ -415,6 +515,8 @@ class LineNumberArea(QWidget):
     def __init__(self, editor):
         super().__init__(editor)
         self.editor = editor
+        # Paints every pixel of its dirty rect, so scrolling can move pixels instead of repainting
+        self.setAttribute(Qt.WidgetAttribute.WA_OpaquePaintEvent)
 
     def sizeHint(self):
         return QSize(self.editor.line_number_area_width(), 0)
@@ -422,18 +524,62 @@ class LineNumberArea(QWidget):
     def paintEvent(self, event):
         self.editor.lineNumberAreaPaintEvent(event)
 
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.FontChange:
+            # Cached widths and layouts are for the old font
+            self.editor.gutter_widths.clear()
+            self.editor.number_texts.clear()
+            self.editor.update_line_number_area_width(0)
+        super().changeEvent(event)
+
 class FileOutlineWidget(QTreeWidget):  # Correcting the widget type to QTreeWidget
+    LineRole = Qt.ItemDataRole.UserRole
+    KeyRole = Qt.ItemDataRole.UserRole + 1
+    line_selected = pyqtSignal(int)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setHeaderHidden(True)  # Hide the header to make it look like an outline
+        self.itemActivated.connect(lambda item, _: self.line_selected.emit(item.data(0, self.LineRole)))
 
     def populate_file_outline(self, text):
-        self.clear()
-        lines = text.splitlines()
-        for i, line in enumerate(lines):
-            if line.strip().startswith('class ') or line.strip().startswith('def '):
-                item = QTreeWidgetItem([f"{i + 1}: {line.strip()}"])
-                self.addTopLevelItem(item)
+        self.update_outline(parse_outline(text))
+
+    def update_outline(self, nodes):
+        """Brings the tree in line with `nodes` from parse_outline(), reusing the items of
+        definitions that are still there so selection, expansion and scrolling survive."""
+        self.setUpdatesEnabled(False)
+        try:
+            self.sync_children(self.invisibleRootItem(), nodes)
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def sync_children(self, parent, nodes):
+        existing = {}
+        for row in range(parent.childCount()):
+            child = parent.child(row)
+            existing.setdefault(child.data(0, self.KeyRole), []).append(child)
+        for row, node in enumerate(nodes):
+            key = f"{node['kind']} {node['name']}"
+            reusable = existing.get(key)
+            item = reusable.pop(0) if reusable else None
+            if item is None:
+                item = QTreeWidgetItem()
+                item.setData(0, self.KeyRole, key)
+                parent.insertChild(row, item)
+            elif parent.child(row) is not item:
+                expanded = item.isExpanded()
+                parent.insertChild(row, parent.takeChild(parent.indexOfChild(item)))
+                item.setExpanded(expanded)
+            text = f"{node['line']}: {node['text']}"
+            if item.text(0) != text:
+                item.setText(0, text)
+            if item.data(0, self.LineRole) != node['line']:
+                item.setData(0, self.LineRole, node['line'])
+            self.sync_children(item, node['children'])
+        # Children that were not reused have been pushed past the new ones
+        while parent.childCount() > len(nodes):
+            parent.removeChild(parent.child(len(nodes)))
 
 if __name__ == "__main__":
     from PyQt6.QtWidgets import QApplication
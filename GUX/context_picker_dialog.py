@@ -155,7 +155,7 @@ class ContextPickerDialog(QDialog):
     def get_context_content(self, context_type, context_name, preview=False):
         try:
             if context_type == "Open Files":
-                return self.editor_manager.get_editor_by_path(context_name).text()
+                return self.editor_manager.get_file_content(context_name)
             elif context_type == "Recent Files":
                 with open(context_name, 'r', encoding='utf-8') as file:
                     return file.read()
@@ -0,0 +1,103 @@
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTreeWidget, QTreeWidgetItem
+from PyQt6.QtCore import Qt, pyqtSignal
+from NITTY_GRITTY.duplicate_finder import DuplicateScanThread
+import logging
+
+class DuplicatesWidget(QWidget):
+    """Lists files with identical content across all vaults, biggest savings first."""
+    file_selected = pyqtSignal(str)
+
+    def __init__(self, vault_manager, parent=None):
+        super().__init__(parent)
+        self.vault_manager = vault_manager
+        self.scan_thread = None
+        self.setup_ui()
+        self.show_groups(self.vault_manager.get_known_duplicates())
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        button_layout = QHBoxLayout()
+        self.scan_button = QPushButton("Scan Vaults")
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        button_layout.addWidget(self.scan_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+
+        self.status_label = QLabel("Showing duplicates from the last scan")
+        layout.addWidget(self.status_label)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["File", "Vault", "Size"])
+        layout.addWidget(self.tree)
+
+        self.scan_button.clicked.connect(self.start_scan)
+        self.cancel_button.clicked.connect(self.cancel_scan)
+        self.tree.itemDoubleClicked.connect(self.open_item)
+
+    def start_scan(self):
+        if self.scan_thread and self.scan_thread.isRunning():
+            return
+        self.scan_thread = DuplicateScanThread(self.vault_manager.duplicate_finder)
+        self.scan_thread.progress.connect(self.on_progress)
+        self.scan_thread.found.connect(self.on_found)
+        self.scan_thread.failed.connect(self.on_failed)
+        self.scan_thread.finished.connect(self.on_scan_finished)
+        self.scan_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+        self.status_label.setText("Scanning...")
+        self.scan_thread.start()
+
+    def cancel_scan(self):
+        if self.scan_thread:
+            self.scan_thread.cancel()
+            self.status_label.setText("Cancelling...")
+
+    def on_progress(self, stage, done, total):
+        label = "Comparing file heads/tails" if stage == 'partial' else "Hashing candidates"
+        self.status_label.setText(f"{label}: {done}/{total}")
+
+    def on_found(self, groups):
+        self.show_groups(groups)
+
+    def on_failed(self, message):
+        self.status_label.setText(f"Scan failed: {message}")
+
+    def on_scan_finished(self):
+        self.scan_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        if self.status_label.text() == "Cancelling...":
+            self.status_label.setText("Scan cancelled")
+        self.scan_thread.deleteLater()
+        self.scan_thread = None
+
+    def show_groups(self, groups):
+        self.tree.clear()
+        wasted = 0
+        for group in groups:
+            wasted += group['wasted']
+            first = group['files'][0]
+            parent = QTreeWidgetItem([f"{len(group['files'])} copies of {first['path']}", "",
+                                      self.format_size(group['size'])])
+            parent.setToolTip(0, f"Wasted: {self.format_size(group['wasted'])}")
+            for member in group['files']:
+                child = QTreeWidgetItem([member['path'], member['vault'], ""])
+                child.setData(0, Qt.ItemDataRole.UserRole, member['abs_path'])
+                child.setToolTip(0, member['abs_path'])
+                parent.addChild(child)
+            self.tree.addTopLevelItem(parent)
+        self.status_label.setText(f"{len(groups)} duplicate groups, {self.format_size(wasted)} reclaimable")
+        logging.info(f"Showing {len(groups)} duplicate groups")
+
+    def open_item(self, item, column):
+        abs_path = item.data(0, Qt.ItemDataRole.UserRole)
+        if abs_path:
+            self.file_selected.emit(abs_path)
+
+    def format_size(self, size_bytes):
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size_bytes < 1024.0:
+                return f"{size_bytes:.2f} {unit}"
+            size_bytes /= 1024.0
+        return f"{size_bytes:.2f} PB"
@@ -1,6 +1,46 @@
 import os
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QListWidget, QLabel
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QListView, QLabel, QCheckBox
+from PyQt6.QtCore import Qt, pyqtSignal, QAbstractListModel, QModelIndex, QTimer
+from NITTY_GRITTY.content_search import VaultSearchThread
+
+SEARCH_DELAY_MS = 250  # typing pause before a search starts
+
+class SearchResultsModel(QAbstractListModel):
+    """Search hits appended in batches as the search thread streams them in."""
+    PathRole = Qt.ItemDataRole.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hits = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.hits)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        hit = self.hits[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if hit['kind'] == 'filename':
+                return f"[Filename] {hit['path']}"
+            return f"[Content] {hit['path']}:{hit['line']}"
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return hit['preview'] or hit['path']
+        if role == self.PathRole:
+            return hit['path']
+        return None
+
+    def append(self, hits):
+        if not hits:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.hits), len(self.hits) + len(hits) - 1)
+        self.hits.extend(hits)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.hits = []
+        self.endResetModel()
 
 class FileSearchWidget(QWidget):
     file_selected = pyqtSignal(str)
@@ -8,6 +48,12 @@ class FileSearchWidget(QWidget):
     def __init__(self, vault_manager, parent=None):
         super().__init__(parent)
         self.vault_manager = vault_manager
+        self.search_thread = None
+        self.generation = 0
+        self.retired_threads = set()  # cancelled searches still winding down
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DELAY_MS)
         self.setup_ui()
 
     def setup_ui(self):
@@ -21,54 +67,92 @@ class FileSearchWidget(QWidget):
         search_layout.addWidget(self.search_button)
         layout.addLayout(search_layout)
 
+        options_layout = QHBoxLayout()
+        self.regex_checkbox = QCheckBox("Regex")
+        self.case_checkbox = QCheckBox("Match case")
+        self.globs_input = QLineEdit()
+        self.globs_input.setPlaceholderText("Files, e.g. *.py, docs/**, !tests/*")
+        options_layout.addWidget(self.regex_checkbox)
+        options_layout.addWidget(self.case_checkbox)
+        options_layout.addWidget(self.globs_input)
+        layout.addLayout(options_layout)
+
         self.results_label = QLabel("Results:")
         layout.addWidget(self.results_label)
 
-        self.results_list = QListWidget()
+        self.results_model = SearchResultsModel(self)
+        self.results_list = QListView()
+        self.results_list.setModel(self.results_model)
+        self.results_list.setUniformItemSizes(True)
         layout.addWidget(self.results_list)
 
         self.search_button.clicked.connect(self.perform_search)
         self.search_input.returnPressed.connect(self.perform_search)
-        self.results_list.itemDoubleClicked.connect(self.open_selected_file)
+        self.search_input.textChanged.connect(self.schedule_search)
+        self.globs_input.textChanged.connect(self.schedule_search)
+        self.globs_input.returnPressed.connect(self.perform_search)
+        self.regex_checkbox.toggled.connect(self.schedule_search)
+        self.case_checkbox.toggled.connect(self.schedule_search)
+        self.search_timer.timeout.connect(self.perform_search)
+        self.results_list.doubleClicked.connect(self.open_selected_file)
+
+    def schedule_search(self):
+        self.cancel_search()
+        self.search_timer.start()
 
     def perform_search(self):
-        query = self.search_input.text().lower()
-        if not query:
+        self.search_timer.stop()
+        self.cancel_search()
+        self.results_model.clear()
+        query = self.search_input.text()
+        globs = self.globs_input.text().replace(',', ' ').split()
+        vault = self.vault_manager.get_current_vault()
+        if not (query or globs) or not vault:
+            self.results_label.setText("Results:")
             return
 
-        self.results_list.clear()
-        vault_path = self.vault_manager.get_current_vault_path()
-
-        # First, search for filename matches
-        filename_matches = []
-        for root, _, files in os.walk(vault_path):
-            for file in files:
-                if query in file.lower():
-                    filename_matches.append(os.path.join(root, file))
-
-        # Then, search for in-text matches
-        in_text_matches = []
-        for root, _, files in os.walk(vault_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if file_path not in filename_matches:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                            if query in content.lower():
-                                in_text_matches.append(file_path)
-                    except Exception as e:
-                        print(f"Error reading file {file_path}: {e}")
-
-        # Add results to the list widget
-        for match in filename_matches:
-            self.results_list.addItem(f"[Filename] {os.path.relpath(match, vault_path)}")
-        for match in in_text_matches:
-            self.results_list.addItem(f"[Content] {os.path.relpath(match, vault_path)}")
-
-        self.results_label.setText(f"Results: {len(filename_matches) + len(in_text_matches)}")
-
-    def open_selected_file(self, item):
-        file_path = item.text().split('] ', 1)[1]
+        self.generation += 1
+        self.search_thread = VaultSearchThread(vault, query, self.generation, regex=self.regex_checkbox.isChecked(),
+                                               case_sensitive=self.case_checkbox.isChecked(), globs=globs)
+        self.search_thread.found.connect(self.on_results)
+        self.search_thread.failed.connect(self.on_failed)
+        self.search_thread.finished.connect(self.on_search_finished)
+        self.results_label.setText("Searching...")
+        self.search_thread.start()
+
+    def cancel_search(self):
+        if self.search_thread:
+            self.search_thread.cancel()
+            self.retired_threads.add(self.search_thread)
+            self.search_thread = None
+
+    def on_results(self, generation, hits):
+        if generation != self.generation:
+            return  # a batch from a search that has since been replaced
+        self.results_model.append(hits)
+        self.results_label.setText(f"Results: {self.results_model.rowCount()} (searching...)")
+
+    def on_failed(self, generation, message):
+        if generation == self.generation and self.search_thread:
+            self.retired_threads.add(self.search_thread)
+            self.search_thread = None  # keep the message instead of a result count
+            self.results_label.setText(f"Search failed: {message}")
+
+    def on_search_finished(self):
+        thread = self.sender()
+        if thread is self.search_thread:
+            self.search_thread = None
+            self.results_label.setText(f"Results: {self.results_model.rowCount()}")
+        self.retired_threads.discard(thread)
+        thread.deleteLater()
+
+    def open_selected_file(self, index):
+        file_path = index.data(SearchResultsModel.PathRole)
         full_path = os.path.join(self.vault_manager.get_current_vault_path(), file_path)
-        self.file_selected.emit(full_path)
\ No newline at end of file
+        self.file_selected.emit(full_path)
+
+    def closeEvent(self, event):
+        self.cancel_search()
+        for thread in list(self.retired_threads):
+            thread.wait()
+        super().closeEvent(event)
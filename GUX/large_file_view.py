@@ -0,0 +1,244 @@
+import os
+import logging
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QCheckBox, QLabel,
+                             QAbstractScrollArea)
+from PyQt6.QtGui import QPainter, QColor, QFontDatabase, QPalette
+from NITTY_GRITTY.large_file import MappedFile, LineIndexThread, MappedSearchThread, compile_pattern, MAX_LINE_BYTES
+
+GUTTER_PADDING = 8  # pixels either side of the line numbers
+SCROLL_MAX = 2 ** 31 - 1  # QScrollBar ranges are ints
+
+class MappedLinesArea(QAbstractScrollArea):
+    """Paints only the lines that fit in the viewport, straight from a MappedFile."""
+
+    def __init__(self, mapped_file, parent=None):
+        super().__init__(parent)
+        self.mapped_file = mapped_file
+        self.line_count = 0
+        self.highlight = None  # (line, start column, end column) of the current match
+        self.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.text_color = self.palette().color(QPalette.ColorRole.Text)
+        self.paper_color = self.palette().color(QPalette.ColorRole.Base)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+
+    def visible_rows(self):
+        return max(1, self.viewport().height() // self.fontMetrics().height())
+
+    def set_line_count(self, count):
+        self.line_count = count
+        self.update_scrollbars()
+        # New lines only need painting if they are on screen
+        if count - self.verticalScrollBar().value() <= self.visible_rows() + 1:
+            self.viewport().update()
+
+    def update_scrollbars(self):
+        rows = self.visible_rows()
+        self.verticalScrollBar().setRange(0, min(max(0, self.line_count - rows), SCROLL_MAX))
+        self.verticalScrollBar().setPageStep(rows)
+        char_width = self.fontMetrics().horizontalAdvance('0')
+        self.horizontalScrollBar().setRange(0, max(0, MAX_LINE_BYTES * char_width - self.viewport().width()))
+        self.horizontalScrollBar().setSingleStep(char_width)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbars()
+
+    def scroll_to_line(self, line):
+        rows = self.visible_rows()
+        first = self.verticalScrollBar().value()
+        if not first <= line < first + rows:
+            self.verticalScrollBar().setValue(max(0, line - rows // 2))
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(event.rect(), self.paper_color)
+        if self.mapped_file is None:
+            return  # closed
+        metrics = self.fontMetrics()
+        line_height = metrics.height()
+        char_width = metrics.horizontalAdvance('0')
+        gutter = len(str(max(self.line_count, 1))) * char_width + 2 * GUTTER_PADDING
+        x = gutter - self.horizontalScrollBar().value()
+        first = self.verticalScrollBar().value()
+        last = min(self.line_count, first + self.visible_rows() + 1)
+        painter.setClipRect(gutter, 0, self.viewport().width() - gutter, self.viewport().height())
+        for row, line in enumerate(range(first, last)):
+            top = row * line_height
+            text = self.mapped_file.line_text(line)
+            if self.highlight and self.highlight[0] == line:
+                _, start, end = self.highlight
+                left = x + metrics.horizontalAdvance(text[:start])
+                painter.fillRect(left, top, max(char_width, metrics.horizontalAdvance(text[start:end])), line_height,
+                                 QColor(255, 200, 0, 120))
+            painter.setPen(self.text_color)
+            painter.drawText(x, top + metrics.ascent(), text)
+        painter.setClipping(False)
+        painter.fillRect(0, 0, gutter, self.viewport().height(), self.paper_color.darker(110))
+        painter.setPen(QColor(128, 128, 128))
+        for row, line in enumerate(range(first, last)):
+            painter.drawText(GUTTER_PADDING, row * line_height + metrics.ascent(), str(line + 1))
+
+class LargeFileView(QWidget):
+    """Read-only tab for files too big for the editor.
+
+    The file is memory-mapped and indexed for line starts in the background; lines show
+    up as soon as they are indexed and search runs over the mapped bytes in a thread.
+    It answers the parts of the editor interface EditorManager and FileManager use.
+    """
+
+    def __init__(self, file_path, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.loading = False  # nothing is streamed into this view
+        self.mapped_file = MappedFile(file_path)
+        self.search_thread = None
+        self.search_generation = 0
+        self.retired_threads = set()
+        self.pending_match = None  # byte span found beyond the indexed region
+        self.last_match = None  # byte span of the highlighted match; Find Next continues after it
+        self.setup_ui()
+
+        self.index_thread = LineIndexThread(self.mapped_file)
+        self.index_thread.progress.connect(self.on_index_progress)
+        self.index_thread.indexed.connect(self.on_indexed)
+        self.index_thread.start()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Find in file...")
+        self.regex_checkbox = QCheckBox("Regex")
+        self.case_checkbox = QCheckBox("Match case")
+        self.find_button = QPushButton("Find Next")
+        self.status_label = QLabel("Indexing lines...")
+        search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.regex_checkbox)
+        search_layout.addWidget(self.case_checkbox)
+        search_layout.addWidget(self.find_button)
+        search_layout.addWidget(self.status_label)
+        layout.addLayout(search_layout)
+
+        self.lines_area = MappedLinesArea(self.mapped_file, self)
+        layout.addWidget(self.lines_area)
+
+        self.search_input.returnPressed.connect(self.find_next)
+        self.find_button.clicked.connect(self.find_next)
+
+    def on_index_progress(self, line_count):
+        self.lines_area.set_line_count(line_count)
+        self.status_label.setText(f"Indexing... {line_count:,} lines")
+        if self.pending_match:
+            self.show_match(*self.pending_match)
+
+    def on_indexed(self):
+        self.lines_area.set_line_count(self.mapped_file.line_count())
+        size_mb = self.mapped_file.size / (1024 * 1024)
+        self.status_label.setText(f"{self.mapped_file.line_count():,} lines, {size_mb:,.1f} MB (read-only)")
+        if self.pending_match:
+            self.show_match(*self.pending_match)
+
+    def find_next(self):
+        query = self.search_input.text()
+        if not query:
+            return
+        try:
+            pattern = compile_pattern(query, self.regex_checkbox.isChecked(), self.case_checkbox.isChecked())
+        except Exception as e:
+            self.status_label.setText(f"Invalid pattern: {e}")
+            return
+        start = 0
+        if self.last_match:
+            start = max(self.last_match[1], self.last_match[0] + 1)
+        self.cancel_search()
+        self.search_generation += 1
+        self.search_thread = MappedSearchThread(self.mapped_file, pattern, start, self.search_generation)
+        self.search_thread.found.connect(self.on_found)
+        self.search_thread.finished.connect(self.on_search_finished)
+        self.status_label.setText("Searching...")
+        self.search_thread.start()
+
+    def cancel_search(self):
+        if self.search_thread:
+            self.search_thread.cancel()
+            self.retired_threads.add(self.search_thread)
+            self.search_thread = None
+
+    def on_found(self, generation, start, end):
+        if generation != self.search_generation:
+            return
+        if start < 0:
+            self.status_label.setText("No matches")
+            return
+        self.show_match(start, end)
+
+    def show_match(self, start, end):
+        line = self.mapped_file.line_of_offset(start)
+        if line is None:
+            self.pending_match = (start, end)  # shown once indexing reaches it
+            self.status_label.setText("Match found, indexing up to it...")
+            return
+        self.pending_match = None
+        self.last_match = (start, end)
+        line_start, _ = self.mapped_file.line_span(line)
+        raw = self.mapped_file.buffer[line_start:end]
+        column = len(raw[:start - line_start].decode('utf-8', errors='replace'))
+        end_column = len(raw.decode('utf-8', errors='replace'))
+        self.lines_area.highlight = (line, column, end_column)
+        self.lines_area.scroll_to_line(line)
+        self.status_label.setText(f"Line {line + 1:,}")
+
+    def on_search_finished(self):
+        thread = self.sender()
+        if thread is self.search_thread:
+            self.search_thread = None
+        self.retired_threads.discard(thread)
+        thread.deleteLater()
+
+    # The editor interface used by EditorManager and FileManager
+    def isModified(self):
+        return False
+
+    def setModified(self, modified):
+        pass
+
+    def isReadOnly(self):
+        return True
+
+    def lines(self):
+        return self.mapped_file.line_count()
+
+    def setCursorPosition(self, line, index):
+        self.lines_area.scroll_to_line(line)
+
+    def setColor(self, color):
+        self.lines_area.text_color = color
+        self.lines_area.viewport().update()
+
+    def setPaper(self, color):
+        self.lines_area.paper_color = color
+        self.lines_area.viewport().update()
+
+    def on_vault_switch(self, new_vault_path):
+        pass
+
+    def close_file(self):
+        """Stops the background threads and unmaps the file."""
+        if self.lines_area.mapped_file is None:
+            return
+        self.lines_area.mapped_file = None
+        self.index_thread.cancel()
+        self.cancel_search()
+        self.index_thread.wait()
+        for thread in list(self.retired_threads):
+            thread.wait()
+        self.mapped_file.close()
+        logging.info(f"Closed large file view of {os.path.basename(self.file_path)}")
+
+    def closeEvent(self, event):
+        self.close_file()
+        super().closeEvent(event)
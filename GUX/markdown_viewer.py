@@ -4,16 +4,26 @@ from PyQt6.QtWidgets import QTextBrowser
 from PyQt6.QtGui import QImage, QTextDocument
 import re
 class MarkdownViewer(QTextBrowser):
-    def __init__(self, vault_path):
+    def __init__(self, vault_path, vault_manager=None):
         super().__init__()
         self.vault_path = vault_path
+        self.vault_manager = vault_manager
         self.image_map = {}
+        if self.vault_manager:
+            # The index is built in the background and kept current by the vault watcher
+            self.vault_manager.index_ready.connect(lambda *_: self.index_vault())
+            self.vault_manager.index_updated.connect(lambda *_: self.index_vault())
         if self.vault_path:
             self.index_vault()
 
     def index_vault(self):
         if not self.vault_path:
             return
+        vault = self.vault_manager.get_current_vault() if self.vault_manager else None
+        if vault and str(vault.path) == str(self.vault_path):
+            self.image_map = {os.path.basename(f['path']): os.path.join(str(vault.path), f['path'])
+                              for f in vault.get_files_by_type('image')}
+            return
         for root, _, files in os.walk(self.vault_path):
             for file in files:
                 if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')):
@@ -0,0 +1,155 @@
+import os
+import logging
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListView, QLabel
+from PyQt6.QtCore import Qt, pyqtSignal, QAbstractListModel, QModelIndex, QTimer
+from NITTY_GRITTY.ThreadTrackers import SafeQThread
+from NITTY_GRITTY.fuzzy_finder import FuzzySearch
+
+RESULT_LIMIT = 50
+
+class PathTableLoader(SafeQThread):
+    loaded = pyqtSignal(str)  # vault_name
+
+    def __init__(self, vault):
+        super().__init__()
+        self.vault = vault
+
+    def run(self):
+        try:
+            self.vault.get_path_table()
+        except Exception as e:
+            logging.error(f"Could not load paths of vault {self.vault.name}: {e}")
+            return
+        self.loaded.emit(self.vault.name)
+
+class FuzzyResultsModel(QAbstractListModel):
+    PathRole = Qt.ItemDataRole.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hits = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.hits)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        hit = self.hits[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, self.PathRole):
+            return hit['path']
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"Score: {hit['score']}"
+        return None
+
+    def set_hits(self, hits):
+        self.beginResetModel()
+        self.hits = hits
+        self.endResetModel()
+
+class QuickOpenDialog(QDialog):
+    """Fuzzy jump-to-file for the current vault.
+
+    Matching runs on the GUI thread in FRAME_BUDGET slices, so every keystroke shows the
+    best hits found so far and the list keeps improving until the whole vault is seen.
+    """
+    file_selected = pyqtSignal(str)
+
+    def __init__(self, vault_manager, parent=None):
+        super().__init__(parent)
+        self.vault_manager = vault_manager
+        self.vault = None
+        self.search = None
+        self.loader = None
+        self.step_timer = QTimer(self)
+        self.step_timer.setSingleShot(True)
+        self.step_timer.timeout.connect(self.run_step)
+        self.setWindowTitle("Quick Open")
+        self.resize(600, 400)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Go to file...")
+        layout.addWidget(self.query_input)
+
+        self.results_model = FuzzyResultsModel(self)
+        self.results_list = QListView()
+        self.results_list.setModel(self.results_model)
+        self.results_list.setUniformItemSizes(True)
+        layout.addWidget(self.results_list)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.query_input.textChanged.connect(self.start_search)
+        self.query_input.returnPressed.connect(self.open_current)
+        self.results_list.doubleClicked.connect(self.open_index)
+        self.query_input.installEventFilter(self)
+
+    def open_for_current_vault(self):
+        self.vault = self.vault_manager.get_current_vault()
+        if not self.vault:
+            return
+        self.refresh_table()
+        self.query_input.selectAll()
+        self.start_search()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.query_input.setFocus()
+
+    def refresh_table(self, *_):
+        """Rebuilds the vault's path table in the background if the index has moved on."""
+        if self.vault and not (self.loader and self.loader.isRunning()):
+            self.loader = PathTableLoader(self.vault)
+            self.loader.loaded.connect(self.on_table_loaded)
+            self.loader.start()
+
+    def on_table_loaded(self, vault_name):
+        if self.vault and self.vault.name == vault_name:
+            self.start_search()  # the table may have changed under the current query
+
+    def start_search(self):
+        self.results_list.setCurrentIndex(QModelIndex())  # a new query starts at the top hit
+        table = self.vault.get_path_table(refresh=False) if self.vault else None
+        if table is None:
+            self.results_model.set_hits([])
+            self.status_label.setText("Loading paths...")
+            return
+        self.search = FuzzySearch(table, self.query_input.text(), RESULT_LIMIT, previous=self.search)
+        self.run_step()
+
+    def run_step(self):
+        search = self.search
+        done = search.step()
+        row = max(self.results_list.currentIndex().row(), 0)
+        self.results_model.set_hits(search.results())
+        if self.results_model.hits:
+            self.results_list.setCurrentIndex(self.results_model.index(min(row, len(self.results_model.hits) - 1)))
+        if done:
+            self.status_label.setText(f"{len(search.matched)} of {len(search.table)} files")
+        else:
+            self.status_label.setText(f"Matching... {len(search.matched)} so far")
+            self.step_timer.start(0)  # continue after pending input events
+
+    def eventFilter(self, obj, event):
+        if obj is self.query_input and event.type() == event.Type.KeyPress:
+            if event.key() in (Qt.Key.Key_Up, Qt.Key.Key_Down, Qt.Key.Key_PageUp, Qt.Key.Key_PageDown):
+                self.results_list.keyPressEvent(event)
+                return True
+        return super().eventFilter(obj, event)
+
+    def open_current(self):
+        self.open_index(self.results_list.currentIndex())
+
+    def open_index(self, index):
+        if not index.isValid() or not self.vault:
+            return
+        self.file_selected.emit(os.path.join(str(self.vault.path), index.data(FuzzyResultsModel.PathRole)))
+        self.accept()
+
+    def done(self, result):
+        self.step_timer.stop()
+        super().done(result)
@@ -0,0 +1,148 @@
+import os
+import re
+import keyword
+from PyQt6.QtGui import QSyntaxHighlighter, QTextCharFormat, QBrush, QColor, QFont
+
+# Block states: 0 is plain code, k > 0 means the block ends inside the language's span k - 1
+NORMAL_STATE = 0
+
+class HighlightLanguage:
+    """Highlighting rules for one language, compiled once into a single alternation.
+
+    `rules` are (name, regex, color) tokens that live on one line; `spans` are
+    (name, start regex, end regex, color) constructs such as block comments and
+    triple-quoted strings that may run over several lines. Earlier entries win when
+    two can match at the same position, and spans are tried before rules.
+    """
+    def __init__(self, name, rules, spans=(), extensions=()):
+        self.name = name
+        self.extensions = tuple(extensions)
+        self.spans = [(span_name, re.compile(end)) for span_name, _, end, _ in spans]
+        self.colors = {name: color for name, _, _, color in spans}
+        self.colors.update({name: color for name, _, color in rules})
+        alternatives = [f'(?P<span{i}>{start})' for i, (_, start, _, _) in enumerate(spans)]
+        alternatives += [f'(?P<{name}>{regex})' for name, regex, _ in rules]
+        self.pattern = re.compile('|'.join(alternatives))
+        self.span_groups = {f'span{i}': i for i in range(len(spans))}
+
+    def formats(self):
+        formats = {}
+        for name, color in self.colors.items():
+            fmt = QTextCharFormat()
+            fmt.setForeground(QBrush(QColor(color)))
+            if name == 'keyword':
+                fmt.setFontWeight(QFont.Weight.Bold)
+            formats[name] = fmt
+        return formats
+
+LANGUAGES = {}
+EXTENSION_LANGUAGES = {}
+
+def register_language(language):
+    LANGUAGES[language.name] = language
+    for extension in language.extensions:
+        EXTENSION_LANGUAGES[extension] = language
+
+def language_for_path(path):
+    return EXTENSION_LANGUAGES.get(os.path.splitext(path or '')[1].lower())
+
+def _words(words):
+    return r'\b(?:' + '|'.join(sorted(words, key=len, reverse=True)) + r')\b'
+
+register_language(HighlightLanguage('python', rules=[
+    ('comment', r'#.*', '#008000'),
+    ('string', r'[rRbBfFuU]{0,2}"(?:[^"\\]|\\.)*"?|[rRbBfFuU]{0,2}\'(?:[^\'\\]|\\.)*\'?', '#ff0000'),
+    ('decorator', r'^\s*@[\w.]+', '#aa22ff'),
+    ('keyword', _words(keyword.kwlist + getattr(keyword, 'softkwlist', [])), '#0000ff'),
+    ('builtin', _words(['self', 'cls', 'print', 'len', 'range', 'isinstance', 'super', 'dict', 'list',
+                        'set', 'tuple', 'str', 'int', 'float', 'bool', 'open', 'enumerate', 'zip']), '#8a2be2'),
+    ('number', r'\b(?:0[xXoObB][\da-fA-F_]+|\d[\d_]*\.?[\d_]*(?:[eE][+-]?\d+)?j?)\b', '#b8860b'),
+], spans=[
+    ('string', r'[rRbBfFuU]{0,2}"""', r'"""', '#ff0000'),
+    ('string', r"[rRbBfFuU]{0,2}'''", r"'''", '#ff0000'),
+], extensions=['.py', '.pyw', '.pyi']))
+
+C_KEYWORDS = ['auto', 'break', 'case', 'char', 'const', 'continue', 'default', 'do', 'double', 'else', 'enum',
+              'extern', 'float', 'for', 'goto', 'if', 'int', 'long', 'return', 'short', 'signed', 'sizeof',
+              'static', 'struct', 'switch', 'typedef', 'union', 'unsigned', 'void', 'volatile', 'while',
+              'class', 'public', 'private', 'protected', 'new', 'delete', 'this', 'true', 'false', 'null',
+              'function', 'var', 'let', 'import', 'export', 'from', 'async', 'await', 'try', 'catch',
+              'finally', 'throw', 'fn', 'pub', 'mut', 'impl', 'trait', 'use', 'mod', 'match', 'package',
+              'interface', 'extends', 'implements', 'type', 'go', 'func', 'defer']
+
+register_language(HighlightLanguage('c-like', rules=[
+    ('comment', r'//.*', '#008000'),
+    ('string', r'"(?:[^"\\]|\\.)*"?|\'(?:[^\'\\]|\\.)*\'?|`[^`]*`?', '#ff0000'),
+    ('preprocessor', r'^\s*#\s*\w+', '#aa22ff'),
+    ('keyword', _words(C_KEYWORDS), '#0000ff'),
+    ('number', r'\b(?:0[xXbB][\da-fA-F_]+|\d[\d_]*\.?[\d_]*(?:[eE][+-]?\d+)?[fFuUlL]*)\b', '#b8860b'),
+], spans=[
+    ('comment', r'/\*', r'\*/', '#008000'),
+], extensions=['.c', '.h', '.cpp', '.hpp', '.cc', '.js', '.jsx', '.ts', '.tsx', '.java', '.rs', '.go',
+               '.cs', '.zig']))
+
+def _utf16_offsets(text):
+    """Qt positions count UTF-16 units; only characters outside the BMP take two."""
+    if text.isascii() or all(ord(char) <= 0xFFFF for char in text):
+        return None
+    offsets = [0]
+    for char in text:
+        offsets.append(offsets[-1] + (2 if ord(char) > 0xFFFF else 1))
+    return offsets
+
+class RuleHighlighter(QSyntaxHighlighter):
+    """Single-pass highlighter driven by a HighlightLanguage.
+
+    Each block is scanned once with the language's combined pattern. The block state
+    records an unfinished multi-line span, and QSyntaxHighlighter only moves on to the
+    next block when that state changes, so an edit re-highlights the edited blocks plus
+    whatever a newly opened or closed span actually reaches.
+    """
+    def __init__(self, parent=None, language='python'):
+        super().__init__(parent)
+        self.language = LANGUAGES[language] if isinstance(language, str) else language
+        self.formats = self.language.formats()
+
+    def highlightBlock(self, text):
+        language = self.language
+        offsets = _utf16_offsets(text)
+        set_format = self.setFormat if offsets is None else (
+            lambda start, length, fmt: self.setFormat(offsets[start], offsets[start + length] - offsets[start], fmt))
+        pos = 0
+        state = self.previousBlockState()
+        if state > NORMAL_STATE:
+            pos = self._continue_span(text, state - 1, 0, set_format)
+            if pos is None:
+                return
+        self.setCurrentBlockState(NORMAL_STATE)
+        search = language.pattern.search
+        while True:
+            match = search(text, pos)
+            if not match:
+                return
+            kind = match.lastgroup
+            span = language.span_groups.get(kind)
+            if span is not None:
+                pos = self._continue_span(text, span, match.start(), set_format, match.end())
+                if pos is None:
+                    return
+            else:
+                set_format(match.start(), match.end() - match.start(), self.formats[kind])
+                pos = max(match.end(), match.start() + 1)
+
+    def _continue_span(self, text, span, start, set_format, search_from=None):
+        """Formats span `span` from `start`; returns where scanning resumes, or None if the
+        span runs past the end of the block."""
+        name, end_pattern = self.language.spans[span]
+        end = end_pattern.search(text, start if search_from is None else search_from)
+        if end is None:
+            set_format(start, len(text) - start, self.formats[name])
+            self.setCurrentBlockState(span + 1)
+            return None
+        set_format(start, end.end() - start, self.formats[name])
+        return end.end()
+
+def highlighter_for_path(document, path):
+    """A RuleHighlighter on `document` for the language of `path`, or None if unknown."""
+    language = language_for_path(path)
+    return RuleHighlighter(document, language) if language else None
@@ -0,0 +1,46 @@
+import os
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from PyQt6.QtCore import Qt
+
+class TabStub(QWidget):
+    """Placeholder for a restored tab that has not been looked at yet.
+
+    Holds only the file path and where the cursor and scroll were; EditorManager swaps
+    it for a real editor the first time the tab is activated. It answers the parts of
+    the editor interface EditorManager and FileManager use.
+    """
+
+    def __init__(self, file_path, cursor=(0, 0), scroll=0, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        self.cursor = tuple(cursor)  # (line, index)
+        self.scroll = scroll  # first visible line
+        self.loading = False
+        layout = QVBoxLayout(self)
+        label = QLabel(os.path.basename(file_path))
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(label)
+
+    def isModified(self):
+        return False
+
+    def setModified(self, modified):
+        pass
+
+    def isReadOnly(self):
+        return True  # nothing to save until it is a real editor
+
+    def lines(self):
+        return 0
+
+    def setCursorPosition(self, line, index):
+        self.cursor = (line, index)
+
+    def setColor(self, color):
+        pass
+
+    def setPaper(self, color):
+        pass
+
+    def on_vault_switch(self, new_vault_path):
+        pass
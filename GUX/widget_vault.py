@@ -126,7 +126,7 @@ class VaultWidget(QWidget):
         # Editor/Viewer
         self.editor_viewer = QSplitter(Qt.Orientation.Vertical)
         self.code_editor = CodeEditor(self.cccore)
-        self.markdown_viewer = MarkdownViewer(self.cccore.vault_manager.get_vault_path())
+        self.markdown_viewer = MarkdownViewer(self.cccore.vault_manager.get_vault_path(), self.cccore.vault_manager)
         self.editor_viewer.addWidget(self.code_editor)
         self.editor_viewer.addWidget(self.markdown_viewer)
         self.markdown_viewer.hide()  # Initially hide the markdown viewer
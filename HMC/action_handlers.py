@@ -2,11 +2,14 @@ import logging
 import os
 from PyQt6.QtWidgets import QFileDialog, QInputDialog, QMessageBox
 from PyQt6.QtWidgets import QDialog
+from PyQt6.QtCore import Qt
 from GUX.settings_dialog import SettingsDialog
+from GUX.quick_open_dialog import QuickOpenDialog
 
 class ActionHandlers:
     def __init__(self, cccore):
         self.cccore = cccore
+        self.quick_open_dialog = None
 
     def new_file(self):
         self.cccore.editor_manager.new_document()
@@ -181,6 +184,23 @@ class ActionHandlers:
         else:
             logging.warning("About dock not found")
 
+    def show_duplicates(self):
+        dock = self.cccore.widget_manager.ensure_dock("Duplicates")
+        if dock:
+            if self.cccore.main_window and self.cccore.main_window.dockWidgetArea(dock) == Qt.DockWidgetArea.NoDockWidgetArea:
+                self.cccore.main_window.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, dock)
+            dock.show()
+            dock.raise_()
+        else:
+            logging.warning("Duplicates dock could not be created")
+
+    def show_quick_open(self):
+        if self.quick_open_dialog is None:
+            self.quick_open_dialog = QuickOpenDialog(self.cccore.vault_manager, self.cccore.main_window)
+            self.quick_open_dialog.file_selected.connect(self.cccore.widget_manager.open_file_from_search)
+            self.cccore.vault_manager.index_updated.connect(self.quick_open_dialog.refresh_table)
+        self.quick_open_dialog.open_for_current_vault()
+
     def add_vault_directory(self):
         path = QFileDialog.getExistingDirectory(self.cccore.main_window, "Select Vault Directory")
         if path:
@@ -286,6 +286,8 @@ class CCCore:  # referred to as mm in other files (auratext)
             self.thread_controller.shutdown()
         if hasattr(self, 'process_manager'):
             self.process_manager.cleanup_processes()
+        if hasattr(self, 'vault_manager'):
+            self.vault_manager.shutdown()
        # ... cleanup other managers ...
         if hasattr(self, 'lsp_manager'):
             self.lsp_manager.cleanup()
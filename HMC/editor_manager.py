@@ -3,48 +3,97 @@ from PyQt6.Qsci import QsciScintilla
 from PyQt6.QtWidgets import QMessageBox, QFileDialog, QInputDialog
 from AuraText.auratext.Core.CodeEditor import CodeEditor
 from PyQt6.QtGui import QColor
-from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import pyqtSignal, QTimer
+from collections import deque
 import traceback
+import codecs
 import os
 import time
 from NITTY_GRITTY.ThreadTrackers import SafeQThread
+from NITTY_GRITTY.large_file import LARGE_FILE_THRESHOLD
+from NITTY_GRITTY.swap_journal import get_swap_journal, journal_scintilla_edit
+from NITTY_GRITTY.file_saver import get_save_pipeline
+from GUX.large_file_view import LargeFileView
+from GUX.tab_stub import TabStub
+from HMC.editor_registry import EditorRegistry
+
+LOAD_CHUNK_BYTES = 1024 * 1024  # read, decoded and appended to the editor one chunk at a time
+MAX_CONCURRENT_LOADS = 4
+PREFETCH_OFFSETS = (1, -1)  # tabs next to the active one, read ahead in case they are opened next
+EDITOR_MEMORY_BUDGET_MB = 512  # text held by open editors before hidden ones are released
+RELEASE_AFTER_HIDDEN_S = 600  # a tab must have been in the background this long to be released
+BUDGET_CHECK_MS = 60000
 
 class FileLoaderThread(SafeQThread):
-    file_loaded = pyqtSignal(str, str)
+    """Reads and decodes a file off the GUI thread, emitting the text in chunks."""
+    chunk_loaded = pyqtSignal(str, str)  # path, text
+    load_finished = pyqtSignal(str)  # path
+    load_failed = pyqtSignal(str, str)  # path, error
 
-    def __init__(self, path):
+    def __init__(self, path, chunk_bytes=LOAD_CHUNK_BYTES):
         super().__init__()
         self.path = path
+        self.chunk_bytes = chunk_bytes
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
 
     def run(self):
         try:
-            with open(self.path, 'r') as file:
-                content = file.read()
-            self.file_loaded.emit(self.path, content)
+            # Incremental, so a multi-byte character split across chunks decodes intact
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            with open(self.path, 'rb') as file:
+                block = file.read(self.chunk_bytes)
+                if block.startswith(codecs.BOM_UTF8):
+                    block = block[len(codecs.BOM_UTF8):]
+                while not self._cancelled:
+                    text = decoder.decode(block, final=not block)
+                    if text:
+                        self.chunk_loaded.emit(self.path, text)
+                    if not block:
+                        break
+                    block = file.read(self.chunk_bytes)
         except Exception as e:
-            logging.error(f"Error reading file: {e}")
+            logging.error(f"Error reading file {self.path}: {e}")
+            self.load_failed.emit(self.path, str(e))
+            return
+        if not self._cancelled:
+            self.load_finished.emit(self.path)
 
 class EditorManager:
     def __init__(self, cccore):
         self.cccore = cccore
-        self.windows = []
         self.current_window = None
         self.current_editor = None
-        self.window_editors = {}  # Map of windows to their editors
+        self.registry = EditorRegistry()  # every open editor, by path and by window
+        # path -> {'editor', 'pending' text chunks, 'finished'} for files still loading; the editor
+        # is None while a restored tab's file is only being prefetched
+        self.loads = {}
+        self.stub_windows = set()  # windows whose tab changes materialize TabStubs
+        self.load_queue = deque()  # paths waiting for a loader thread
+        self.loader_threads = set()
+        # Appends one pending chunk per loading editor per tick, so input is handled in between
+        self.feed_timer = QTimer()
+        self.feed_timer.setInterval(0)
+        self.feed_timer.timeout.connect(self.feed_loading_editors)
+        self.swap_journal = get_swap_journal(cccore.settings_manager.get_value("app_data_dir"))
+        self.memory_budget = cccore.settings_manager.get_value("editor_memory_budget_mb", EDITOR_MEMORY_BUDGET_MB) * 1024 * 1024
+        # Tabs age into releasability while nothing is switched, so the budget is also checked on a timer
+        self.budget_timer = QTimer()
+        self.budget_timer.setInterval(BUDGET_CHECK_MS)
+        self.budget_timer.timeout.connect(self.enforce_memory_budget)
+        self.budget_timer.start()
 
     def add_window(self, window):
-        
-        self.windows.append(window)
-        self.window_editors[window] = []
+        self.registry.add_window(window)
         self.set_current_window(window)
 
     def set_current_window(self, window):
-        if window in self.windows:
-            self.current_window = window
-            logging.info(f"Current AuraText window set in EditorManager: {window}")
-        else:
-            self.windows.append(window)
-            self.current_window=window
+        self.registry.add_window(window)
+        self.current_window = window
+        logging.info(f"Current AuraText window set in EditorManager: {window}")
+
     def open_file(self, file_path):
         if self.is_file_in_current_context(file_path):
             # Existing open_file logic
@@ -61,17 +110,306 @@ class EditorManager:
             logging.error(f"File not found: {file_path}")
             return None
 
+        if os.path.getsize(file_path) >= LARGE_FILE_THRESHOLD:
+            return self.open_large_file(file_path)
+
+        # The tab appears right away; the text streams in from a loader thread
+        new_editor = self.create_new_editor_tab(file_path, "")
+        if new_editor is None:
+            return None
+        new_editor.loading = True
+        new_editor.setReadOnly(True)
+        self.update_tab_title(new_editor)
+        self.loads[file_path] = {'editor': new_editor, 'pending': deque(), 'finished': False}
+        self.load_queue.append(file_path)
+        self.start_queued_loads()
+        return new_editor
+
+    def open_large_file(self, file_path):
+        """Opens a file too big for the editor in a read-only, memory-mapped view."""
+        if self.current_window is None:
+            logging.warning("No current AuraText window set in EditorManager")
+            return None
         try:
-            with open(file_path, 'r') as file:
-                content = file.read()
-            new_editor = self.create_new_editor_tab(file_path, content)
-            
-            return new_editor
+            view = LargeFileView(file_path)
         except Exception as e:
-            logging.error(f"Error opening file: {file_path}")
-            logging.error(traceback.format_exc())
+            logging.error(f"Error mapping large file {file_path}: {e}")
             QMessageBox.critical(self.current_window, "Error", f"Could not open file: {e}")
             return None
+        index = self.current_window.add_new_tab(view, os.path.basename(file_path))
+        if index is not None:
+            self.registry.register(view, self.current_window, file_path)
+            self.set_current_editor(view)
+        logging.info(f"Opened {file_path} in the large-file view")
+        return view
+
+    def restore_tabs(self, entries):
+        """Restores tabs as TabStubs, one per path or {'path', 'cursor', 'scroll'} dict.
+
+        Only the first tab becomes an editor now; the others do when first activated,
+        with the tabs next to the active one prefetched in the background.
+        """
+        if self.current_window is None:
+            logging.warning("No current AuraText window set in EditorManager")
+            return []
+        window = self.current_window
+        if window not in self.stub_windows:
+            self.stub_windows.add(window)
+            window.tab_widget.currentChanged.connect(
+                lambda index, window=window: self.on_stub_tab_activated(window, index))
+        stubs = []
+        for entry in entries:
+            state = entry if isinstance(entry, dict) else {'path': entry}
+            path = state['path']
+            if self.registry.get(path) or not os.path.exists(path):
+                continue
+            stub = TabStub(path, state.get('cursor', (0, 0)), state.get('scroll', 0))
+            if window.add_new_tab(stub, os.path.basename(path)) is not None:
+                self.registry.register(stub, window, path)
+                stubs.append(stub)
+        if stubs:
+            self.set_current_editor(stubs[0])
+        logging.info(f"Restored {len(stubs)} tabs")
+        return stubs
+
+    def on_stub_tab_activated(self, window, index):
+        widget = window.tab_widget.widget(index)
+        if isinstance(widget, TabStub):
+            self.current_window = window
+            self.set_current_editor(widget)
+
+    def materialize(self, stub, load=True):
+        """Swaps a TabStub for a real editor in the same tab, taking whatever a prefetch
+        already read, and prefetches the tabs next to it. With load=False the editor
+        starts empty, for a caller about to replace its whole text."""
+        window = self.registry.window_of(stub)
+        if window is None:
+            return None
+        path = stub.file_path
+        try:
+            if os.path.getsize(path) >= LARGE_FILE_THRESHOLD:
+                editor = LargeFileView(path)
+            else:
+                editor = self.new_code_editor(path, "")
+        except Exception as e:
+            logging.error(f"Error restoring tab for {path}: {e}")
+            QMessageBox.critical(window, "Error", f"Could not open file: {e}")
+            return None
+
+        index = self.swap_tab(window, stub, editor)
+        stub.deleteLater()
+
+        if not isinstance(editor, LargeFileView) and not load:
+            self.drop_prefetch(path)
+            self.editor_ready(editor)
+        elif not isinstance(editor, LargeFileView):
+            editor.loading = True
+            editor.setReadOnly(True)
+            load = self.loads.setdefault(path, {'pending': deque(), 'finished': False})
+            load['editor'] = editor
+            load['restore'] = (stub.cursor, stub.scroll)
+            if 'thread' not in load:
+                if path in self.load_queue:
+                    self.load_queue.remove(path)
+                self.load_queue.appendleft(path)  # ahead of any prefetches
+                self.start_queued_loads()
+            elif (load['pending'] or load['finished']) and not self.feed_timer.isActive():
+                self.feed_timer.start()
+            self.update_tab_title(editor)
+        self.prefetch_neighbours(window, index)
+        return editor
+
+    def swap_tab(self, window, old, new):
+        """Puts `new` in the tab holding `old`; returns the tab index."""
+        tab_widget = window.tab_widget
+        index = tab_widget.indexOf(old)
+        was_current = tab_widget.currentIndex() == index
+        tab_widget.blockSignals(True)  # the swap is not a tab change
+        tab_widget.insertTab(index, new, tab_widget.tabText(index))
+        tab_widget.removeTab(index + 1)
+        if was_current:
+            tab_widget.setCurrentIndex(index)
+        tab_widget.blockSignals(False)
+        self.registry.replace(old, new)
+        return index
+
+    def release_editor(self, editor):
+        """Frees the buffer of a hidden, unmodified editor by putting a TabStub back in its
+        tab; the file is read again when the tab is next activated."""
+        window = self.registry.window_of(editor)
+        line, index = editor.getCursorPosition()
+        stub = TabStub(editor.file_path, (line, index), editor.firstVisibleLine())
+        self.swap_tab(window, editor, stub)
+        editor.deleteLater()
+        logging.info(f"Released the buffer of {editor.file_path}; it reloads when its tab is activated")
+
+    def can_release(self, editor):
+        if isinstance(editor, (TabStub, LargeFileView)) or getattr(editor, 'loading', False):
+            return False
+        window = self.registry.window_of(editor)
+        return (not editor.isModified() and window.tab_widget.currentWidget() is not editor
+                and os.path.isfile(editor.file_path) and not get_save_pipeline().is_pending(editor.file_path))
+
+    def pin_editor(self, file_path):
+        """The editor open on `file_path`, kept loaded until unpin_editor(); None if not open.
+        For holders that outlive a call, like a merge dialog writing its result back."""
+        editor = self.registry.get(file_path)
+        if editor is None:
+            return None
+        self.registry.acquire(editor)
+        return editor
+
+    def unpin_editor(self, file_path):
+        # By path: the pinned tab may have been swapped for a real editor since
+        editor = self.registry.get(file_path)
+        if editor is not None:
+            self.registry.release(editor)
+
+    def enforce_memory_budget(self):
+        for editor in self.registry.release_candidates(self.memory_budget, RELEASE_AFTER_HIDDEN_S, self.can_release):
+            self.release_editor(editor)
+
+    def account_buffer(self, editor):
+        """Records how many bytes of text `editor` holds."""
+        if editor in self.registry and not isinstance(editor, (TabStub, LargeFileView)):
+            self.registry.set_size(editor, editor.length())
+
+    def prefetch_neighbours(self, window, index):
+        for offset in PREFETCH_OFFSETS:
+            widget = window.tab_widget.widget(index + offset)
+            if not isinstance(widget, TabStub) or widget.file_path in self.loads:
+                continue
+            try:
+                if os.path.getsize(widget.file_path) >= LARGE_FILE_THRESHOLD:
+                    continue  # mapped on demand, nothing to read ahead
+            except OSError:
+                continue
+            self.loads[widget.file_path] = {'editor': None, 'pending': deque(), 'finished': False}
+            self.load_queue.append(widget.file_path)
+        self.start_queued_loads()
+
+    def drop_prefetch(self, path):
+        load = self.loads.get(path)
+        if load and load['editor'] is None:
+            if load.get('thread'):
+                load['thread'].cancel()
+            del self.loads[path]
+
+    def start_queued_loads(self):
+        while self.load_queue and len(self.loader_threads) < MAX_CONCURRENT_LOADS:
+            path = self.load_queue.popleft()
+            if path not in self.loads or self.loads[path].get('thread'):
+                continue  # closed before it started, or queued twice and already running
+            thread = FileLoaderThread(path)
+            # Signals carry their thread, so ones queued by a cancelled load of the same path are dropped
+            thread.chunk_loaded.connect(lambda path, text, thread=thread: self.on_chunk_loaded(thread, path, text))
+            thread.load_finished.connect(lambda path, thread=thread: self.on_load_finished(thread, path))
+            thread.load_failed.connect(lambda path, message, thread=thread: self.on_load_failed(thread, path, message))
+            thread.finished.connect(lambda thread=thread: self.on_loader_thread_finished(thread))
+            self.loads[path]['thread'] = thread
+            self.loader_threads.add(thread)
+            thread.start()
+
+    def on_loader_thread_finished(self, thread):
+        self.loader_threads.discard(thread)
+        thread.deleteLater()
+        self.start_queued_loads()
+
+    def current_load(self, thread, path):
+        """The load of `path` that `thread` is running; None when the signal comes from a
+        cancelled load whose queued chunks outlived it."""
+        load = self.loads.get(path)
+        if load and load.get('thread') is thread:
+            return load
+        return None
+
+    def on_chunk_loaded(self, thread, path, text):
+        load = self.current_load(thread, path)
+        if load:
+            load['pending'].append(text)
+            if not self.feed_timer.isActive():
+                self.feed_timer.start()
+
+    def on_load_finished(self, thread, path):
+        load = self.current_load(thread, path)
+        if load:
+            load['finished'] = True
+            if not self.feed_timer.isActive():
+                self.feed_timer.start()
+
+    def on_load_failed(self, thread, path, message):
+        load = self.current_load(thread, path)
+        if load is None:
+            return
+        del self.loads[path]
+        if load['editor']:  # a failed prefetch is reported if the tab is opened
+            self.close_editor(load['editor'])
+            QMessageBox.critical(self.current_window, "Error", f"Could not open file: {message}")
+
+    def feed_loading_editors(self):
+        for path, load in list(self.loads.items()):
+            if load['editor'] is None:
+                continue  # prefetched text waits until its tab is activated
+            if load['pending']:
+                load['editor'].append(load['pending'].popleft())
+            elif load['finished']:
+                self.finish_load(path)
+        if not any(load['editor'] and (load['pending'] or load['finished']) for load in self.loads.values()):
+            self.feed_timer.stop()
+
+    def finish_load(self, path):
+        load = self.loads.pop(path)
+        editor = load['editor']
+        # Loading is not an edit: nothing to undo, nothing to save
+        editor.SendScintilla(QsciScintilla.SCI_EMPTYUNDOBUFFER)
+        editor.setModified(False)
+        editor.setReadOnly(False)
+        editor.loading = False
+        self.offer_recovery(editor, path)
+        if load.get('restore'):
+            (line, index), scroll = load['restore']
+            editor.setCursorPosition(line, index)
+            editor.setFirstVisibleLine(scroll)
+        self.editor_ready(editor)
+        self.enforce_memory_budget()
+        logging.info(f"File opened successfully: {path}")
+
+    def editor_ready(self, editor):
+        """Hands a filled editor to the user: editable, journaled and accounted."""
+        editor.setReadOnly(False)
+        editor.loading = False
+        editor.SCN_MODIFIED.connect(lambda *args, editor=editor: self.journal_edit(editor, *args))
+        self.account_buffer(editor)
+        self.update_tab_title(editor)
+
+    def offer_recovery(self, editor, path):
+        """Offers the unsaved changes a crashed session left in the swap journal."""
+        recovered = self.swap_journal.recover(path)
+        if recovered is None:
+            return
+        reply = QMessageBox.question(self.current_window, "Recover Unsaved Changes?",
+                                     f"{os.path.basename(path)} has unsaved changes from a session that did not "
+                                     "close cleanly. Recover them?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            self.swap_journal.end(path)
+            return
+        editor.setText(recovered)
+        editor.setModified(True)
+        self.swap_journal.begin(path, 'utf8', editor.text)
+
+    def journal_edit(self, editor, position, modification_type, text, length, *args):
+        path = editor.file_path
+        if path and not getattr(editor, 'loading', False):
+            journal_scintilla_edit(self.swap_journal, editor, path, position, modification_type, text, length)
+
+    def cancel_load(self, editor):
+        for path, load in list(self.loads.items()):
+            if load['editor'] is editor:
+                if load.get('thread'):
+                    load['thread'].cancel()
+                del self.loads[path]
+                return
 
     def create_new_editor_tab(self, file_path=None, content=None):
         if self.current_window is None:
@@ -86,16 +424,10 @@ class EditorManager:
             content = ""
         
         try:
-            editor = CodeEditor(self.cccore)
-            editor.set_file_path(file_path)
-            editor.setText(content)
-            
-            file_extension = self.get_file_extension(file_path)
-            self.apply_lexer(editor, file_extension)
-            
+            editor = self.new_code_editor(file_path, content)
             index = self.current_window.add_new_tab(editor, os.path.basename(file_path))
             if index is not None:
-                self.window_editors[self.current_window].append(editor)
+                self.registry.register(editor, self.current_window, file_path)
                 self.set_current_editor(editor)
             
             return editor
@@ -104,6 +436,13 @@ class EditorManager:
             logging.error(traceback.format_exc())
             return None
 
+    def new_code_editor(self, file_path, content):
+        editor = CodeEditor(self.cccore)
+        editor.set_file_path(file_path)
+        editor.setText(content)
+        self.apply_lexer(editor, self.get_file_extension(file_path))
+        return editor
+
     def new_document(self):
         if self.current_window is None:
             logging.error("No current AuraText window set in EditorManager")
@@ -113,6 +452,7 @@ class EditorManager:
             new_editor = CodeEditor(self.cccore)
             index = self.current_window.add_new_tab(new_editor, "Untitled")
             if index is not None:
+                self.registry.register(new_editor, self.current_window)
                 self.set_current_editor(new_editor)
                 return new_editor
             else:
@@ -134,6 +474,7 @@ class EditorManager:
         file_path, _ = QFileDialog.getSaveFileName(self.current_window, "Save File")
         if file_path:
             editor.file_path = file_path
+            self.registry.rename(editor, file_path)
             return self.save_file(editor)
         return False
 
@@ -142,7 +483,9 @@ class EditorManager:
             return False
         
         editor = self.current_window.tab_widget.widget(index)
-        if editor.isModified():
+        if getattr(editor, 'loading', False):
+            self.cancel_load(editor)
+        elif editor.isModified():
             reply = QMessageBox.question(self.current_window, "Save Changes?",
                                          "Do you want to save your changes?",
                                          QMessageBox.StandardButton.Save | 
@@ -155,7 +498,13 @@ class EditorManager:
                 return False
         
         self.current_window.close_tab(index)
-        self.window_editors[self.current_window].remove(editor)
+        self.registry.unregister(editor)
+        if isinstance(editor, LargeFileView):
+            editor.close_file()
+        elif isinstance(editor, TabStub):
+            self.drop_prefetch(editor.file_path)  # never opened, so its journal is left for recovery
+        elif not get_save_pipeline().is_pending(editor.file_path):
+            self.swap_journal.end(editor.file_path)  # saved or discarded
         if editor == self.current_editor:
             self.set_current_editor(self.current_window.get_current_tab())
         return True
@@ -164,9 +513,8 @@ class EditorManager:
         self.cccore.lexer_manager.apply_lexer(file_extension, editor)
 
     def apply_theme_to_all_editors(self, theme):
-        for window, editors in self.window_editors.items():
-            for editor in editors:
-                self.apply_theme_to_editor(editor, theme)
+        for editor in self.registry.editors():
+            self.apply_theme_to_editor(editor, theme)
 
     def apply_theme_to_editor(self, editor, theme):
         editor.setColor(QColor(theme['text_color']))
@@ -193,57 +541,48 @@ class EditorManager:
         return self.current_window.tab_widget.widget(index)
 
     def get_editor_by_path(self, path):
-        for window, editors in self.window_editors.items():
-            for editor in editors:
-                if editor.file_path == path:
-                    return editor
-        return None
+        """The editor open on `path`, or None. A restored tab not yet looked at is turned
+        into a real editor first; its text may still be loading."""
+        editor = self.registry.get(path)
+        if isinstance(editor, TabStub):
+            editor = self.materialize(editor) or editor
+        return editor
 
     def get_editor_by_name(self, name):
-        for window, editors in self.window_editors.items():
-            for editor in editors:
-                if os.path.basename(editor.file_path) == name:
-                    return editor
+        for editor in self.registry.editors():
+            if os.path.basename(editor.file_path) == name:
+                return self.get_editor_by_path(editor.file_path) if isinstance(editor, TabStub) else editor
         return None
 
-    
     def get_all_editors(self):
-        all_editors = []
-        for window, editors in self.window_editors.items():
-            all_editors.extend(editors)
-        return all_editors
-    
+        return self.registry.editors()
+
     def get_all_editor_paths(self):
-        all_editor_paths = []
-        for window, editors in self.window_editors.items():
-            for editor in editors:
-                all_editor_paths.append(editor.file_path)
-        return all_editor_paths
+        return [editor.file_path for editor in self.registry.editors()]
     
     def get_project_path(self,project_name):
         return self.cccore.project_manager.get_project_path(project_name)
     def on_vault_switch(self, new_vault_path):
-        for window, editors in self.window_editors.items():
-            for editor in editors:
-                editor.on_vault_switch(new_vault_path)
+        for editor in self.registry.editors():
+            editor.on_vault_switch(new_vault_path)
 
     def update_tab_title(self, editor):
-        for window, editors in self.window_editors.items():
-            if editor in editors:
-                index = window.tab_widget.indexOf(editor)
-                if index != -1:
-                    title = os.path.basename(editor.file_path) if editor.file_path else f"Untitled_{int(time.time())}"
-                    window.set_tab_title(index, title)
-                return
+        window = self.registry.window_of(editor)
+        if window is None:
+            return
+        index = window.tab_widget.indexOf(editor)
+        if index != -1:
+            title = os.path.basename(editor.file_path) if editor.file_path else f"Untitled_{int(time.time())}"
+            if getattr(editor, 'loading', False):
+                title = f"{title} (loading...)"
+            window.set_tab_title(index, title)
 
     def get_editor_count(self):
-        return sum(len(editors) for editors in self.window_editors.values())
+        return len(self.registry)
 
     def on_tab_moved(self, from_index, to_index):
         if self.current_window:
-            editors = self.window_editors[self.current_window]
-            editor = editors.pop(from_index)
-            editors.insert(to_index, editor)
+            self.registry.move(self.current_window, from_index, to_index)
 
     def on_current_tab_changed(self, index):
         if self.current_window and index >= 0:
@@ -270,53 +609,66 @@ class EditorManager:
                 self.close_tab(i)
 
     def remove_window(self, window):
-        if window in self.windows:
-            self.windows.remove(window)
-            del self.window_editors[window]
+        if window in self.registry.windows():
+            self.registry.remove_window(window)
             if self.current_window == window:
-                self.current_window = self.windows[0] if self.windows else None
+                windows = self.registry.windows()
+                self.current_window = windows[0] if windows else None
                 self.current_editor = None
+
     def close_editor(self, editor):
-        for window, editors in self.window_editors.items():
-            if editor in editors:
-                if window.close_editor(editor):
-                    editors.remove(editor)
-                    if editor == self.current_editor:
-                        self.current_editor = None
-                    return True
+        if getattr(editor, 'loading', False):
+            self.cancel_load(editor)
+        window = self.registry.window_of(editor)
+        if window is not None and window.close_editor(editor):
+            self.registry.unregister(editor)
+            if isinstance(editor, LargeFileView):
+                editor.close_file()
+            elif isinstance(editor, TabStub):
+                self.drop_prefetch(editor.file_path)
+            elif not get_save_pipeline().is_pending(editor.file_path):
+                self.swap_journal.end(editor.file_path)
+            if editor == self.current_editor:
+                self.current_editor = None
+            return True
         return False
 
     def get_open_files(self):
-        open_files = []
-        for editors in self.window_editors.values():
-            open_files.extend([editor.file_path for editor in editors if editor.file_path])
-        return open_files
+        return [editor.file_path for editor in self.registry.editors() if editor.file_path]
 
-    
     def get_editors_for_window(self, window):
-        return self.window_editors.get(window, [])
+        return self.registry.editors(window)
 
     def get_editor_by_file_path(self, file_path):
-        for editors in self.window_editors.values():
-            for editor in editors:
-                if editor.file_path == file_path:
-                    return editor
-        return None
+        return self.get_editor_by_path(file_path)
+
     def set_current_editor(self, editor):
+        if isinstance(editor, TabStub):
+            editor = self.materialize(editor) or editor
+        self.note_activated(editor)
         if self.current_window:
             self.current_window.set_current_editor(editor)
         else:
             #this is where we need to add the code to switch to the correct window and set the current editor
-            for window, editors in self.window_editors.items():
-                if editor in editors:
-                    self.current_editor = editor
-                    self.current_window = window
-                    index = editors.index(editor)
-                    window.tab_widget.setCurrentIndex(index)
-                    logging.info(f"Current editor set to index {index} in window {window}")
-                    return
+            window = self.registry.window_of(editor)
+            if window is not None:
+                self.current_editor = editor
+                self.current_window = window
+                index = self.registry.editors(window).index(editor)
+                window.tab_widget.setCurrentIndex(index)
+                logging.info(f"Current editor set to index {index} in window {window}")
+                return
             logging.warning(f"Editor not found in any window. Unable to set as current.")
 
+    def note_activated(self, editor):
+        """Accounts the buffer of the tab being left, whose size cannot change while it is
+        hidden, and releases old hidden buffers if that puts the total over budget."""
+        previous = self.registry.active
+        if previous is not None and previous is not editor:
+            self.account_buffer(previous)
+        self.registry.activated(editor)
+        self.enforce_memory_budget()
+
     def is_file_in_current_context(self, file_path):
         current_vault = self.cccore.vault_manager.get_current_vault()
         current_project = self.cccore.project_manager.current_project
@@ -329,18 +681,46 @@ class EditorManager:
                 return file_path.lower().startswith(project_path.lower())
         return False
 
+    def opens_as_large(self, file_path):
+        try:
+            return os.path.getsize(file_path) >= LARGE_FILE_THRESHOLD
+        except OSError:
+            return False
+
+    def editor_for_replace(self, editor):
+        """Readies an open tab to have its whole text replaced: a stub becomes an empty real
+        editor without reading the file, and a load in progress is abandoned. None for a
+        read-only large-file view."""
+        if isinstance(editor, TabStub):
+            editor = self.materialize(editor, load=False)
+        if editor is None or isinstance(editor, LargeFileView):
+            return None
+        if getattr(editor, 'loading', False):
+            self.cancel_load(editor)  # the new text replaces whatever the load would bring
+            self.editor_ready(editor)
+        return editor
+
+    def replace_editor_text(self, editor, new_content):
+        """Replaces the whole text of an open tab as one saveable edit; False if the tab
+        cannot be edited."""
+        editor = self.editor_for_replace(editor)
+        if editor is None:
+            logging.warning("Cannot replace the text of a read-only large file view")
+            return False
+        editor.setText(new_content)
+        editor.setModified(True)
+        return True
+
     def update_current_editor_content(self, new_content):
         if self.current_editor:
-            self.current_editor.setPlainText(new_content)
-            self.current_editor.document().setModified(True)
+            self.replace_editor_text(self.current_editor, new_content)
         else:
             logging.warning("No current editor to update")
 
     def update_editor_content(self, file_path, new_content):
-        editor = self.get_editor_by_file_path(file_path)
+        editor = self.registry.get(file_path)
         if editor:
-            editor.setPlainText(new_content)
-            editor.document().setModified(True)
+            self.replace_editor_text(editor, new_content)
         else:
             logging.warning(f"No editor found for file: {file_path}")
     
@@ -351,25 +731,31 @@ class EditorManager:
             self.open_file(current_file)
 
     def get_file_content(self, file_path):
-        editor = self.get_editor_by_file_path(file_path)
-        if editor:
-            return editor.toPlainText()
-        else:
-            try:
-                with open(file_path, 'r') as file:
-                    return file.read()
-            except FileNotFoundError:
-                return None
+        """The text of `file_path` as the user sees it; None if it cannot be read, or is
+        open as a large-file view too big to hold as one string."""
+        editor = self.registry.get(file_path)
+        if isinstance(editor, LargeFileView) or (isinstance(editor, TabStub) and self.opens_as_large(file_path)):
+            logging.warning(f"{file_path} is open as a read-only large file view")
+            return None
+        if editor and not isinstance(editor, TabStub) and not getattr(editor, 'loading', False):
+            return editor.text()
+        # An unloaded or still-loading tab holds nothing the file does not
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                return file.read()
+        except (OSError, UnicodeDecodeError):
+            return None
 
     def update_file_content(self, file_path, new_content):
-        editor = self.get_editor_by_file_path(file_path)
+        """Puts `new_content` in the open tab of `file_path`, else writes the file; False
+        if the file is open in a tab that cannot be edited."""
+        editor = self.registry.get(file_path)
         if editor:
-            editor.setPlainText(new_content)
-            editor.document().setModified(True)
-        else:
-            try:
-                with open(file_path, 'w') as file:
-                    file.write(new_content)
-            except IOError as e:
-                logging.error(f"Error writing to file {file_path}: {str(e)}")
-                raise
\ No newline at end of file
+            return self.replace_editor_text(editor, new_content)
+        try:
+            with open(file_path, 'w', encoding='utf-8') as file:
+                file.write(new_content)
+        except IOError as e:
+            logging.error(f"Error writing to file {file_path}: {str(e)}")
+            raise
+        return True
\ No newline at end of file
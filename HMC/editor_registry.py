@@ -0,0 +1,159 @@
+import time
+import logging
+from collections import OrderedDict
+
+class EditorRecord:
+    __slots__ = ('editor', 'window', 'path', 'refs', 'size', 'hidden_since')
+
+    def __init__(self, editor, window, path):
+        self.editor = editor
+        self.window = window
+        self.path = path
+        self.refs = 0  # holders besides the tab itself, e.g. a merge dialog writing back into it
+        self.size = 0  # bytes of text the editor holds, as of its last accounting
+        self.hidden_since = None  # monotonic time the tab stopped being the active one
+
+class EditorRegistry:
+    """The one place open editors are tracked.
+
+    Editors are indexed by path and by window (in tab order), kept in least-recently
+    active order, and carry a reference count and the size of the text they hold so
+    the buffers of long-hidden tabs can be released when the total passes a budget.
+    """
+
+    def __init__(self):
+        self.records = OrderedDict()  # editor -> EditorRecord, least recently active first
+        self.by_path = {}  # path -> editor
+        self.by_window = {}  # window -> [editor] in tab order
+        self.total_size = 0
+        self.active = None
+
+    def add_window(self, window):
+        self.by_window.setdefault(window, [])
+
+    def remove_window(self, window):
+        for editor in list(self.by_window.get(window, [])):
+            self.unregister(editor)
+        self.by_window.pop(window, None)
+
+    def windows(self):
+        return list(self.by_window)
+
+    def register(self, editor, window, path=None):
+        record = EditorRecord(editor, window, path if path is not None else getattr(editor, 'file_path', None))
+        record.hidden_since = time.monotonic()
+        self.records[editor] = record
+        self.by_window.setdefault(window, []).append(editor)
+        if record.path:
+            self.by_path.setdefault(record.path, editor)
+        return record
+
+    def unregister(self, editor):
+        record = self.records.pop(editor, None)
+        if record is None:
+            return
+        self.total_size -= record.size
+        if self.active is editor:
+            self.active = None
+        if record.path and self.by_path.get(record.path) is editor:
+            del self.by_path[record.path]
+        editors = self.by_window.get(record.window)
+        if editors and editor in editors:
+            editors.remove(editor)
+
+    def replace(self, old, new):
+        """Puts `new` in `old`'s place: same window, tab position, path and references."""
+        record = self.records.pop(old, None)
+        if record is None:
+            return
+        self.total_size -= record.size
+        record.size = 0
+        record.editor = new
+        self.records[new] = record
+        editors = self.by_window[record.window]
+        editors[editors.index(old)] = new
+        if record.path and self.by_path.get(record.path) is old:
+            self.by_path[record.path] = new
+        if self.active is old:
+            self.active = new
+
+    def rename(self, editor, path):
+        record = self.records.get(editor)
+        if record is None or record.path == path:
+            return
+        if record.path and self.by_path.get(record.path) is editor:
+            del self.by_path[record.path]
+        record.path = path
+        if path:
+            self.by_path.setdefault(path, editor)
+
+    def move(self, window, from_index, to_index):
+        editors = self.by_window[window]
+        editors.insert(to_index, editors.pop(from_index))
+
+    def get(self, path):
+        return self.by_path.get(path)
+
+    def record(self, editor):
+        return self.records.get(editor)
+
+    def window_of(self, editor):
+        record = self.records.get(editor)
+        return record.window if record else None
+
+    def editors(self, window=None):
+        if window is not None:
+            return list(self.by_window.get(window, []))
+        return [editor for editors in self.by_window.values() for editor in editors]
+
+    def __contains__(self, editor):
+        return editor in self.records
+
+    def __len__(self):
+        return len(self.records)
+
+    def acquire(self, editor):
+        """Marks `editor` as in use elsewhere; it will not be released until released back."""
+        self.records[editor].refs += 1
+
+    def release(self, editor):
+        record = self.records.get(editor)
+        if record and record.refs > 0:
+            record.refs -= 1
+
+    def activated(self, editor):
+        """`editor` became the active tab; whatever was active before starts to age."""
+        previous = self.records.get(self.active)
+        if previous and self.active is not editor:
+            previous.hidden_since = time.monotonic()
+        record = self.records.get(editor)
+        if record:
+            record.hidden_since = None
+            self.records.move_to_end(editor)
+        self.active = editor
+
+    def set_size(self, editor, size):
+        record = self.records.get(editor)
+        if record:
+            self.total_size += size - record.size
+            record.size = size
+
+    def release_candidates(self, budget, min_hidden_seconds, can_release):
+        """Editors to release, least recently active first, until the total fits `budget`.
+        Only editors hidden for `min_hidden_seconds`, unreferenced and passing
+        `can_release` are chosen."""
+        excess = self.total_size - budget
+        if excess <= 0:
+            return []
+        now = time.monotonic()
+        chosen = []
+        for editor, record in self.records.items():
+            if excess <= 0:
+                break
+            if (record.size and not record.refs and record.hidden_since is not None
+                    and now - record.hidden_since >= min_hidden_seconds and can_release(editor)):
+                chosen.append(editor)
+                excess -= record.size
+        if excess > 0:
+            logging.debug(f"Editor buffers still {excess} bytes over budget; the rest are in use")
+        return chosen
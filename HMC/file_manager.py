@@ -4,14 +4,21 @@ from GUX.radial_menu import RadialMenu
 from PyQt6.QtGui import QTextCursor, QFileSystemModel 
 from PyQt6.QtWidgets import QInputDialog 
 from PyQt6.QtCore import QDir
+from PyQt6 import sip
 import hashlib
 import tempfile
 import shutil
 import logging
+from NITTY_GRITTY.file_saver import get_save_pipeline
+from NITTY_GRITTY.swap_journal import get_swap_journal
 class FileManager:
     def __init__(self, cccore):
         self.cccore = cccore
         self.file_system_model = None
+        self.saving = {}  # path -> text snapshot for saves in flight; the tab may close meanwhile
+        self.save_pipeline = get_save_pipeline()
+        self.save_pipeline.saved.connect(self.on_file_saved)
+        self.save_pipeline.failed.connect(self.on_save_failed)
 
     def create_file_system_model(self):
         if self.file_system_model is None:
@@ -58,18 +65,12 @@ class FileManager:
             self.cccore.editor_manager.set_current_editor(existing_editor)
             return
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-            new_editor = self.cccore.editor_manager.create_new_editor_tab(file_path, content)
-            if new_editor:
-                self.cccore.editor_manager.set_current_editor(new_editor)
-                logging.info(f"File opened successfully: {file_path}")
-            else:
-                logging.error(f"Failed to create new editor for file: {file_path}")
-        except Exception as e:
-            logging.error(f"Error opening file {file_path}: {str(e)}")
-            QMessageBox.warning(None, "Error", f"Failed to open file: {file_path}\n\nError: {str(e)}")
+        # EditorManager shows the tab at once and loads the text in the background
+        new_editor = self.cccore.editor_manager.open_file(file_path)
+        if new_editor:
+            self.cccore.editor_manager.set_current_editor(new_editor)
+        else:
+            logging.error(f"Failed to create new editor for file: {file_path}")
 
     def save_file(self, editor=None):
         if editor is None:
@@ -77,18 +78,41 @@ class FileManager:
         if editor is None:
             return
 
+        if getattr(editor, 'loading', False) or editor.isReadOnly():
+            logging.warning(f"Not saving {editor.file_path}: it is read-only or still loading")
+            return False
+
         if editor.file_path.startswith("Untitled_"):
             return self.save_file_as(editor)
 
-        try:
-            with open(editor.file_path, 'w') as file:
-                file.write(editor.text())
+        # The text is snapshotted here and written atomically by the save pipeline's worker
+        text = editor.text()
+        self.saving[editor.file_path] = text
+        self.save_pipeline.save(editor.file_path, text)
+        return True
+
+    def on_file_saved(self, path, written):
+        text = self.saving.pop(path, None)
+        if text is None:
+            return
+        journal = get_swap_journal(self.cccore.settings_manager.get_value("app_data_dir"))
+        registry = self.cccore.editor_manager.registry
+        editor = registry.get(path)
+        if editor is None or sip.isdeleted(editor):
+            journal.end(path)  # the tab closed while the save ran; the file holds its text
+            return
+        if editor.text() == text:  # not edited again while the save was running
             editor.setModified(False)
-            index = self.cccore.editor_manager.current_window.tab_widget.indexOf(editor)
-            self.cccore.editor_manager.current_window.tab_widget.setTabText(index, os.path.basename(editor.file_path))
-        except Exception as e:
-            logging.error(f"Error saving file: {e}")
-            QMessageBox.critical(self.cccore.current_window, "Error", f"Could not save file: {e}")
+            journal.end(path)
+        window = registry.window_of(editor)
+        index = window.tab_widget.indexOf(editor) if window else -1
+        if index != -1:
+            window.tab_widget.setTabText(index, os.path.basename(path))
+
+    def on_save_failed(self, path, message):
+        if self.saving.pop(path, None) is None:
+            return  # not one of ours; whoever queued it reports the failure
+        QMessageBox.critical(self.cccore.current_window, "Error", f"Could not save file {path}: {message}")
 
     def save_file_as(self, editor=None):
         if editor is None:
@@ -101,6 +125,7 @@ class FileManager:
             return False
 
         editor.set_file_path(path)
+        self.cccore.editor_manager.registry.rename(editor, path)
         return self.save_file(editor)
 
     def close_tab(self, index):
@@ -117,6 +142,10 @@ class FileManager:
             elif reply == QMessageBox.StandardButton.Cancel:
                 return False
         self.cccore.editor_manager.current_window.tab_widget.removeTab(index)
+        self.cccore.editor_manager.registry.unregister(editor)
+        if not self.save_pipeline.is_pending(editor.file_path):
+            # Saved or discarded; a pending save ends the journal when it completes
+            get_swap_journal(self.cccore.settings_manager.get_value("app_data_dir")).end(editor.file_path)
         return True
     
     def create_fileset(self):
@@ -139,8 +168,8 @@ class FileManager:
         fileset_name, ok = QInputDialog.getItem(self.cccore.editor_manager.current_window, "Open Fileset", "Select a fileset:", filesets, 0, False)
         if ok and fileset_name:
             files = self.cccore.vault_manager.get_fileset(fileset_name)
-            for file_path in files:
-                self.open_file(file_path)
+            # Tabs are stubs until activated, so a big fileset opens as fast as one file
+            self.cccore.editor_manager.restore_tabs(files)
 
     def update_fileset(self):
         filesets = self.cccore.vault_manager.get_all_filesets()
@@ -195,9 +224,8 @@ class FileManager:
                 # Open the vault directory in the file explorer
                 self.cccore.widget_manager.file_explorer.set_root_path(vault_path)
                 
-                # Open the files from the fileset
-                for file_path in fileset:
-                    self.open_file(file_path)
+                # Open the files from the fileset, each read only once its tab is activated
+                self.cccore.editor_manager.restore_tabs(fileset)
                 
                 QMessageBox.information(self.cccore.editor_manager.current_window, "Success", f"Workspace '{workspace_name}' opened successfully.")
             else:
@@ -6,7 +6,7 @@ from PyQt6.QtGui import QAction
 from .action_handlers import ActionHandlers
 
 from PyQt6.QtWidgets import QMenuBar, QMenu
-from PyQt6.QtGui import QAction
+from PyQt6.QtGui import QAction, QKeySequence
 from .action_handlers import ActionHandlers
 
 import logging
@@ -114,6 +114,9 @@ class MenuManager:
         vault_menu.addAction("Add Vault Directory", self.action_handlers.add_vault_directory)
         vault_menu.addAction("Remove Vault Directory", self.action_handlers.remove_vault_directory)
         vault_menu.addAction("Set Default Vault", self.action_handlers.set_default_vault)
+        vault_menu.addAction("Find Duplicates", self.action_handlers.show_duplicates)
+        quick_open = vault_menu.addAction("Quick Open", self.action_handlers.show_quick_open)
+        quick_open.setShortcut(QKeySequence("Ctrl+P"))
         return vault_menu
 
     def create_workspace_menu(self):
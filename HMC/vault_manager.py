@@ -5,7 +5,17 @@ from pathlib import Path
 from DEV.workspace import Workspace
 import tempfile
 import logging
+import threading
 from PyQt6.QtCore import QObject, pyqtSignal
+from NITTY_GRITTY.ThreadTrackers import SafeQThread
+from NITTY_GRITTY.vault_indexer import VaultIndexer, entry_dir, build_file_types, schema_fingerprint
+from NITTY_GRITTY.index_extractors import EXTRACTORS, TEXT_TYPES, extractor_fingerprint, run_extractors, shutdown_pool
+from NITTY_GRITTY.content_search import search_content, SearchCache
+from NITTY_GRITTY.vault_index_db import VaultIndexDB, INDEX_DB_NAME
+from NITTY_GRITTY.vault_watcher import VaultWatcher
+from NITTY_GRITTY.federated_index import FederatedIndex, PathTrie
+from NITTY_GRITTY.duplicate_finder import DuplicateFinder
+from NITTY_GRITTY.fuzzy_finder import PathTable
 
 from .project_manager import Project
 #WORKSPACES IS UI RELATED, probably, filesets open?
@@ -28,7 +38,18 @@ class Vault:
         self.projects = {}
         self.workspaces = {}
         self.config_file = self.path / '.vault_config.json'
-        self.index_file = self.path / '.vault_index.json'
+        self.index_file = self.path / '.vault_index.json'  # legacy JSON index, migrated on load
+        self.index_db_file = self.path / INDEX_DB_NAME
+        self.index_db = None
+        self.index_types = {}  # per-vault {'.ext': type or None} overrides of the index schema
+        self.indexer = VaultIndexer(self.path)
+        # Serializes index writers (loader, watcher, hashing); readers go lock-free on the WAL database
+        self.index_lock = threading.RLock()
+        self._open_lock = threading.Lock()  # only guards the lazy creation of index_db
+        self.index_loaded = False
+        self.path_table = None  # PathTable for quick open, rebuilt when the index generation moves
+        self.search_cache = SearchCache()
+        self.watcher = None
         logging.info(f"Initializing Vault: {vault_name} at {path}")
         self.load_config()
 
@@ -44,14 +65,18 @@ class Vault:
             with open(self.config_file, 'r') as f:
                 config = json.load(f)
                 self.projects = config.get('projects', {})
+                self.index_types = config.get('index_types', {})
         else:
             self.save_config()
+        self.indexer = VaultIndexer(self.path, file_types=build_file_types(self.index_types))
 
     def save_config(self):
         config = {
             'name': self.name,
             'projects': self.projects
         }
+        if self.index_types:
+            config['index_types'] = self.index_types
         with open(self.config_file, 'w') as f:
             json.dump(config, f, indent=4)
 
@@ -72,24 +97,58 @@ class Vault:
     def get_workspace_names(self):
         return list(self.workspaces.keys())
 
-    def load_index(self):
+    def open_index(self):
+        """The vault's index database. Never waits on index_lock, so GUI-thread reads are
+        not held up by a running scan or watcher flush."""
+        index_db = self.index_db
+        if index_db is None:
+            with self._open_lock:
+                if self.index_db is None:
+                    self.index_db = VaultIndexDB(self.index_db_file)
+                index_db = self.index_db
+        return index_db
+
+    def load_index(self, progress=None, is_cancelled=None):
         logging.warning(f"Loading index for vault: {self.name}")
+        self.open_index()
         if self.index_file.exists():
-            with open(self.index_file, 'r') as f:
-                self.index = json.load(f)
+            self.migrate_json_index()
+        self.index_db.apply_extractors(extractor_fingerprint())
+        if self.index_db.apply_file_types(schema_fingerprint(self.indexer.file_types)) and self.index_db.get_dirs():
+            logging.warning(f"Index schema changed for vault: {self.name}. Relisting directories.")
+            self.update_index_python(progress=progress, is_cancelled=is_cancelled)
+        elif self.index_db.count_files() or self.index_db.get_dirs():
             logging.warning(f"Index loaded for vault: {self.name}")
         else:
-            logging.warning(f"Index file not found for vault: {self.name}. Updating index.")
-            self.update_index()
+            logging.warning(f"Index empty for vault: {self.name}. Updating index.")
+            self.update_index(progress=progress, is_cancelled=is_cancelled)
+        if is_cancelled and is_cancelled():
+            return
+        self.index_loaded = True
 
-    def update_index(self):
+    def migrate_json_index(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                legacy = json.load(f)
+            self.index_db.import_files(legacy.get('files', []) if isinstance(legacy, dict) else [])
+            self.index_file.unlink()
+            logging.info(f"Migrated {self.index_file} into {self.index_db_file}")
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to migrate JSON index for vault {self.name}: {e}")
+
+    def update_index(self, full=False, progress=None, is_cancelled=None):
+        self.open_index()
+        # Nix only does the first full build; after that the Python indexer is incremental
+        if self.index_db.count_files() or self.index_db.get_dirs():
+            self.update_index_python(full=full, progress=progress, is_cancelled=is_cancelled)
+            return
         try:
-            self.update_index_nix()
+            self.update_index_nix(is_cancelled=is_cancelled)
         except FileNotFoundError:
             logging.warning("Nix not found. Falling back to Python indexing.")
-            self.update_index_python()
+            self.update_index_python(progress=progress, is_cancelled=is_cancelled)
 
-    def update_index_nix(self):
+    def update_index_nix(self, is_cancelled=None):
         script_path = Path(__file__).parent.parent / 'NITTY_GRITTY' / 'index.nix'
         cmd = [
             str(self.cccore.env_manager.nix_portable_path),
@@ -98,36 +157,106 @@ class Vault:
             "--run",
             f"index-vault {self.path}"
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            self.index = json.loads(result.stdout)
-            self.save_index()
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=0.5)
+                break
+            except subprocess.TimeoutExpired:
+                if is_cancelled and is_cancelled():
+                    process.kill()
+                    process.communicate()
+                    return
+
+        if process.returncode == 0:
+            self.open_index().import_files(json.loads(stdout)['files'])
         else:
-            raise RuntimeError(f"Error updating index: {result.stderr}")
-
-    def update_index_python(self):
-        self.index = {'files': []}
-        for root, _, files in os.walk(self.path):
-            for file in files:
-                if file.endswith(('.md', '.txt', '.png', '.jpg', '.jpeg', '.gif')):
-                    file_path = Path(root) / file
-                    rel_path = file_path.relative_to(self.path)
-                    stat = file_path.stat()
-                    self.index['files'].append({
-                        'path': str(rel_path),
-                        'mtime': stat.st_mtime,
-                        'size': stat.st_size,
-                        'type': 'image' if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif')) else 'document'
-                    })
-        self.save_index()
-
-    def save_index(self):
-        with open(self.index_file, 'w') as f:
-            json.dump(self.index, f, indent=2)
+            raise RuntimeError(f"Error updating index: {stderr}")
+
+    def update_index_python(self, full=False, progress=None, is_cancelled=None):
+        with self.index_lock:
+            index_db = self.open_index()
+            # A full rescan still needs the known directories, to drop the ones now gone
+            result = self.indexer.scan(index_db.get_dirs(), progress=progress, force=full, is_cancelled=is_cancelled)
+            if result is None:
+                logging.info(f"Vault index update cancelled for {self.name}")
+                return
+            dirs, rescanned, removed = result
+            if rescanned or removed:
+                index_db.apply_scan(dirs, rescanned, removed)
+                logging.info(f"Vault index: rescanned {len(rescanned)} of {len(dirs)} directories, "
+                             f"dropped {len(removed)}")
+
+    def refresh_index_file(self, rel_path):
+        with self.index_lock:
+            entry = self.indexer.stat_file(rel_path)
+            if entry:
+                self.open_index().upsert_file(entry, entry_dir(rel_path))
+            else:
+                self.open_index().delete_file(rel_path)
+
+    def update_metadata(self, is_cancelled=None):
+        """Runs the per-type extractors over files whose metadata is missing or stale."""
+        index_db = self.open_index()
+        pending = index_db.pending_metadata(list(EXTRACTORS), TEXT_TYPES)
+        if pending:
+            def store(results, postings):
+                with self.index_lock:
+                    index_db.store_metadata(results, postings)
+            done = run_extractors(str(self.path), pending, store, is_cancelled=is_cancelled)
+            logging.info(f"Extracted metadata for {done} of {len(pending)} files in vault {self.name}")
+        with self.index_lock:
+            index_db.prune_metadata()
+        return len(pending)
+
+    def search_content(self, query, limit=None, is_cancelled=None, **options):
+        """Full-text search over the vault's text files, via the trigram index. `options`
+        are search_content()'s regex, case_sensitive, globs and max_bytes."""
+        return list(search_content(self, query, limit=limit, is_cancelled=is_cancelled, **options))
+
+    def get_path_table(self, refresh=True):
+        """The vault's paths packed for fuzzy matching. With refresh=False a stale table is
+        returned as is, so the GUI thread never waits on a rebuild."""
+        if refresh:
+            index_db = self.open_index()
+            if self.path_table is None or self.path_table.generation != index_db.generation():
+                self.path_table = PathTable.from_index(index_db)
+        return self.path_table
+
+    def get_file_metadata(self, rel_path):
+        return self.open_index().get_metadata(rel_path)
+
+    def get_symbols(self, rel_path):
+        return self.open_index().get_symbols(rel_path)
+
+    def find_symbols(self, name, kind=None, limit=100):
+        return self.open_index().find_symbols(name, kind=kind, limit=limit)
+
+    def get_backlinks(self, rel_path):
+        return self.open_index().get_backlinks(rel_path)
 
     def get_file_info(self, rel_path):
-        return next((f for f in self.index['files'] if f['path'] == rel_path), None)
+        return self.open_index().get_file(rel_path)
+
+    def get_recent_files(self, limit=50, file_type=None):
+        return self.open_index().recently_modified(limit=limit, file_type=file_type)
+
+    def get_files_by_type(self, file_type, limit=None, offset=0):
+        return self.open_index().get_files(file_type=file_type, limit=limit, offset=offset)
+
+    def get_index(self):
+        return {'files': self.open_index().get_files()}
+
+    def start_watching(self):
+        if self.watcher is None:
+            self.watcher = VaultWatcher(self)
+        self.watcher.start()
+        return self.watcher
+
+    def stop_watching(self):
+        if self.watcher:
+            self.watcher.stop()
+
     def add_project(self, project_name, project_path, language=None, version=None):
         project_path = Path(project_path)
         if not project_path.is_relative_to(self.path):
@@ -156,9 +285,44 @@ class Vault:
     
    
 
+class VaultIndexLoader(SafeQThread):
+    progress = pyqtSignal(str, int)  # vault_name, directories scanned
+    loaded = pyqtSignal(str, bool)  # vault_name, success
+    metadata_updated = pyqtSignal(str)  # vault_name
+
+    def __init__(self, vault):
+        super().__init__()
+        self.vault = vault
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            self.vault.load_index(progress=lambda count: self.progress.emit(self.vault.name, count),
+                                  is_cancelled=lambda: self._cancelled)
+            if self._cancelled:
+                return
+            self.loaded.emit(self.vault.name, True)
+        except Exception as e:
+            logging.error(f"Error loading index for vault {self.vault.name}: {e}")
+            self.loaded.emit(self.vault.name, False)
+            return
+        # The file index is usable already; extracted metadata fills in behind it
+        try:
+            if self.vault.update_metadata(is_cancelled=lambda: self._cancelled):
+                self.metadata_updated.emit(self.vault.name)
+        except Exception as e:
+            logging.error(f"Error extracting metadata for vault {self.vault.name}: {e}")
+
 class VaultManager(QObject):
     vault_changed = pyqtSignal(str)
     project_added = pyqtSignal(str, str) #vault_name, project_name
+    index_updated = pyqtSignal(str, int) #vault_name, index generation
+    index_progress = pyqtSignal(str, int) #vault_name, directories scanned
+    index_ready = pyqtSignal(str) #vault_name
+    metadata_updated = pyqtSignal(str) #vault_name
 
     def __init__(self, settings_manager, cccore):
         super().__init__()  # Initialize the QObject
@@ -170,6 +334,10 @@ class VaultManager(QObject):
         self.vaults_config_file = self.app_config_dir / "vaults_config.json"
         self.vaults = {}
         self.current_vault = None
+        self.index_loaders = {}
+        self.vault_trie = PathTrie()
+        self.federated_index = FederatedIndex(self)
+        self.duplicate_finder = DuplicateFinder(self.federated_index)
         logging.info(f"VaultManager initialized. Config file: {self.vaults_config_file}")
         self.load_vaults()
         self.ensure_default_vault()
@@ -323,17 +491,78 @@ class VaultManager(QObject):
             self.current_vault = self.vaults[current_vault_name]
             self.initialize_vault(self.current_vault)
 
-    def initialize_vault(self, vault):
+    def initialize_vault(self, vault, background=True):
+        """Activates a vault; the index is loaded/built on a worker unless background=False.
+
+        Widgets that need the index should listen for index_ready (or check is_index_ready).
+        """
         logging.info(f"Initializing vault: {vault.name} at {vault.path}")
         if not os.path.exists(vault.path):
             os.makedirs(vault.path)
             logging.info(f"Created vault directory: {vault.path}")
         vault.load_config()
-        vault.load_index()
+        if not background:
+            vault.load_index()
+            self.on_index_loaded(vault.name, True)
+            return
+        if vault.name in self.index_loaders:
+            return  # already loading; index_ready fires when done
+        loader = VaultIndexLoader(vault)
+        loader.progress.connect(self.index_progress)
+        loader.loaded.connect(self.on_index_loaded)
+        loader.metadata_updated.connect(self.metadata_updated)
+        loader.finished.connect(self.on_index_loader_finished)
+        self.index_loaders[vault.name] = loader
+        loader.start()
+
+    def on_index_loaded(self, vault_name, success):
+        vault = self.vaults.get(vault_name)
+        if not vault or not success:
+            return
+        if vault is self.current_vault:
+            self.watch_vault(vault)
         logging.info(f"Successfully initialized vault: {vault.name} at {vault.path}")
+        self.index_ready.emit(vault_name)
+
+    def on_index_loader_finished(self):
+        loader = self.sender()
+        if loader and self.index_loaders.get(loader.vault.name) is loader:
+            del self.index_loaders[loader.vault.name]
+
+    def is_index_ready(self, vault_name=None):
+        vault = self.vaults.get(vault_name) if vault_name else self.current_vault
+        return bool(vault and vault.index_loaded)
+
+    def watch_vault(self, vault):
+        """Keeps the vault's index live; only the active vault is watched."""
+        for other in self.vaults.values():
+            if other is not vault:
+                other.stop_watching()
+        if vault.watcher is None:
+            vault.start_watching().index_updated.connect(
+                lambda generation, name=vault.name: self.index_updated.emit(name, generation))
+        else:
+            vault.start_watching()
+
+    def shutdown(self):
+        for loader in list(self.index_loaders.values()):
+            loader.cancel()
+            # Scans, the nix build and extraction all check for cancellation, so this is short;
+            # a timed-out wait would leave the thread running into interpreter teardown
+            loader.wait()
+        for vault in self.vaults.values():
+            vault.stop_watching()
+        shutdown_pool()
+
+    def rebuild_vault_trie(self):
+        self.vault_trie = PathTrie()
+        for vault in self.vaults.values():
+            self.vault_trie.insert(vault.path, vault)
 
     def save_vaults_config(self):
         logging.info("Saving vaults configuration...")
+        # Every change to self.vaults is persisted here, so keep path lookups in step
+        self.rebuild_vault_trie()
         config = {
             'vaults': {name: str(vault.path) for name, vault in self.vaults.items()},
             'default': self.current_vault.name if self.current_vault else None
@@ -396,15 +625,31 @@ class VaultManager(QObject):
         return [vault.path for vault in self.vaults.values()]
 
     def get_vault_name(self, path):
-        for name, vault in self.vaults.items():
-            if vault.path == path:
-                return name
-        return None 
+        vault = self.vault_trie.get(path)
+        return vault.name if vault else None
     def get_vault_by_path(self, path):
-        for vault in self.vaults.values():
-            if vault.path == path:
-                return vault
+        vault = self.vault_trie.get(path)
+        if vault:
+            return vault
         return Vault(vault_name=f"{path.split('/')[-1]}_vault", path=path, cccore=self.cccore)
+
+    def find_vault_for_path(self, path):
+        """Returns the innermost registered vault containing `path`, or None."""
+        return self.vault_trie.longest_prefix(path)
+
+    def search_all_vaults(self, **query):
+        """Cross-vault file query; see FederatedIndex.search for the parameters."""
+        return self.federated_index.search(**query)
+
+    def find_duplicates(self, progress=None, is_cancelled=None):
+        """Hashes vault files as needed and returns cross-vault duplicate groups (blocking)."""
+        return self.duplicate_finder.scan(progress=progress, is_cancelled=is_cancelled)
+
+    def get_known_duplicates(self, abs_dir=None):
+        """Duplicate groups from stored hashes; limited to groups straddling `abs_dir` if given."""
+        if abs_dir:
+            return self.duplicate_finder.duplicates_under(abs_dir)
+        return self.duplicate_finder.cached_duplicates()
        
     def get_current_vault(self):
         if self.current_vault and isinstance(self.current_vault, Vault):
@@ -510,7 +755,7 @@ class VaultManager(QObject):
         vault_path = project_path.parent
 
         # Check if a vault already exists at this location
-        existing_vault = next((v for v in self.vaults.values() if v.path == vault_path), None)
+        existing_vault = self.vault_trie.get(vault_path)
         if existing_vault:
             vault_name = existing_vault.name
             new_vault = existing_vault
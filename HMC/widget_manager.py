@@ -33,6 +33,7 @@ from AuraText.auratext.Core.TabWidget import TabWidget
 import logging
 import traceback
 from GUX.file_search_widget import FileSearchWidget
+from GUX.duplicates_widget import DuplicatesWidget
 from HMC.project_manager import ManyProjectsManagerWidget
 class WidgetManager:
     def __init__(self, cccore):
@@ -321,6 +322,12 @@ class WidgetManager:
             self.file_search_widget.file_selected.connect(self.open_file_from_search)
         return self.file_search_dock
     
+    def DuplicatesWidget(self, cccore):
+        if 'duplicates' not in self.widgets:
+            self.widgets['duplicates'] = DuplicatesWidget(cccore.vault_manager)
+            self.widgets['duplicates'].file_selected.connect(self.open_file_from_search)
+        return self.widgets['duplicates']
+
     def FileExplorerWidget(self, cccore):
         logging.info(f"Creating FileExplorerWidget with cccore: {cccore}")
         if 'file_explorer' not in self.widgets:
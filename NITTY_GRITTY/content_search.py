@@ -0,0 +1,338 @@
+#content_search.py
+import os
+import re
+import mmap
+import time
+import logging
+import threading
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from PyQt6.QtCore import pyqtSignal
+from NITTY_GRITTY.ThreadTrackers import SafeQThread
+from NITTY_GRITTY.index_extractors import TEXT_TYPES, BINARY_SNIFF_BYTES, text_trigrams
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+# Hits are handed to the GUI in batches, at most this often, so a query matching
+# thousands of files does not flood the event loop with one signal per hit
+STREAM_INTERVAL = 0.05  # seconds
+SEARCH_MAX_BYTES = 64 * 1024 * 1024  # larger files are skipped
+PREVIEW_CHARS = 200
+SEARCH_CACHE_SIZE = 32  # completed searches kept per vault
+
+_REPEATS = tuple(op for op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+                               getattr(sre_constants, 'POSSESSIVE_REPEAT', None)) if op is not None)
+_ATOMIC_GROUP = getattr(sre_constants, 'ATOMIC_GROUP', None)
+# ASCII letters that re.IGNORECASE also matches to a non-ASCII character
+_UNICODE_CASE_PARTNERS = frozenset('iIkKsS')
+
+def compile_query(query, regex=False, case_sensitive=False):
+    """Compiles a search query; plain queries match literally. Raises re.error."""
+    flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+    return re.compile(query if regex else re.escape(query), flags)
+
+# --- literal prefilter ---------------------------------------------------------
+# A regex is reduced to an AND/OR tree of literal strings every match must contain,
+# e.g. 'foo(bar|baz)+qux' -> AND('foo', OR('bar', 'baz'), 'qux'). None means "no
+# constraint": anything the tree cannot express just widens the candidate set.
+
+def _all_of(parts):
+    parts = [part for part in parts if part is not None]
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else ('and', parts)
+
+def _any_of(parts):
+    if not parts or any(part is None for part in parts):
+        return None
+    return parts[0] if len(parts) == 1 else ('or', parts)
+
+def _sequence_literals(items):
+    parts = []
+    run = []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            parts.append(''.join(run))
+            run = []
+        if op is sre_constants.SUBPATTERN:
+            parts.append(_sequence_literals(av[-1]))
+        elif op in _REPEATS and av[0] >= 1:
+            parts.append(_sequence_literals(av[2]))
+        elif op is _ATOMIC_GROUP:
+            parts.append(_sequence_literals(av))
+        elif op is sre_constants.BRANCH:
+            parts.append(_any_of([_sequence_literals(branch) for branch in av[1]]))
+    if run:
+        parts.append(''.join(run))
+    # Runs shorter than a trigram constrain nothing
+    return _all_of([part for part in parts if not isinstance(part, str) or len(part.encode('utf-8')) >= 3])
+
+def required_literals(pattern):
+    """AND/OR tree of literals any match of the compiled `pattern` must contain, or None."""
+    try:
+        return _sequence_literals(sre_parse.parse(pattern.pattern, pattern.flags))
+    except (re.error, RecursionError):
+        return None
+
+def _tree_candidates(index_db, tree):
+    """Indexed paths that can satisfy `tree`, or None for every indexed file."""
+    if tree is None:
+        return None
+    if isinstance(tree, str):
+        return index_db.trigram_candidates(text_trigrams(tree.lower()))[0]
+    op, parts = tree
+    results = [_tree_candidates(index_db, part) for part in parts]
+    if op == 'and':
+        known = [result for result in results if result is not None]
+        return set.intersection(*sorted(known, key=len)) if known else None
+    if any(result is None for result in results):
+        return None
+    return set().union(*results)
+
+# --- globs -----------------------------------------------------------------------
+
+def glob_filter(globs):
+    """Path predicate for glob patterns like '*.py', 'src/**/*.md' or '!tests/*'.
+
+    A path must match one of the plain patterns (if any) and none of the '!' ones.
+    Patterns without a '/' are matched against the file name as well.
+    """
+    include = []
+    exclude = []
+    for glob in globs or ():
+        glob = glob.strip()
+        if glob:
+            target = exclude if glob.startswith('!') else include
+            target.append(glob.lstrip('!').replace('**/', ''))  # '*' already spans directories
+
+    def matches(pattern, rel_path):
+        return fnmatchcase(rel_path, pattern) or ('/' not in pattern and fnmatchcase(os.path.basename(rel_path), pattern))
+
+    def accept(rel_path):
+        if include and not any(matches(pattern, rel_path) for pattern in include):
+            return False
+        return not any(matches(pattern, rel_path) for pattern in exclude)
+    return accept
+
+# --- result cache ----------------------------------------------------------------
+
+class SearchCache:
+    """LRU of completed searches for one vault, keyed by (kind, query, options, index
+    generation). Any change to the index bumps its generation, so entries go stale on
+    their own; put() drops them."""
+    def __init__(self, size=SEARCH_CACHE_SIZE):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()  # searches run on worker threads
+
+    def get(self, key):
+        with self.lock:
+            hits = self.entries.get(key)
+            if hits is not None:
+                self.entries.move_to_end(key)
+            return hits
+
+    def put(self, key, hits):
+        generation = key[-1]
+        with self.lock:
+            for stale in [k for k in self.entries if k[-1] != generation]:
+                del self.entries[stale]
+            self.entries[key] = hits
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def refinement_base(self, kind, query, options, generation, case_sensitive):
+        """The smallest cached result of a literal query that `query` extends: every file
+        matching `query` also matches it, so only its hits need to be searched again."""
+        folded = query if case_sensitive else query.lower()
+        best = None
+        with self.lock:
+            for (k, cached_query, cached_options, cached_generation), hits in self.entries.items():
+                if k != kind or cached_options != options or cached_generation != generation:
+                    continue
+                if (cached_query if case_sensitive else cached_query.lower()) in folded:
+                    if best is None or len(hits) < len(best):
+                        best = hits
+        return best
+
+# --- matching --------------------------------------------------------------------
+
+def _bytes_pattern(pattern):
+    """The bytes equivalent of `pattern` when it is a plain ASCII literal, so it can run
+    on an mmap; None when only the str pattern gives the right (Unicode) semantics.
+    Classes, `.`, anchors and repeats behave differently on bytes, so they never qualify."""
+    if not pattern.pattern.isascii():
+        return None
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except (re.error, RecursionError):
+        return None
+    if not all(op is sre_constants.LITERAL for op, _ in parsed):
+        return None
+    literal = ''.join(chr(av) for _, av in parsed)
+    if pattern.flags & re.IGNORECASE and set(literal) & _UNICODE_CASE_PARTNERS:
+        return None  # 'k' also matches KELVIN SIGN, 's' LONG S, 'i' dotted/dotless I
+    return re.compile(re.escape(literal.encode('ascii')), pattern.flags & re.IGNORECASE)
+
+def _search_file(abs_path, pattern, byte_pattern, max_bytes):
+    """(line, preview) of the first match of `pattern` in the file, or None. Binary files
+    (a NUL in the first BINARY_SNIFF_BYTES) and files over `max_bytes` are skipped."""
+    size = os.path.getsize(abs_path)
+    if not size or size > max_bytes:
+        return None
+    with open(abs_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data.find(b'\0', 0, BINARY_SNIFF_BYTES) != -1:
+            return None
+        if byte_pattern is not None:
+            match = byte_pattern.search(data)
+            if not match:
+                return None
+            pos = match.start()
+            start = data.rfind(b'\n', 0, pos) + 1
+            end = data.find(b'\n', pos)
+            end = len(data) if end == -1 else end
+            line = data[:start].count(b'\n') + 1
+            return line, data[start:end].decode('utf-8', errors='replace').strip()[:PREVIEW_CHARS]
+        text = data[:].decode('utf-8', errors='replace')
+    match = pattern.search(text)
+    if not match:
+        return None
+    pos = match.start()
+    start = text.rfind('\n', 0, pos) + 1
+    end = text.find('\n', pos)
+    end = len(text) if end == -1 else end
+    return text.count('\n', 0, start) + 1, text[start:end].strip()[:PREVIEW_CHARS]
+
+def search_content(vault, query, limit=None, is_cancelled=None, regex=False, case_sensitive=False,
+                   globs=None, max_bytes=SEARCH_MAX_BYTES):
+    """Yields {'path', 'line', 'preview'} for the first match of `query` in each text
+    file of the vault, reading only the files the trigram index cannot rule out.
+
+    `query` is a literal (case-insensitive unless `case_sensitive`) or, with `regex`, a
+    Python regular expression; `globs` restricts the files searched (see glob_filter).
+    Candidates are the files satisfying the query's required literals, plus files too
+    large to index and files whose index entry is newer than their trigrams. Completed
+    searches are cached per index generation, and a literal query extending a cached
+    one only rechecks that query's hits.
+    """
+    if not query:
+        return
+    pattern = compile_query(query, regex, case_sensitive)
+    index_db = vault.open_index()
+    options = (regex, case_sensitive, tuple(globs or ()), max_bytes)
+    key = ('content', query, options, index_db.generation())
+    cached = vault.search_cache.get(key)
+    if cached is not None:
+        yield from cached[:limit] if limit else cached
+        return
+
+    base = None if regex else vault.search_cache.refinement_base(*key, case_sensitive)
+    if base is not None:
+        paths = [hit['path'] for hit in base]  # already glob-filtered and sorted
+    else:
+        accept = glob_filter(globs)
+        candidates = _tree_candidates(index_db, required_literals(pattern))
+        everything, unindexed = index_db.trigram_candidates(())
+        stale = {entry['path'] for entry in index_db.pending_metadata((), TEXT_TYPES)}
+        paths = [rel_path for rel_path in sorted((everything if candidates is None else candidates) | unindexed | stale)
+                 if accept(rel_path)]
+
+    byte_pattern = _bytes_pattern(pattern)
+    hits = []
+    for rel_path in paths:
+        if is_cancelled and is_cancelled():
+            return
+        try:
+            hit = _search_file(os.path.join(str(vault.path), rel_path), pattern, byte_pattern, max_bytes)
+        except (OSError, ValueError) as e:
+            logging.debug(f"Error reading file {rel_path}: {e}")
+            continue
+        if hit is None:
+            continue
+        hits.append({'path': rel_path, 'line': hit[0], 'preview': hit[1]})
+        yield hits[-1]
+        if limit and len(hits) >= limit:
+            return
+    # Only complete results are cached: a cut-short search would narrow wrongly
+    vault.search_cache.put(key, hits)
+
+def search_names(vault, query, regex=False, case_sensitive=False, globs=None):
+    """Paths whose file name contains `query` (or, with `regex`, whose path matches it),
+    restricted to `globs`; every path matching `globs` when `query` is empty."""
+    index_db = vault.open_index()
+    key = ('names', query, (regex, case_sensitive, tuple(globs or ())), index_db.generation())
+    cached = vault.search_cache.get(key)
+    if cached is not None:
+        return cached
+    accept = glob_filter(globs)
+    if query and not regex and not case_sensitive:
+        paths = [entry['path'] for entry in index_db.query(name=query, order='relevance')]
+    else:
+        paths = index_db.all_paths()
+        if query:
+            pattern = compile_query(query, regex, case_sensitive)
+            target = (lambda path: path) if regex else os.path.basename
+            paths = [path for path in paths if pattern.search(target(path))]
+    paths = [path for path in paths if accept(path)]
+    vault.search_cache.put(key, paths)
+    return paths
+
+class VaultSearchThread(SafeQThread):
+    """Runs a filename + content search off the GUI thread, streaming hits as they are found.
+
+    Every batch carries the search's `generation` so the receiver can drop batches from a
+    search it has already replaced; cancel() stops the search between files.
+    """
+    found = pyqtSignal(int, list)  # generation, [{'kind', 'path', 'line', 'preview'}]
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, vault, query, generation, regex=False, case_sensitive=False, globs=None):
+        super().__init__()
+        self.vault = vault
+        self.query = query
+        self.generation = generation
+        self.options = {'regex': regex, 'case_sensitive': case_sensitive, 'globs': globs}
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        try:
+            self._search()
+        except re.error as e:
+            self.failed.emit(self.generation, f"Invalid regular expression: {e}")
+        except Exception as e:
+            logging.error(f"Search for {self.query!r} in vault {self.vault.name} failed: {e}")
+            self.failed.emit(self.generation, str(e))
+
+    def _search(self):
+        names = [{'kind': 'filename', 'path': path, 'line': 0, 'preview': ''}
+                 for path in search_names(self.vault, self.query, **self.options)]
+        if self._cancelled:
+            return
+        if names:
+            self.found.emit(self.generation, names)
+        seen = {hit['path'] for hit in names}
+        batch = []
+        last_emit = time.monotonic()
+        for hit in search_content(self.vault, self.query, is_cancelled=self.is_cancelled, **self.options):
+            if hit['path'] in seen:
+                continue
+            batch.append(dict(hit, kind='content'))
+            if time.monotonic() - last_emit >= STREAM_INTERVAL:
+                self.found.emit(self.generation, batch)
+                batch = []
+                last_emit = time.monotonic()
+        if batch and not self._cancelled:
+            self.found.emit(self.generation, batch)
@@ -1,5 +1,7 @@
+import os
 import shutil
-from sqlalchemy import create_engine, Column, Integer, String
+import time
+from sqlalchemy import create_engine, Column, Integer, String, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import IntegrityError
@@ -25,6 +27,45 @@ class UserAction(Base):
     pressed_count = Column(Integer)
     command = Column(String(512))
 
+# Raw action executions. Rows only live until the compactor folds them into
+# ActionUsageHourly once their hour has completed.
+class ActionEvent(Base):
+    __tablename__ = 'action_events'
+
+    id = Column(Integer, primary_key=True)
+    action_name = Column(String, nullable=False)
+    timestamp = Column(Float, nullable=False)
+    duration = Column(Float, default=0.0)
+    exit_status = Column(Integer, default=0)
+
+    __table_args__ = (Index('ix_action_events_timestamp', 'timestamp'),)
+
+# Hourly and daily rollups share a shape: one row per (action, bucket start).
+# Hourly rows are moved into ActionUsageDaily once older than HOURLY_RETENTION_DAYS,
+# so the three usage tables never overlap and can simply be summed.
+class ActionUsageHourly(Base):
+    __tablename__ = 'action_usage_hourly'
+
+    action_name = Column(String, primary_key=True)
+    bucket_start = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0)
+    failures = Column(Integer, default=0)
+    total_duration = Column(Float, default=0.0)
+
+class ActionUsageDaily(Base):
+    __tablename__ = 'action_usage_daily'
+
+    action_name = Column(String, primary_key=True)
+    bucket_start = Column(Integer, primary_key=True)
+    count = Column(Integer, default=0)
+    failures = Column(Integer, default=0)
+    total_duration = Column(Float, default=0.0)
+
+HOUR = 3600
+DAY = 86400
+HOURLY_RETENTION_DAYS = 2
+DAILY_RETENTION_DAYS = 365
+
 # Create all tables in both seed and local databases (if they don't exist)
 Base.metadata.create_all(seed_engine)  # Ensure seed DB has the correct schema
 Base.metadata.create_all(local_engine)  # Ensure local DB has the correct schema
@@ -86,6 +127,31 @@ def copy_and_merge_seed_data():
         seed_db.close()
         local_db.close()
 
+def _bucket_start(timestamp, size):
+    """Floors a timestamp to the start of its hour/day bucket (UTC)."""
+    return int(timestamp // size * size)
+
+def _fold_into(db, model, rows, size):
+    """Adds (action_name, timestamp, count, failures, duration) rows into bucketed aggregates."""
+    buckets = {}
+    for action_name, timestamp, count, failures, duration in rows:
+        key = (action_name, _bucket_start(timestamp, size))
+        totals = buckets.setdefault(key, [0, 0, 0.0])
+        totals[0] += count
+        totals[1] += failures
+        totals[2] += duration or 0.0
+
+    for (action_name, bucket_start), (count, failures, duration) in buckets.items():
+        existing = db.get(model, (action_name, bucket_start))
+        if existing:
+            existing.count += count
+            existing.failures += failures
+            existing.total_duration += duration
+        else:
+            db.add(model(action_name=action_name, bucket_start=bucket_start, count=count,
+                         failures=failures, total_duration=duration))
+    return len(buckets)
+
 def setup_local_database():
     """Checks and sets up the local database by copying and merging from the seed database."""
     if not os.path.exists(LOCAL_DB_PATH):
@@ -180,4 +246,105 @@ class DatabaseManager:
             print(f"Error incrementing press count: {e}")
             return None
         finally:
-            db.close()
\ No newline at end of file
+            db.close()
+
+    def record_action_event(self, action_name, started_at, duration, exit_status=0):
+        """Appends one execution of an action to the raw usage event log."""
+        db = next(self.get_db())  # outside the try: a failure here has no session to close
+        try:
+            db.add(ActionEvent(action_name=action_name, timestamp=started_at,
+                               duration=duration, exit_status=exit_status))
+            db.commit()
+        except Exception as e:
+            print(f"Error recording action event: {e}")
+        finally:
+            db.close()
+
+    def compact_action_usage(self, now=None):
+        """Rolls completed hours of raw events into hourly buckets and old hourly buckets into daily ones.
+
+        Safe to call from a worker thread; every step moves rows between tables in a
+        single transaction so counts are never lost or doubled.
+        """
+        now = now or time.time()
+        hour_cutoff = _bucket_start(now, HOUR)
+        day_cutoff = _bucket_start(now, DAY) - HOURLY_RETENTION_DAYS * DAY
+        db = next(self.get_db())
+        try:
+            events = db.query(ActionEvent.action_name, ActionEvent.timestamp, ActionEvent.exit_status,
+                              ActionEvent.duration).filter(ActionEvent.timestamp < hour_cutoff).all()
+            if events:
+                _fold_into(db, ActionUsageHourly,
+                           ((name, ts, 1, 1 if status else 0, duration) for name, ts, status, duration in events),
+                           HOUR)
+                db.query(ActionEvent).filter(ActionEvent.timestamp < hour_cutoff).delete(synchronize_session=False)
+
+            hourly = db.query(ActionUsageHourly.action_name, ActionUsageHourly.bucket_start, ActionUsageHourly.count,
+                              ActionUsageHourly.failures, ActionUsageHourly.total_duration
+                              ).filter(ActionUsageHourly.bucket_start < day_cutoff).all()
+            if hourly:
+                _fold_into(db, ActionUsageDaily, hourly, DAY)
+                db.query(ActionUsageHourly).filter(ActionUsageHourly.bucket_start < day_cutoff).delete(synchronize_session=False)
+
+            db.query(ActionUsageDaily).filter(
+                ActionUsageDaily.bucket_start < day_cutoff - DAILY_RETENTION_DAYS * DAY
+            ).delete(synchronize_session=False)
+            db.commit()
+            return len(events), len(hourly)
+        except Exception as e:
+            db.rollback()
+            print(f"Error compacting action usage: {e}")
+            return 0, 0
+        finally:
+            db.close()
+
+    def _usage_since(self, db, since, action_name=None):
+        """Yields (action_name, bucket_start, count) from daily, hourly and raw usage since a timestamp."""
+        for model in (ActionUsageDaily, ActionUsageHourly):
+            query = db.query(model.action_name, model.bucket_start, model.count).filter(model.bucket_start >= since)
+            if action_name:
+                query = query.filter(model.action_name == action_name)
+            yield from query.all()
+
+        query = db.query(ActionEvent.action_name, ActionEvent.timestamp).filter(ActionEvent.timestamp >= since)
+        if action_name:
+            query = query.filter(ActionEvent.action_name == action_name)
+        for name, timestamp in query.all():
+            yield name, timestamp, 1
+
+    def get_most_used_actions(self, days=7, limit=10, now=None):
+        """Returns [(action_name, count)] for the last `days`, most used first, from pre-aggregated usage."""
+        since = _bucket_start((now or time.time()) - days * DAY, DAY)
+        try:
+            db = next(self.get_db())
+            totals = {}
+            for name, _, count in self._usage_since(db, since):
+                totals[name] = totals.get(name, 0) + count
+            return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+        except Exception as e:
+            print(f"Error retrieving action usage: {e}")
+            return []
+        finally:
+            db.close()
+
+    def get_action_trends(self, days=14, action_name=None, now=None):
+        """Returns {action_name: per-day counts, oldest first} over the last `days` days."""
+        today = _bucket_start(now or time.time(), DAY)
+        since = today - (days - 1) * DAY
+        trends = {}
+        try:
+            db = next(self.get_db())
+            for name, bucket_start, count in self._usage_since(db, since, action_name):
+                day = (_bucket_start(bucket_start, DAY) - since) // DAY
+                if day < days:
+                    trends.setdefault(name, [0] * days)[day] += count
+            return trends
+        except Exception as e:
+            print(f"Error retrieving action trends: {e}")
+            return trends
+        finally:
+            db.close()
+
+    def get_action_trend(self, action_name, days=14, now=None):
+        """Returns per-day execution counts for one action, oldest first."""
+        return self.get_action_trends(days, action_name, now).get(action_name, [0] * days)
@@ -0,0 +1,188 @@
+#duplicate_finder.py
+import os
+import hashlib
+import logging
+from collections import Counter, defaultdict
+from PyQt6.QtCore import pyqtSignal
+from NITTY_GRITTY.ThreadTrackers import SafeQThread
+
+# Bytes hashed from each end of a file for the partial hash. Files no larger than
+# twice this are read whole by the partial hash, so it doubles as their full hash.
+PARTIAL_BYTES = 64 * 1024
+READ_BYTES = 1024 * 1024
+PROGRESS_EVERY = 100  # files
+
+def _digest():
+    return hashlib.blake2b(digest_size=20)
+
+def partial_hash(abs_path, size):
+    digest = _digest()
+    with open(abs_path, 'rb') as f:
+        if size <= 2 * PARTIAL_BYTES:
+            digest.update(f.read())
+        else:
+            digest.update(f.read(PARTIAL_BYTES))
+            f.seek(-PARTIAL_BYTES, os.SEEK_END)
+            digest.update(f.read(PARTIAL_BYTES))
+    return digest.hexdigest()
+
+def full_hash(abs_path):
+    digest = _digest()
+    with open(abs_path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _group(size, content_hash, members):
+    return {
+        'size': size,
+        'hash': content_hash,
+        'wasted': size * (len(members) - 1),
+        'files': sorted(members, key=lambda m: (m['vault'], m['path'])),
+    }
+
+class DuplicateFinder:
+    """Finds files with identical content across every indexed vault.
+
+    Files are narrowed in three passes so most are never read in full: only sizes
+    shared by two or more files are considered, those are compared by a hash of
+    their first and last PARTIAL_BYTES, and only partial-hash collisions get a full
+    hash. Hashes are stored in each vault's index and reused until the file's
+    size or mtime changes.
+    """
+    def __init__(self, federated_index):
+        self.federated_index = federated_index
+
+    def scan(self, progress=None, is_cancelled=None):
+        """Hashes what is needed and returns duplicate groups, most wasted space first.
+
+        Each group is {'size', 'hash', 'wasted', 'files': [{'vault', 'path', 'abs_path'}]}.
+        `progress` is called with (stage, done, total); returns None if cancelled.
+        """
+        vaults = list(self.federated_index.searchable_vaults())
+        size_totals = Counter()
+        for vault in vaults:
+            size_totals.update(vault.open_index().size_counts())
+        sizes = [size for size, count in size_totals.items() if count > 1]
+
+        candidates = []
+        cached = {}
+        for vault in vaults:
+            index_db = vault.open_index()
+            entries = index_db.files_with_sizes(sizes)
+            cached[vault.name] = index_db.get_hashes(entry['path'] for entry in entries)
+            candidates.extend((vault, entry) for entry in entries)
+
+        updates = defaultdict(dict)  # vault name -> path -> hash row
+
+        def hash_row(vault, entry):
+            row = updates[vault.name].get(entry['path'])
+            if row is None:
+                row = dict(cached[vault.name].get(entry['path'], {}), path=entry['path'],
+                           size=entry['size'], mtime=entry['mtime'])
+            return row
+
+        by_partial = defaultdict(list)
+        for done, (vault, entry) in enumerate(candidates, 1):
+            if is_cancelled and is_cancelled():
+                self._store(vaults, updates)  # keep the work done so far
+                return None
+            row = hash_row(vault, entry)
+            if not row.get('partial_hash'):
+                try:
+                    row['partial_hash'] = partial_hash(os.path.join(str(vault.path), entry['path']), entry['size'])
+                except OSError as e:
+                    logging.debug(f"Skipping {entry['path']} in {vault.name}: {e}")
+                    continue
+                if entry['size'] <= 2 * PARTIAL_BYTES:
+                    row['full_hash'] = row['partial_hash']
+                updates[vault.name][entry['path']] = row
+            by_partial[(entry['size'], row['partial_hash'])].append((vault, entry))
+            if progress and done % PROGRESS_EVERY == 0:
+                progress('partial', done, len(candidates))
+
+        to_confirm = [member for members in by_partial.values() if len(members) > 1 for member in members]
+        by_full = defaultdict(list)
+        for done, (vault, entry) in enumerate(to_confirm, 1):
+            if is_cancelled and is_cancelled():
+                self._store(vaults, updates)
+                return None
+            row = hash_row(vault, entry)
+            if not row.get('full_hash'):
+                try:
+                    row['full_hash'] = full_hash(os.path.join(str(vault.path), entry['path']))
+                except OSError as e:
+                    logging.debug(f"Skipping {entry['path']} in {vault.name}: {e}")
+                    continue
+                updates[vault.name][entry['path']] = row
+            by_full[(entry['size'], row['full_hash'])].append(self._member(vault, entry['path']))
+            if progress and done % PROGRESS_EVERY == 0:
+                progress('full', done, len(to_confirm))
+
+        self._store(vaults, updates)
+        groups = [_group(size, content_hash, members)
+                  for (size, content_hash), members in by_full.items() if len(members) > 1]
+        return sorted(groups, key=lambda group: -group['wasted'])
+
+    def cached_duplicates(self):
+        """Duplicate groups from stored hashes only, without touching the filesystem.
+
+        Files changed or added since the last scan() are not considered.
+        """
+        by_full = defaultdict(list)
+        for vault in self.federated_index.searchable_vaults():
+            for path, size, content_hash in vault.open_index().hashed_files():
+                by_full[(size, content_hash)].append(self._member(vault, path))
+        groups = [_group(size, content_hash, members)
+                  for (size, content_hash), members in by_full.items() if len(members) > 1]
+        return sorted(groups, key=lambda group: -group['wasted'])
+
+    def duplicates_under(self, abs_dir, groups=None):
+        """Groups with at least one copy inside `abs_dir` and one outside it, e.g. to
+        decide what can be dropped before relocating a folder."""
+        prefix = os.path.join(os.path.abspath(abs_dir), '')
+        result = []
+        for group in self.cached_duplicates() if groups is None else groups:
+            inside = [m['abs_path'].startswith(prefix) for m in group['files']]
+            if any(inside) and not all(inside):
+                result.append(group)
+        return result
+
+    @staticmethod
+    def _member(vault, rel_path):
+        return {'vault': vault.name, 'path': rel_path, 'abs_path': os.path.join(str(vault.path), rel_path)}
+
+    @staticmethod
+    def _store(vaults, updates):
+        for vault in vaults:
+            rows = updates.get(vault.name)
+            if not rows:
+                continue
+            try:
+                with vault.index_lock:
+                    vault.open_index().store_hashes(rows.values())
+            except Exception as e:
+                logging.error(f"Could not store content hashes for vault {vault.name}: {e}")
+
+class DuplicateScanThread(SafeQThread):
+    progress = pyqtSignal(str, int, int)
+    found = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, finder):
+        super().__init__()
+        self.finder = finder
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            groups = self.finder.scan(progress=self.progress.emit, is_cancelled=lambda: self._cancelled)
+        except Exception as e:
+            logging.error(f"Duplicate scan failed: {e}")
+            self.failed.emit(str(e))
+            return
+        if groups is not None:
+            self.found.emit(groups)
@@ -0,0 +1,94 @@
+#federated_index.py
+import os
+import heapq
+import logging
+from itertools import islice
+
+def _path_parts(path):
+    normalized = os.path.normcase(os.path.abspath(str(path)))
+    drive, rest = os.path.splitdrive(normalized)
+    return [drive] + [part for part in rest.split(os.sep) if part]
+
+class PathTrie:
+    """Maps directory paths to values; longest_prefix() finds the innermost containing path."""
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, path, value):
+        node = self.root
+        for part in _path_parts(path):
+            node = node.setdefault(part, {})
+        node[None] = value  # None can never collide with a path component
+
+    def remove(self, path):
+        node = self.root
+        for part in _path_parts(path):
+            node = node.get(part)
+            if node is None:
+                return
+        node.pop(None, None)
+
+    def get(self, path):
+        node = self.root
+        for part in _path_parts(path):
+            node = node.get(part)
+            if node is None:
+                return None
+        return node.get(None)
+
+    def longest_prefix(self, path):
+        node = self.root
+        found = node.get(None)
+        for part in _path_parts(path):
+            node = node.get(part)
+            if node is None:
+                break
+            found = node.get(None, found)
+        return found
+
+SORT_KEYS = {
+    'mtime': lambda hit: -hit['mtime'],
+    'size': lambda hit: -hit['size'],
+    'name': lambda hit: (os.path.basename(hit['path']).lower(), hit['path']),
+    'relevance': lambda hit: (hit['rank'], -hit['mtime']),
+}
+
+class FederatedIndex:
+    """Queries every registered vault's index in one call and merges the results.
+
+    Vaults are queried through their on-disk index database, so a vault does not
+    need to be the active one (or even loaded this session) to be searched.
+    """
+    def __init__(self, vault_manager):
+        self.vault_manager = vault_manager
+
+    def searchable_vaults(self):
+        for vault in list(self.vault_manager.vaults.values()):
+            if vault.index_db is not None or vault.index_db_file.exists():
+                yield vault
+
+    def search(self, name=None, file_type=None, min_size=None, max_size=None, since=None,
+               order=None, page=0, page_size=50):
+        """Returns one page of hits across all vaults, best first.
+
+        Each hit is an index entry plus 'vault' (vault name) and 'abs_path'. `order`
+        defaults to 'relevance' when searching by name and 'mtime' otherwise.
+        """
+        order = order or ('relevance' if name else 'mtime')
+        needed = (page + 1) * page_size
+        per_vault = []
+        for vault in self.searchable_vaults():
+            try:
+                hits = vault.open_index().query(name=name, file_type=file_type, min_size=min_size,
+                                                max_size=max_size, since=since, order=order, limit=needed)
+            except Exception as e:
+                logging.error(f"Federated query failed for vault {vault.name}: {e}")
+                continue
+            for hit in hits:
+                hit['vault'] = vault.name
+                hit['abs_path'] = os.path.join(str(vault.path), hit['path'])
+            per_vault.append(hits)
+
+        # Each vault's hits are already sorted, so a k-way merge gives the global order
+        merged = heapq.merge(*per_vault, key=SORT_KEYS[order])
+        return list(islice(merged, page * page_size, needed))
@@ -0,0 +1,146 @@
+#file_saver.py
+import os
+import hashlib
+import logging
+import tempfile
+from PyQt6.QtCore import QObject, QCoreApplication, pyqtSignal
+from NITTY_GRITTY.ThreadTrackers import SafeQThread
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def atomic_write(path, data):
+    """Writes `data` to a temp file next to `path`, fsyncs it and renames it over `path`,
+    so a crash leaves either the old file or the new one, never a truncated mix."""
+    path = os.path.realpath(path)  # replace a symlink's target, not the link
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+class SaveWorker(SafeQThread):
+    """Writes one batch of (path, text) snapshots, skipping files whose bytes are unchanged."""
+    saved = pyqtSignal(str, object, bool)  # path, (hash, mtime_ns, size) record, written
+    failed = pyqtSignal(str, str)  # path, error
+
+    def __init__(self, batch, records):
+        super().__init__()
+        self.batch = batch
+        self.records = records
+
+    def run(self):
+        for path, text in self.batch.items():
+            try:
+                data = text.encode('utf-8')
+                digest = content_hash(data)
+                if digest == self.disk_hash(path, len(data)):
+                    self.saved.emit(path, self.record(path, digest), False)
+                    continue
+                atomic_write(path, data)
+                self.saved.emit(path, self.record(path, digest), True)
+            except Exception as e:
+                logging.error(f"Error saving {path}: {e}")
+                self.failed.emit(path, str(e))
+
+    @staticmethod
+    def record(path, digest):
+        stat = os.stat(path)
+        return (digest, stat.st_mtime_ns, stat.st_size)
+
+    def disk_hash(self, path, size):
+        """Hash of the file on disk: remembered if the file is untouched since we last saw
+        it, otherwise read, and only if it could possibly match."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size != size:
+            return None
+        record = self.records.get(path)
+        if record and record[1:] == (stat.st_mtime_ns, stat.st_size):
+            return record[0]
+        with open(path, 'rb') as file:
+            return content_hash(file.read())
+
+class SavePipeline(QObject):
+    """Saves text snapshots in the background, one batch at a time.
+
+    Snapshots queued while a batch is being written are merged, newest text per path
+    winning, and go out together in the next batch. Pending saves are flushed when the
+    application quits.
+    """
+    saved = pyqtSignal(str, bool)  # path, written
+    failed = pyqtSignal(str, str)  # path, error
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = {}  # path -> text
+        self.records = {}  # path -> (hash, mtime_ns, size) of the file as last saved
+        self.worker = None
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.flush)
+
+    def save(self, path, text):
+        self.save_batch({path: text})
+
+    def save_batch(self, snapshots):
+        self.pending.update(snapshots)
+        if not self.worker:
+            self._start_batch()
+
+    def is_pending(self, path):
+        return path in self.pending or bool(self.worker and path in self.worker.batch)
+
+    def _start_batch(self):
+        batch, self.pending = self.pending, {}
+        self.worker = SaveWorker(batch, dict(self.records))
+        self.worker.saved.connect(self._on_saved)
+        self.worker.failed.connect(self.failed)
+        self.worker.finished.connect(self._on_batch_finished)
+        self.worker.start()
+
+    def _on_saved(self, path, record, written):
+        self.records[path] = record
+        self.saved.emit(path, written)
+
+    def _on_batch_finished(self):
+        self.worker.deleteLater()
+        self.worker = None
+        if self.pending:
+            self._start_batch()
+
+    def flush(self):
+        """Blocks until every queued snapshot is on disk."""
+        while self.worker or self.pending:
+            if self.worker:
+                self.worker.wait()
+                QCoreApplication.processEvents()  # delivers saved/finished, starting the next batch
+            else:
+                self._start_batch()
+
+_save_pipeline = None
+
+def get_save_pipeline():
+    """The application-wide SavePipeline, so two views of a file never race on disk."""
+    global _save_pipeline
+    if _save_pipeline is None:
+        _save_pipeline = SavePipeline()
+    return _save_pipeline
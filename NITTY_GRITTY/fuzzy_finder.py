@@ -0,0 +1,210 @@
+#fuzzy_finder.py
+import re
+import time
+import heapq
+from array import array
+from bisect import bisect_right
+
+# fzf-style scoring: every matched character scores SCORE_MATCH plus a bonus for where
+# it lands; gaps between matched characters cost GAP_START + GAP_EXTENSION per extra char
+SCORE_MATCH = 16
+GAP_START = -3
+GAP_EXTENSION = -1
+BONUS_BOUNDARY = 8  # first char of the path or of a path component / word
+BONUS_CAMEL = 7  # fooBar, foo2
+BONUS_CONSECUTIVE = 4
+FIRST_CHAR_MULTIPLIER = 2
+SEPARATORS = frozenset('/\\_-. ')
+
+MAX_QUERY = 64  # characters; longer queries are truncated
+CHUNK_LINES = 1024  # paths scanned between deadline checks
+NARROW_RATIO = 10
+FRAME_BUDGET = 0.008  # seconds of matching per step() call, half a 60Hz frame
+
+class PathTable:
+    """All paths of one vault index generation, packed into two newline-joined strings.
+
+    Path k is blob[offsets[k]:offsets[k + 1] - 1]; `lowered` is the case-folded copy the
+    matcher scans. A 500k-file vault takes two strings and one int array instead of
+    half a million path objects.
+    """
+    def __init__(self, paths, generation=0):
+        self.generation = generation
+        self.blob = '\n'.join(paths) + '\n' if paths else ''
+        lowered = self.blob.lower()
+        # Case folding can change lengths (e.g. 'İ'); positions must line up with blob
+        self.lowered = lowered if len(lowered) == len(self.blob) else ''.join(
+            c.lower() if len(c.lower()) == 1 else c for c in self.blob)
+        self.offsets = array('q', [0])
+        for path in paths:
+            self.offsets.append(self.offsets[-1] + len(path) + 1)
+
+    @classmethod
+    def from_index(cls, index_db):
+        generation = index_db.generation()
+        return cls(index_db.all_paths(), generation)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def path(self, k):
+        return self.blob[self.offsets[k]:self.offsets[k + 1] - 1]
+
+def _prefilter(query):
+    """Finds the first line containing `query` as a subsequence. Starting with a literal
+    lets the regex engine skip ahead to candidate characters instead of trying every
+    line, and `[^\\nc]*c` can only stop at the next c, so a failing line costs one pass."""
+    rest = ''.join(f'[^\\n{re.escape(c)}]*{re.escape(c)}' for c in query[1:])
+    return re.compile(f'{re.escape(query[0])}{rest}')
+
+def _pattern(query):
+    """Matches a whole line containing `query` as a subsequence, capturing each matched
+    char. The optional greedy `[^\\n]*/` prefix makes the match start in the last path
+    component it fits in, so 'main' prefers src/main.py over src/machine/info.
+    """
+    segments = ''.join(f'[^\\n{re.escape(c)}]*({re.escape(c)})' for c in query)
+    return re.compile(f'(?:[^\\n]*/)?{segments}')
+
+def _best_score(length):
+    """Upper bound of _score() for a query of `length` characters."""
+    return SCORE_MATCH * length + BONUS_BOUNDARY * FIRST_CHAR_MULTIPLIER + BONUS_BOUNDARY * (length - 1)
+
+def _bonus(blob, line_start, pos):
+    if pos == line_start:
+        return BONUS_BOUNDARY
+    prev = blob[pos - 1]
+    if prev in SEPARATORS:
+        return BONUS_BOUNDARY
+    char = blob[pos]
+    if (prev.islower() and char.isupper()) or (not prev.isdigit() and char.isdigit()):
+        return BONUS_CAMEL
+    return 0
+
+def _score(blob, line_start, positions):
+    score = 0
+    prev = None
+    for pos in positions:
+        bonus = _bonus(blob, line_start, pos)
+        if prev is None:
+            score += SCORE_MATCH + bonus * FIRST_CHAR_MULTIPLIER
+        elif pos == prev + 1:
+            score += SCORE_MATCH + max(bonus, BONUS_CONSECUTIVE)
+        else:
+            score += SCORE_MATCH + bonus + GAP_START + GAP_EXTENSION * (pos - prev - 2)
+        prev = pos
+    return score
+
+class FuzzySearch:
+    """Incremental top-N fuzzy match of `query` against a PathTable.
+
+    step() matches for at most `budget` seconds and returns True once every path has
+    been seen, so a UI can show results() after each frame and keep going on the next.
+    If `previous` is a finished search of a prefix of `query` on the same table, only
+    its matches are rescanned (typing narrows, it never widens) when they are few enough.
+    """
+    def __init__(self, table, query, limit=50, previous=None):
+        self.table = table
+        self.query = ''.join(query.split()).lower()[:MAX_QUERY]
+        self.limit = limit
+        self.prefilter = _prefilter(self.query) if self.query else None
+        self.pattern = _pattern(self.query) if self.query else None
+        self.best_score = _best_score(len(self.query))
+        self.heap = []  # (score, -length, -line) min-heap of the best `limit` hits
+        self.matched = array('q')  # every matching line, for narrowing the next query
+        self.done = False
+        # A line-by-line rescan costs a few times more per path than the regex skipping
+        # through the table, so it only pays off once the previous query has narrowed enough
+        if (previous and previous.done and previous.table is table and previous.query
+                and self.query.startswith(previous.query)
+                and len(previous.matched) * NARROW_RATIO < len(table)):
+            self.candidates = previous.matched
+        else:
+            self.candidates = None  # scan the whole table
+        self.cursor = 0
+
+    def step(self, budget=FRAME_BUDGET):
+        if self.done:
+            return True
+        if not self.pattern:
+            # Empty query: the table in index order
+            self.matched = array('q', range(len(self.table)))
+            self.done = True
+            return True
+        deadline = time.perf_counter() + budget
+        while not self.done and time.perf_counter() < deadline:
+            if self.candidates is None:
+                self._scan_chunk()
+            else:
+                self._scan_candidates()
+        return self.done
+
+    def _scan_chunk(self):
+        table = self.table
+        offsets = table.offsets
+        search = self.prefilter.search
+        last = min(self.cursor + CHUNK_LINES, len(table))
+        pos, end = offsets[self.cursor], offsets[last]
+        line = self.cursor
+        while True:
+            match = search(table.lowered, pos, end)
+            if not match:
+                break
+            line = bisect_right(offsets, match.start(), line) - 1
+            self._add(line)
+            pos = offsets[line + 1]  # one hit per line
+        self.cursor = last
+        self.done = last >= len(table)
+
+    def _scan_candidates(self):
+        table = self.table
+        offsets = table.offsets
+        search = self.prefilter.search
+        stop = min(self.cursor + CHUNK_LINES, len(self.candidates))
+        for line in self.candidates[self.cursor:stop]:
+            if search(table.lowered, offsets[line], offsets[line + 1]):
+                self._add(line)
+        self.cursor = stop
+        self.done = stop >= len(self.candidates)
+
+    def _add(self, line):
+        self.matched.append(line)
+        offsets = self.table.offsets
+        start, end = offsets[line], offsets[line + 1]
+        heap = self.heap
+        if len(heap) == self.limit:
+            worst = heap[0]
+            # Once the heap is full of perfect scores only shorter paths can get in
+            if worst[0] == self.best_score and start - end <= worst[1]:
+                return
+        match = self.pattern.match(self.table.lowered, start, end)
+        positions = [match.start(i) for i in range(1, len(self.query) + 1)]
+        item = (_score(self.table.blob, start, positions), start - end, -line)
+        if len(heap) < self.limit:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    def results(self):
+        """Best hits so far as [{'path', 'score', 'positions'}], best first.
+
+        `positions` are indexes into 'path' of the matched characters, for highlighting.
+        """
+        table = self.table
+        if not self.pattern:
+            return [{'path': table.path(line), 'score': 0, 'positions': []}
+                    for line in self.matched[:self.limit]]
+        hits = []
+        for score, _, neg_line in sorted(self.heap, reverse=True):
+            line = -neg_line
+            start = table.offsets[line]
+            match = self.pattern.match(table.lowered, start, table.offsets[line + 1])
+            positions = [match.start(i) - start for i in range(1, len(self.query) + 1)]
+            hits.append({'path': table.path(line), 'score': score, 'positions': positions})
+        return hits
+
+def fuzzy_find(table, query, limit=50):
+    """Runs a FuzzySearch to completion and returns its results."""
+    search = FuzzySearch(table, query, limit)
+    while not search.step(budget=1.0):
+        pass
+    return search.results()
@@ -0,0 +1,385 @@
+#index_extractors.py
+"""Per-type metadata extractors for the vault index.
+
+Each extractor takes (absolute path, vault-relative path) and returns a
+JSON-serialisable dict. The keys 'symbols' ([{'name', 'kind', 'line'}]) and
+'links' ([target]) are stored in their own index tables; everything else is
+kept as the file's metadata blob. Text files additionally get 'trigrams',
+which extract_batch turns into the batch's full-text posting lists.
+This module is imported by pool worker processes, so it must not import Qt.
+"""
+import os
+import re
+import ast
+import wave
+import struct
+import logging
+import multiprocessing
+import numpy as np
+from urllib.parse import unquote
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+EXTRACTORS = {}  # extension -> (function, version)
+MAX_TEXT_BYTES = 4 * 1024 * 1024  # larger text files are not parsed
+# Files of these index types also get their content trigrams indexed for full-text search
+TEXT_TYPES = ('document', 'code')
+TRIGRAM_MAX_BYTES = 2 * 1024 * 1024  # larger files stay searchable, but are always read
+TRIGRAM_VERSION = 1
+BINARY_SNIFF_BYTES = 8192
+# Pool round trips cost more than parsing a handful of files, so small batches
+# (typically a watcher flush) run inline in the calling thread.
+INLINE_LIMIT = 16
+BATCH_SIZE = 64
+EXTRACT_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))
+
+_pool = None
+
+def register_extractor(extensions, version=1):
+    """Registers the decorated function for `extensions`. Bump `version` when its output
+    changes so stored metadata is re-extracted."""
+    def decorator(function):
+        for ext in extensions:
+            EXTRACTORS[ext] = (function, version)
+        return function
+    return decorator
+
+def extractor_fingerprint():
+    return ','.join([f'{ext}:{function.__name__}:{version}'
+                     for ext, (function, version) in sorted(EXTRACTORS.items())]
+                    + [f'trigrams:{TRIGRAM_VERSION}'])
+
+def text_trigrams(text):
+    """Sorted trigram keys of the case-folded text: every 3-byte window of its UTF-8
+    encoding, packed into 24 bits. Search folds and encodes the query the same way, so
+    a substring match always shares all of its trigrams."""
+    data = np.frombuffer(text.lower().encode('utf-8'), dtype=np.uint8).astype(np.uint32)
+    if len(data) < 3:
+        return np.empty(0, dtype=np.uint32)
+    return np.unique((data[:-2] << 16) | (data[1:-1] << 8) | data[2:])
+
+def content_trigrams(abs_path):
+    """Returns trigram keys, None if the file is too large to index, or False if it is binary."""
+    if os.path.getsize(abs_path) > TRIGRAM_MAX_BYTES:
+        return None
+    with open(abs_path, 'rb') as f:
+        raw = f.read()
+    if b'\0' in raw[:BINARY_SNIFF_BYTES]:
+        return False
+    return text_trigrams(raw.decode('utf-8', errors='replace'))
+
+def extract(root, rel_path, file_type=None):
+    abs_path = os.path.join(root, rel_path)
+    data = {}
+    found = EXTRACTORS.get(os.path.splitext(rel_path)[1].lower())
+    try:
+        if found:
+            data = found[0](abs_path, rel_path)
+        if file_type in TEXT_TYPES:
+            trigrams = content_trigrams(abs_path)
+            if trigrams is not False:
+                data['trigrams'] = trigrams
+    except Exception as e:
+        # One unreadable or malformed file must not fail the batch; store it as empty
+        logging.debug(f"Extractor failed for {abs_path}: {e}")
+        return {'error': str(e)}
+    return data
+
+def extract_batch(root, entries):
+    """Pool task: returns ([(entry, data)], postings) for a batch of index entries under `root`.
+
+    Trigrams are inverted here, off the indexing thread: `postings` is a sorted list of
+    (trigram, packed uint32 positions) for the batch's text files, and each of those files
+    has data['trigrams'] = True, numbered in result order. Files too large to index keep
+    data['trigrams'] = None.
+    """
+    results = []
+    keys = []
+    positions = []
+    for entry in entries:
+        data = extract(root, entry['path'], entry.get('type'))
+        if data.get('trigrams') is not None:
+            keys.append(data['trigrams'])
+            positions.append(np.full(len(data['trigrams']), len(keys) - 1, dtype=np.uint32))
+            data['trigrams'] = True
+        results.append((entry, data))
+    if not keys:
+        return results, []
+    keys = np.concatenate(keys)
+    positions = np.concatenate(positions)
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    positions = positions[order]
+    trigrams, starts = np.unique(keys, return_index=True)
+    return results, [(trigram, chunk.tobytes())
+                     for trigram, chunk in zip(trigrams.tolist(), np.split(positions, starts[1:]))]
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs Qt and indexer threads is not safe
+        _pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+    return _pool
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def run_extractors(root, entries, store, is_cancelled=None):
+    """Extracts metadata for `entries`, handing each finished batch to `store(results, postings)`
+    so results land in the index incrementally. Returns the number of files processed."""
+    batches = [entries[i:i + BATCH_SIZE] for i in range(0, len(entries), BATCH_SIZE)]
+    if len(entries) <= INLINE_LIMIT:
+        for batch in batches:
+            store(*extract_batch(root, batch))
+        return len(entries)
+
+    done = 0
+    futures = [_get_pool().submit(extract_batch, root, batch) for batch in batches]
+    try:
+        for future in as_completed(futures):
+            if is_cancelled and is_cancelled():
+                break
+            results, postings = future.result()
+            store(results, postings)
+            done += len(results)
+    finally:
+        for future in futures:
+            future.cancel()
+    return done
+
+def _read_text(abs_path):
+    if os.path.getsize(abs_path) > MAX_TEXT_BYTES:
+        return None
+    with open(abs_path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+# --- code -----------------------------------------------------------------
+
+@register_extractor(('.py',))
+def python_symbols(abs_path, rel_path):
+    text = _read_text(abs_path)
+    if text is None:
+        return {}
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return regex_symbols(abs_path, rel_path)
+    symbols = []
+
+    def visit(body, in_class):
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                symbols.append({'name': node.name, 'kind': 'class', 'line': node.lineno})
+                visit(node.body, True)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append({'name': node.name, 'kind': 'method' if in_class else 'function',
+                                'line': node.lineno})
+    visit(tree.body, False)
+    return {'symbols': symbols, 'lines': text.count('\n') + 1}
+
+SYMBOL_PATTERNS = [
+    (re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)'), 'function'),
+    (re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?(?:public\s+|private\s+)?class\s+([A-Za-z_$][\w$]*)'), 'class'),
+    (re.compile(r'^\s*(?:export\s+)?(?:interface|trait|protocol)\s+([A-Za-z_]\w*)'), 'interface'),
+    (re.compile(r'^func\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)'), 'function'),
+    (re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:fn|def|defp)\s+([A-Za-z_]\w*[!?]?)'), 'function'),
+    (re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|union|defmodule|module|type)\s+([A-Za-z_][\w.]*)'), 'type'),
+    (re.compile(r'^\s*(?:local\s+)?function\s+([A-Za-z_][\w.:]*)'), 'function'),
+]
+
+@register_extractor(('.js', '.jsx', '.ts', '.tsx', '.java', '.kt', '.c', '.h', '.cpp', '.hpp', '.cs',
+                     '.go', '.rs', '.rb', '.php', '.lua', '.sh', '.zig', '.ex', '.exs'))
+def regex_symbols(abs_path, rel_path):
+    """Line-based symbol scan for languages without a parser in the standard library."""
+    text = _read_text(abs_path)
+    if text is None:
+        return {}
+    symbols = []
+    lines = text.splitlines()
+    for number, line in enumerate(lines, 1):
+        for pattern, kind in SYMBOL_PATTERNS:
+            match = pattern.match(line)
+            if match:
+                symbols.append({'name': match.group(1), 'kind': kind, 'line': number})
+                break
+    return {'symbols': symbols, 'lines': len(lines)}
+
+# --- markdown ---------------------------------------------------------------
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+LINK_RE = re.compile(r'(?<!!)\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+IMAGE_LINK_RE = re.compile(r'!\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+"[^"]*")?\s*\)')
+WIKILINK_RE = re.compile(r'!?\[\[([^\]|#]+)(?:#[^\]|]*)?(?:\|[^\]]*)?\]\]')
+SCHEME_RE = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*:')
+
+def _resolve_link(rel_dir, target):
+    """Vault-relative path for a relative or vault-absolute (/...) link target."""
+    target = unquote(target.split('#', 1)[0])
+    if not target:
+        return None
+    if target.startswith('/'):
+        return os.path.normpath(target.lstrip('/'))
+    return os.path.normpath(os.path.join(rel_dir, target))
+
+@register_extractor(('.md',))
+def markdown_outline(abs_path, rel_path):
+    text = _read_text(abs_path)
+    if text is None:
+        return {}
+    headings = []
+    links = set()
+    images = set()
+    external = 0
+    in_fence = False
+    rel_dir = os.path.dirname(rel_path)
+    for number, line in enumerate(text.splitlines(), 1):
+        if line.lstrip().startswith(('```', '~~~')):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        match = HEADING_RE.match(line)
+        if match:
+            headings.append({'level': len(match.group(1)), 'text': match.group(2), 'line': number})
+        for target in LINK_RE.findall(line):
+            if SCHEME_RE.match(target):
+                external += 1
+            elif _resolve_link(rel_dir, target):
+                links.add(_resolve_link(rel_dir, target))
+        images.update(filter(None, (_resolve_link(rel_dir, target) for target in IMAGE_LINK_RE.findall(line)
+                                    if not SCHEME_RE.match(target))))
+        links.update(name.strip() for name in WIKILINK_RE.findall(line))
+    return {'headings': headings, 'links': sorted(links), 'images': sorted(images),
+            'external_links': external, 'words': len(text.split())}
+
+# --- images ---------------------------------------------------------------
+
+def _jpeg_size(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+        length = struct.unpack('>H', f.read(2))[0]
+        # SOF0..SOF15 carry the frame size, except DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack('>xHH', f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+@register_extractor(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'))
+def image_dimensions(abs_path, rel_path):
+    """Reads width/height from the file header without decoding the image."""
+    with open(abs_path, 'rb') as f:
+        head = f.read(32)
+        size = None
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            size = struct.unpack('>II', head[16:24])
+        elif head[:6] in (b'GIF87a', b'GIF89a'):
+            size = struct.unpack('<HH', head[6:10])
+        elif head.startswith(b'BM'):
+            width, height = struct.unpack('<ii', head[18:26])
+            size = (width, abs(height))
+        elif head.startswith(b'\xff\xd8'):
+            size = _jpeg_size(f)
+        elif head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                size = (width & 0x3FFF, height & 0x3FFF)
+            elif chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                size = ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+            elif chunk == b'VP8X':
+                size = (int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1)
+    if not size:
+        return {}
+    return {'width': size[0], 'height': size[1]}
+
+# --- audio ----------------------------------------------------------------
+
+MP3_BITRATES = {  # kbps, MPEG-1 / MPEG-2(.5) layer III
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+def _mp3_duration(f, file_size):
+    head = f.read(10)
+    offset = 0
+    if head.startswith(b'ID3'):
+        offset = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+    f.seek(offset)
+    data = f.read(64 * 1024)
+    sync = next((i for i in range(len(data) - 4) if data[i] == 0xFF and data[i + 1] & 0xE0 == 0xE0), None)
+    if sync is None:
+        return None
+    header = int.from_bytes(data[sync:sync + 4], 'big')
+    version_bits = (header >> 19) & 3
+    if version_bits == 1 or ((header >> 17) & 3) != 1:  # reserved version, or not layer III
+        return None
+    version = 1 if version_bits == 3 else 2
+    bitrate = MP3_BITRATES[version][(header >> 12) & 0xF] * 1000
+    rates = MP3_SAMPLE_RATES[version_bits]
+    rate_index = (header >> 10) & 3
+    if not bitrate or rate_index == 3:
+        return None
+    sample_rate = rates[rate_index]
+    samples_per_frame = 1152 if version == 1 else 576
+    # VBR files carry the frame count in a Xing/Info header inside the first frame
+    for tag in (b'Xing', b'Info'):
+        pos = data.find(tag, sync, sync + 64)
+        if pos != -1 and int.from_bytes(data[pos + 4:pos + 8], 'big') & 1:
+            frames = int.from_bytes(data[pos + 8:pos + 12], 'big')
+            return frames * samples_per_frame / sample_rate
+    return (file_size - offset - sync) * 8 / bitrate
+
+def _flac_duration(f):
+    f.seek(4)
+    block = f.read(4 + 34)
+    if len(block) < 38 or block[0] & 0x7F != 0:  # first block must be STREAMINFO
+        return None
+    bits = int.from_bytes(block[4 + 10:4 + 18], 'big')
+    sample_rate = bits >> 44
+    total_samples = bits & 0xFFFFFFFFF
+    return total_samples / sample_rate if sample_rate else None
+
+def _ogg_duration(f, file_size):
+    head = f.read(64)
+    pos = head.find(b'\x01vorbis')
+    if pos == -1:
+        return None
+    sample_rate = struct.unpack('<I', head[pos + 12:pos + 16])[0]
+    f.seek(max(0, file_size - 64 * 1024))
+    tail = f.read()
+    last = tail.rfind(b'OggS')
+    if last == -1 or not sample_rate:
+        return None
+    granule = struct.unpack('<q', tail[last + 6:last + 14])[0]
+    return granule / sample_rate
+
+@register_extractor(('.mp3', '.wav', '.flac', '.ogg'))
+def audio_duration(abs_path, rel_path):
+    """Duration in seconds from container headers; MP3 without a Xing header is an estimate."""
+    ext = os.path.splitext(abs_path)[1].lower()
+    if ext == '.wav':
+        with wave.open(abs_path, 'rb') as w:
+            return {'duration': w.getnframes() / w.getframerate(), 'sample_rate': w.getframerate(),
+                    'channels': w.getnchannels()}
+    file_size = os.path.getsize(abs_path)
+    with open(abs_path, 'rb') as f:
+        magic = f.read(4)
+        f.seek(0)
+        if ext == '.flac' and magic == b'fLaC':
+            duration = _flac_duration(f)
+        elif ext == '.ogg' and magic == b'OggS':
+            duration = _ogg_duration(f, file_size)
+        elif ext == '.mp3':
+            duration = _mp3_duration(f, file_size)
+        else:
+            duration = None
+    return {'duration': round(duration, 3)} if duration is not None else {}
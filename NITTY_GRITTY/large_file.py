@@ -0,0 +1,238 @@
+#large_file.py
+import os
+import re
+import mmap
+import time
+import logging
+import threading
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+import numpy as np
+from PyQt6.QtCore import pyqtSignal
+from NITTY_GRITTY.ThreadTrackers import SafeQThread
+
+LARGE_FILE_THRESHOLD = 16 * 1024 * 1024  # bytes; bigger files open in the large-file view
+INDEX_CHUNK_BYTES = 16 * 1024 * 1024  # scanned per newline search
+LINE_STRIDE = 1024  # one checkpoint offset per this many lines
+BLOCK_CACHE_SIZE = 16  # blocks of LINE_STRIDE line starts kept around for painting
+MAX_LINE_BYTES = 4096  # longest prefix of a line that is decoded for display
+SEARCH_WINDOW_BYTES = 16 * 1024 * 1024
+PROGRESS_INTERVAL = 0.1  # seconds between index progress signals
+
+class LiteralPattern:
+    """A plain-text query; bytes.find outruns the regex engine by an order of magnitude."""
+    def __init__(self, needle, case_sensitive):
+        self.case_sensitive = case_sensitive
+        self.needle = needle if case_sensitive else needle.lower()
+
+    def search(self, buffer, pos, end):
+        if self.case_sensitive:
+            index = buffer.find(self.needle, pos, end)
+        else:
+            index = buffer[pos:end].lower().find(self.needle)
+            index = index + pos if index != -1 else -1
+        return None if index == -1 else (index, index + len(self.needle))
+
+class RegexPattern:
+    def __init__(self, source, case_sensitive):
+        flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+        self.regex = re.compile(source, flags)
+
+    def search(self, buffer, pos, end):
+        match = self.regex.search(buffer, pos, end)
+        return match.span() if match else None
+
+def compile_pattern(query, regex=False, case_sensitive=False):
+    """Pattern for searching the mapped buffer. Case folding is ASCII only."""
+    if regex:
+        return RegexPattern(query.encode('utf-8'), case_sensitive)
+    return LiteralPattern(query.encode('utf-8'), case_sensitive)
+
+class MappedFile:
+    """A read-only memory map of a file with a sparse line index.
+
+    Only every LINE_STRIDE-th line start is stored; the starts in between are found by
+    scanning that block of the map when it is painted. Memory stays at a few bytes per
+    thousand lines, and the file contents live in the page cache, not the heap.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.file = open(path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.checkpoints = array('q', [0])  # start offset of line k * LINE_STRIDE
+        self.newlines = 0
+        self.indexed = 0  # bytes scanned by build_index() so far
+        self.complete = self.size == 0
+        self.lock = threading.Lock()
+        self.blocks = OrderedDict()
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.file.close()
+
+    def _release(self, start, end):
+        """Drops scanned pages from this process; they stay in the page cache."""
+        start -= start % mmap.PAGESIZE
+        if hasattr(mmap, 'MADV_DONTNEED') and end > start:
+            self.buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    def build_index(self, is_cancelled=None, progress=None):
+        """Counts lines and records checkpoints, one vectorized newline search per chunk.
+
+        Reads through a fixed buffer rather than the map so the pass does not leave the
+        whole file resident. Returns False if cancelled.
+        """
+        chunk = np.empty(INDEX_CHUNK_BYTES, dtype=np.uint8)
+        pos = 0
+        last_progress = time.perf_counter()
+        with open(self.path, 'rb') as file:
+            while True:
+                if is_cancelled and is_cancelled():
+                    return False
+                n = file.readinto(memoryview(chunk))
+                if not n:
+                    break
+                newlines = np.flatnonzero(chunk[:n] == 10)
+                # Newline number k * LINE_STRIDE - 1 ends the line before checkpoint k
+                first = (LINE_STRIDE - 1 - self.newlines) % LINE_STRIDE
+                starts = newlines[first::LINE_STRIDE] + (pos + 1)
+                pos += n
+                with self.lock:
+                    self.checkpoints.frombytes(starts.astype(np.int64).tobytes())
+                    self.newlines += len(newlines)
+                    self.indexed = pos
+                if progress and time.perf_counter() - last_progress >= PROGRESS_INTERVAL:
+                    last_progress = time.perf_counter()
+                    progress(self.line_count())
+        with self.lock:
+            self.complete = True
+        if progress:
+            progress(self.line_count())
+        return True
+
+    def line_count(self):
+        """Lines known so far; the text after the last newline counts once indexing is done."""
+        with self.lock:
+            return self.newlines + 1 if self.complete else self.newlines
+
+    def _block(self, block):
+        """Start offsets of lines block * LINE_STRIDE up to the next checkpoint."""
+        cached = self.blocks.get(block)
+        if cached is not None:
+            self.blocks.move_to_end(block)
+            return cached
+        with self.lock:
+            start = self.checkpoints[block]
+            final = block + 1 < len(self.checkpoints) or self.complete
+            end = self.checkpoints[block + 1] if block + 1 < len(self.checkpoints) else (
+                self.size if self.complete else self.indexed)
+        starts = [np.array([start], dtype=np.int64)]
+        found = 0
+        pos = start
+        # A block of very long lines is scanned in pieces, never as one huge array
+        while pos < end and found < LINE_STRIDE:
+            count = min(INDEX_CHUNK_BYTES, end - pos)
+            newlines = np.flatnonzero(np.frombuffer(self.buffer, dtype=np.uint8, count=count, offset=pos) == 10)
+            starts.append(newlines[:LINE_STRIDE - found].astype(np.int64) + (pos + 1))
+            found += len(starts[-1])
+            pos += count
+        starts = np.concatenate(starts)[:LINE_STRIDE]
+        if final:
+            self.blocks[block] = starts
+            if len(self.blocks) > BLOCK_CACHE_SIZE:
+                self.blocks.popitem(last=False)
+        return starts
+
+    def line_start(self, line):
+        block, row = divmod(line, LINE_STRIDE)
+        return int(self._block(block)[row])
+
+    def line_span(self, line):
+        """(start, end) byte offsets of `line` without its line break."""
+        start = self.line_start(line)
+        if line + 1 < self.line_count():
+            end = self.line_start(line + 1) - 1
+        else:
+            end = self.size
+        return start, end
+
+    def line_text(self, line, max_bytes=MAX_LINE_BYTES):
+        start, end = self.line_span(line)
+        text = self.buffer[start:min(end, start + max_bytes)].decode('utf-8', errors='replace')
+        return text[:-1] if text.endswith('\r') else text
+
+    def line_of_offset(self, offset):
+        """Line containing byte `offset`, or None if indexing has not got that far yet."""
+        with self.lock:
+            if offset >= self.indexed and not self.complete:
+                return None
+            block = bisect_right(self.checkpoints, offset) - 1
+        starts = self._block(block)
+        return block * LINE_STRIDE + int(np.searchsorted(starts, offset, side='right')) - 1
+
+    def find(self, pattern, start=0, stop=None, is_cancelled=None):
+        """(start, end) of the first match of `pattern` in bytes [start, stop), or None.
+
+        The buffer is searched in windows cut at line breaks, so matches cannot span lines.
+        """
+        stop = self.size if stop is None else stop
+        pos = start
+        while pos < stop:
+            if is_cancelled and is_cancelled():
+                return None
+            end = self.buffer.find(b'\n', min(pos + SEARCH_WINDOW_BYTES, stop))
+            end = self.size if end == -1 else end + 1
+            span = pattern.search(self.buffer, pos, end)
+            self._release(pos, end)
+            if span:
+                return span
+            pos = end
+        return None
+
+class LineIndexThread(SafeQThread):
+    progress = pyqtSignal(int)  # lines indexed so far
+    indexed = pyqtSignal()
+
+    def __init__(self, mapped_file):
+        super().__init__()
+        self.mapped_file = mapped_file
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            done = self.mapped_file.build_index(lambda: self._cancelled, self.progress.emit)
+        except Exception as e:
+            logging.error(f"Error indexing lines of {self.mapped_file.path}: {e}")
+            return
+        if done:
+            self.indexed.emit()
+
+class MappedSearchThread(SafeQThread):
+    found = pyqtSignal(int, int, int)  # generation, start, end; start is -1 if nothing matched
+
+    def __init__(self, mapped_file, pattern, start, generation):
+        super().__init__()
+        self.mapped_file = mapped_file
+        self.pattern = pattern
+        self.start_offset = start
+        self.generation = generation
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        is_cancelled = lambda: self._cancelled
+        # Wrap around to the top once the end of the file is reached
+        span = self.mapped_file.find(self.pattern, self.start_offset, is_cancelled=is_cancelled)
+        if span is None and self.start_offset and not self._cancelled:
+            span = self.mapped_file.find(self.pattern, 0, self.start_offset, is_cancelled)
+        if not self._cancelled:
+            start, end = span or (-1, -1)
+            self.found.emit(self.generation, start, end)
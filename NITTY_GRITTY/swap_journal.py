@@ -0,0 +1,247 @@
+#swap_journal.py
+import os
+import json
+import zlib
+import queue
+import base64
+import hashlib
+import logging
+import numpy as np
+from PyQt6.QtCore import QObject, QTimer, QCoreApplication
+from NITTY_GRITTY.ThreadTrackers import SafeQThread
+from NITTY_GRITTY.file_saver import atomic_write
+
+JOURNAL_VERSION = 1
+JOURNAL_FLUSH_MS = 1000  # edits are handed to the writer thread at most this often
+JOURNAL_COMPACT_RECORDS = 5000  # records before the journal restarts from a fresh snapshot
+MAX_INLINE_DIFF = 1024 * 1024  # bytes; a bigger difference from the saved file is snapshotted
+# Positions are in the editor's own units: QScintilla counts UTF-8 bytes, QTextDocument UTF-16 units
+UNITS = {'utf8': ('utf-8', 1), 'utf16': ('utf-16-le', 2)}
+# Scintilla's SCN_MODIFIED modification types
+SC_MOD_INSERTTEXT = 0x1
+SC_MOD_DELETETEXT = 0x2
+
+def journal_file(swap_dir, file_path):
+    key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+    return os.path.join(swap_dir, f"{key}.journal")
+
+def _disk_base(file_path, unit):
+    """(sha256 of the file's bytes, the file as the editor's buffer would hold it)."""
+    with open(file_path, 'rb') as file:
+        raw = file.read()
+    codec, _ = UNITS[unit]
+    return hashlib.sha256(raw).hexdigest(), raw.decode('utf-8-sig', errors='replace').encode(codec)
+
+def _common_affixes(a, b):
+    """Lengths of the common prefix and (non-overlapping) common suffix of two byte strings."""
+    shortest = min(len(a), len(b))
+    left = np.frombuffer(a, dtype=np.uint8)
+    right = np.frombuffer(b, dtype=np.uint8)
+    mismatch = np.flatnonzero(left[:shortest] != right[:shortest])
+    prefix = int(mismatch[0]) if len(mismatch) else shortest
+    rest = shortest - prefix
+    mismatch = np.flatnonzero(left[len(a) - rest:][::-1] != right[len(b) - rest:][::-1])
+    suffix = int(mismatch[0]) if len(mismatch) else rest
+    return prefix, suffix
+
+class JournalWriter(SafeQThread):
+    """The only thread that touches journal files; the GUI side just queues commands."""
+
+    def __init__(self):
+        super().__init__()
+        self.commands = queue.Queue()
+
+    def run(self):
+        while True:
+            command = self.commands.get()
+            if command is None:
+                return
+            action, path, *args = command
+            try:
+                getattr(self, action)(path, *args)
+            except Exception as e:
+                logging.error(f"Swap journal {action} failed for {path}: {e}")
+
+    def start_journal(self, path, file_path, unit, text):
+        """Writes a header that lets the buffer be rebuilt: a reference to the saved file
+        plus one record when the buffer is close to it, else a compressed snapshot."""
+        codec, width = UNITS[unit]
+        data = text.encode(codec)
+        header = {'version': JOURNAL_VERSION, 'file': file_path, 'unit': unit}
+        records = []
+        try:
+            disk_hash, base = _disk_base(file_path, unit)
+        except OSError:
+            disk_hash = base = None
+        if base is not None:
+            prefix, suffix = _common_affixes(base, data)
+            prefix -= prefix % width  # keep whole code units
+            suffix -= suffix % width
+            if len(data) - prefix - suffix <= MAX_INLINE_DIFF:
+                header['base_hash'] = disk_hash
+                if base != data:
+                    inserted = data[prefix:len(data) - suffix].decode(codec)
+                    records.append([prefix // width, (len(base) - prefix - suffix) // width, inserted])
+        if 'base_hash' not in header:
+            header['snapshot'] = base64.b64encode(zlib.compress(data, 1)).decode('ascii')
+        lines = [json.dumps(header)] + [json.dumps(record) for record in records]
+        atomic_write(path, ('\n'.join(lines) + '\n').encode('utf-8'))
+
+    def append(self, path, records):
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write(''.join(json.dumps(record) + '\n' for record in records))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def discard(self, path):
+        if os.path.exists(path):
+            os.remove(path)
+
+def replay_journal(path):
+    """(file path, recovered text) from a journal, or None if it cannot be replayed."""
+    with open(path, 'r', encoding='utf-8') as file:
+        lines = file.read().split('\n')
+    header = json.loads(lines[0])
+    if header.get('version') != JOURNAL_VERSION:
+        return None
+    codec, width = UNITS[header['unit']]
+    if 'snapshot' in header:
+        buffer = bytearray(zlib.decompress(base64.b64decode(header['snapshot'])))
+    else:
+        try:
+            disk_hash, base = _disk_base(header['file'], header['unit'])
+        except OSError:
+            return None
+        if disk_hash != header['base_hash']:
+            return None  # the file changed on disk since; the edits no longer apply
+        buffer = bytearray(base)
+    for line in lines[1:]:
+        try:
+            position, removed, inserted = json.loads(line)
+        except ValueError:
+            break  # a record torn by the crash, or the trailing newline
+        start = position * width
+        buffer[start:start + removed * width] = inserted.encode(codec)
+    return header['file'], buffer.decode(codec, errors='replace')
+
+class SwapJournal(QObject):
+    """Append-only recovery journals for modified buffers.
+
+    begin() snapshots a buffer once when it first becomes modified; after that only
+    (position, removed, inserted) records are appended, coalesced while typing and
+    flushed every JOURNAL_FLUSH_MS by a background thread. end() drops the journal once
+    the buffer is saved or discarded. Journals left behind by a crash are replayed by
+    recover().
+    """
+
+    def __init__(self, swap_dir, parent=None):
+        super().__init__(parent)
+        self.swap_dir = swap_dir
+        os.makedirs(swap_dir, exist_ok=True)
+        self.buffers = {}  # file_path -> {'unit', 'get_text', 'pending' records, 'count', 'end' of last insert}
+        self.writer = JournalWriter()
+        self.writer.start()
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(JOURNAL_FLUSH_MS)
+        self.flush_timer.timeout.connect(self.flush)
+        self.flush_timer.start()
+        app = QCoreApplication.instance()
+        if app:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def is_journaling(self, file_path):
+        return file_path in self.buffers
+
+    def begin(self, file_path, unit, get_text):
+        """Starts journaling `file_path`; `get_text` returns the buffer's current text,
+        edits already in it included."""
+        self.buffers[file_path] = {'unit': unit, 'get_text': get_text, 'pending': [], 'count': 0, 'end': None}
+        self.writer.commands.put(('start_journal', journal_file(self.swap_dir, file_path), file_path, unit,
+                                  get_text()))
+
+    def record(self, file_path, position, removed, inserted):
+        """Queues one edit: `removed` units at `position` replaced by the string `inserted`."""
+        state = self.buffers.get(file_path)
+        if state is None:
+            return
+        pending = state['pending']
+        codec, width = UNITS[state['unit']]
+        size = len(inserted.encode(codec)) // width
+        # Typing forward just extends the previous record
+        if pending and removed == 0 and position == state['end']:
+            pending[-1][2] += inserted
+            state['end'] += size
+            return
+        state['end'] = position + size
+        pending.append([position, removed, inserted])
+        state['count'] += 1
+        if state['count'] >= JOURNAL_COMPACT_RECORDS:
+            self.compact(file_path)
+
+    def compact(self, file_path):
+        """Restarts the journal from the buffer as it is now, dropping the records behind it."""
+        state = self.buffers[file_path]
+        self.begin(file_path, state['unit'], state['get_text'])
+
+    def flush(self):
+        for file_path, state in self.buffers.items():
+            if state['pending']:
+                self.writer.commands.put(('append', journal_file(self.swap_dir, file_path), state['pending']))
+                state['pending'] = []
+
+    def end(self, file_path):
+        """The buffer was saved or discarded; its journal is no longer needed."""
+        self.buffers.pop(file_path, None)
+        self.writer.commands.put(('discard', journal_file(self.swap_dir, file_path)))
+
+    def recover(self, file_path):
+        """Text of `file_path` as a crashed session left it, or None if there is nothing to
+        recover. A journal that cannot be replayed or matches the file is dropped."""
+        path = journal_file(self.swap_dir, file_path)
+        if file_path in self.buffers or not os.path.exists(path):
+            return None
+        try:
+            recovered = replay_journal(path)
+        except Exception as e:
+            logging.error(f"Could not replay swap journal {path}: {e}")
+            recovered = None
+        try:
+            if recovered is not None:
+                with open(file_path, 'r', encoding='utf-8-sig', errors='replace', newline='') as file:
+                    if file.read() == recovered[1]:
+                        recovered = None
+        except OSError:
+            pass
+        if recovered is None:
+            self.end(file_path)  # stale or unusable
+            return None
+        return recovered[1]
+
+    def shutdown(self):
+        self.flush()
+        self.writer.commands.put(None)
+        self.writer.wait()
+
+def journal_scintilla_edit(journal, editor, path, position, modification_type, text, length):
+    """Records one SCN_MODIFIED notification of a QScintilla editor; positions are UTF-8 bytes."""
+    if not modification_type & (SC_MOD_INSERTTEXT | SC_MOD_DELETETEXT):
+        return
+    if not journal.is_journaling(path):
+        if os.path.isfile(path):  # an untitled buffer could never be reopened to recover it
+            journal.begin(path, 'utf8', editor.text)  # the snapshot already holds this edit
+    elif modification_type & SC_MOD_INSERTTEXT:
+        # SCN_MODIFIED carries the inserted bytes; editor.bytes() would add a trailing NUL
+        data = text if text is not None else editor.bytes(position, position + length)
+        journal.record(path, position, 0, bytes(data)[:length].decode('utf-8', errors='replace'))
+    else:
+        journal.record(path, position, length, '')
+
+_swap_journal = None
+
+def get_swap_journal(app_data_dir=None):
+    """The application-wide SwapJournal, keeping its journals in `<app_data_dir>/swap`."""
+    global _swap_journal
+    if _swap_journal is None:
+        app_data_dir = app_data_dir or os.path.join(os.path.expanduser("~"), ".computinator_code")
+        _swap_journal = SwapJournal(os.path.join(app_data_dir, 'swap'))
+    return _swap_journal
@@ -3,21 +3,187 @@
 from PyQt6.QtCore import QThreadPool, pyqtSignal, QObject
 from NITTY_GRITTY.ThreadTrackers import SafeQRunnable
 import difflib
+import logging
+import ast
+import re
 
 class WorkerSignals(QObject):
     result = pyqtSignal(object)
 
+class LineComparison:
+    """Per-line status of a document against another file's lines, kept between runs.
+
+    compare() re-diffs only the lines between the nearest unchanged lines that matched
+    last time, so an edit costs a diff of its neighbourhood rather than the document.
+    """
+    def __init__(self):
+        self.lines = []
+        self.other_lines = []
+        self.statuses = []  # per line: None, 'indentation', 'different' or 'no_match'
+        self.matches = []  # per line: index of the identical line in other_lines, or None
+
+    def compare(self, text, other_lines):
+        """[(line, status)] for every line that differs from `other_lines`."""
+        lines = text.splitlines()
+        if other_lines != self.other_lines:
+            self.lines, self.other_lines = [], list(other_lines)
+            self.statuses, self.matches = [], []
+        if lines != self.lines:
+            self._update(lines)
+        return [(i, status) for i, status in enumerate(self.statuses) if status]
+
+    def _update(self, lines):
+        old = self.lines
+        shortest = min(len(old), len(lines))
+        prefix = 0
+        while prefix < shortest and old[prefix] == lines[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < shortest - prefix and old[-1 - suffix] == lines[-1 - suffix]:
+            suffix += 1
+        # Widen the changed range out to lines that matched exactly, the anchors of the re-diff
+        low = prefix - 1
+        while low >= 0 and self.matches[low] is None:
+            low -= 1
+        high = len(old) - suffix
+        while high < len(old) and self.matches[high] is None:
+            high += 1
+        other_low = self.matches[low] + 1 if low >= 0 else 0
+        other_high = self.matches[high] if high < len(old) else len(self.other_lines)
+        delta = len(lines) - len(old)
+        statuses, matches = self._diff(lines[low + 1:high + delta], other_low, other_high)
+        self.statuses[low + 1:high] = statuses
+        self.matches[low + 1:high] = matches
+        self.lines = lines
+
+    def _diff(self, lines, other_low, other_high):
+        other = self.other_lines[other_low:other_high]
+        statuses = ['no_match'] * len(lines)
+        matches = [None] * len(lines)
+        matcher = difflib.SequenceMatcher(None, lines, other, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                for offset in range(i2 - i1):
+                    statuses[i1 + offset] = None
+                    matches[i1 + offset] = other_low + j1 + offset
+            elif tag == 'replace':
+                for offset in range(min(i2 - i1, j2 - j1)):
+                    same = lines[i1 + offset].strip() == other[j1 + offset].strip()
+                    statuses[i1 + offset] = 'indentation' if same else 'different'
+        return statuses, matches
+
 class LineComparisonWorker(SafeQRunnable):
-    def __init__(self, text1, text2):
+    def __init__(self, comparison, text, other_lines, generation):
+        super().__init__(target=self.run)
+        self.comparison = comparison
+        self.text = text
+        self.other_lines = other_lines
+        self.generation = generation
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.comparison.compare(self.text, self.other_lines)
+        except Exception as e:
+            logging.error(f"Line comparison failed: {e}")
+            result = []
+        self.signals.result.emit((self.generation, result))
+
+class LineComparisonService(QObject):
+    """Runs one LineComparisonWorker at a time for an editor.
+
+    Requests made while a worker runs collapse into the newest one, and a result is
+    only delivered if no newer request has come in since its worker started.
+    """
+    result = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.comparison = LineComparison()
+        self.generation = 0
+        self.running = False
+        self.pending = None
+
+    def request(self, text, other_lines):
+        self.generation += 1
+        self.pending = (text, list(other_lines), self.generation)
+        if not self.running:
+            self._start_pending()
+
+    def _start_pending(self):
+        text, other_lines, generation = self.pending
+        self.pending = None
+        self.running = True
+        worker = LineComparisonWorker(self.comparison, text, other_lines, generation)
+        worker.signals.result.connect(self._on_result)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_result(self, payload):
+        self.running = False
+        generation, result = payload
+        if self.pending:
+            self._start_pending()  # superseded; only the newest request is worth finishing
+        elif generation == self.generation:
+            self.result.emit(result)
+
+DEFINITION_PATTERN = re.compile(r'^([ \t]*)(async\s+def|def|class)\s+(\w+)', re.MULTILINE)
+BOUNDARY_PATTERN = re.compile(r'^\s*(async\s+def|def|class)\b|\'\'\'|"""')
+
+def _outline_node(kind, name, line, lines):
+    return {'kind': kind, 'name': name, 'line': line, 'text': lines[line - 1].strip(), 'children': []}
+
+def _ast_outline(body, lines):
+    nodes = []
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            kind = 'class' if isinstance(node, ast.ClassDef) else 'def'
+            outline_node = _outline_node(kind, node.name, node.lineno, lines)
+            outline_node['children'] = _ast_outline(node.body, lines)
+            nodes.append(outline_node)
+        elif isinstance(node, (ast.If, ast.Try, ast.With, ast.AsyncWith)):
+            # Definitions under `if TYPE_CHECKING:`, try/except imports and the like
+            for child in ('body', 'orelse', 'finalbody'):
+                nodes.extend(_ast_outline(getattr(node, child, []), lines))
+            for handler in getattr(node, 'handlers', []):
+                nodes.extend(_ast_outline(handler.body, lines))
+    return nodes
+
+def _indent_outline(text, lines):
+    """Tolerant fallback for code that does not parse: nests def/class lines by indentation."""
+    roots = []
+    stack = []  # (indent, node)
+    line, pos = 1, 0
+    for match in DEFINITION_PATTERN.finditer(text):
+        indent = len(match.group(1).expandtabs())
+        line += text.count('\n', pos, match.start())
+        pos = match.start()
+        kind = 'class' if match.group(2) == 'class' else 'def'
+        node = _outline_node(kind, match.group(3), line, lines)
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        (stack[-1][1]['children'] if stack else roots).append(node)
+        stack.append((indent, node))
+    return roots
+
+def parse_outline(text):
+    """Nested [{'kind', 'name', 'line', 'text', 'children'}] of the classes and functions in `text`."""
+    lines = text.split('\n')
+    try:
+        return _ast_outline(ast.parse(text).body, lines)
+    except (SyntaxError, ValueError):
+        return _indent_outline(text, lines)
+
+def boundary_lines(text):
+    """1-based numbers of the lines where an edit can change the outline: definition
+    headers and lines with triple quotes, which can turn code into a string."""
+    return {number for number, line in enumerate(text.split('\n'), 1) if BOUNDARY_PATTERN.search(line)}
+
+class OutlineWorker(SafeQRunnable):
+    def __init__(self, text, generation):
         super().__init__(target=self.run)
-        self.text1 = text1
-        self.text2 = text2
+        self.text = text
+        self.generation = generation
         self.signals = WorkerSignals()
 
     def run(self):
-        # Ensure both inputs are lists of strings
-        lines1 = self.text1.splitlines() if isinstance(self.text1, str) else self.text1
-        lines2 = self.text2 if isinstance(self.text2, list) else self.text2.splitlines()
-        
-        diff = list(difflib.ndiff(lines1, lines2))
-        self.signals.result.emit(diff)
\ No newline at end of file
+        self.signals.result.emit((self.generation, parse_outline(self.text), boundary_lines(self.text)))
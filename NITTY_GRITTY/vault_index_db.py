@@ -0,0 +1,606 @@
+#vault_index_db.py
+import os
+import json
+import logging
+from collections import defaultdict
+import numpy as np
+from sqlalchemy import (create_engine, event, Column, Integer, String, Float, Text, LargeBinary, Boolean, Index, insert,
+                        update, delete, select, func, case, literal_column, or_)
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+INDEX_DB_NAME = '.vault_index.db'
+# The index is a cache of the filesystem: on a schema change it is dropped and rebuilt
+SCHEMA_VERSION = 2
+# Keep IN (...) lists under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+# Trigram segments of one level are merged into the next once there are this many
+SEGMENT_MERGE_FACTOR = 8
+
+IndexBase = declarative_base()
+
+class VaultFile(IndexBase):
+    __tablename__ = 'files'
+
+    path = Column(String, primary_key=True)
+    dir = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    mtime = Column(Float, nullable=False)
+    size = Column(Integer, nullable=False)
+    type = Column(String, nullable=False)
+
+    __table_args__ = (
+        Index('ix_files_dir', 'dir'),
+        Index('ix_files_name', 'name'),
+        Index('ix_files_type', 'type'),
+        Index('ix_files_mtime', 'mtime'),
+        Index('ix_files_size', 'size'),
+    )
+
+class VaultDir(IndexBase):
+    __tablename__ = 'dirs'
+
+    path = Column(String, primary_key=True)
+    mtime = Column(Float)  # NULL means "rescan next time"
+    subdirs = Column(Text, nullable=False, default='[]')
+
+class FileHash(IndexBase):
+    """Content hashes for duplicate detection; a row is only valid while size/mtime
+    still match the file's entry, so rescans never need to clear it explicitly."""
+    __tablename__ = 'file_hashes'
+
+    path = Column(String, primary_key=True)
+    size = Column(Integer, nullable=False)
+    mtime = Column(Float, nullable=False)
+    partial_hash = Column(String)
+    full_hash = Column(String)
+
+    __table_args__ = (Index('ix_file_hashes_full', 'full_hash'),)
+
+class FileMetadata(IndexBase):
+    """Output of the per-type extractors; valid while size/mtime match the file's entry."""
+    __tablename__ = 'file_metadata'
+
+    path = Column(String, primary_key=True)
+    size = Column(Integer, nullable=False)
+    mtime = Column(Float, nullable=False)
+    data = Column(Text, nullable=False, default='{}')  # JSON: headings, dimensions, duration...
+
+class FileLink(IndexBase):
+    __tablename__ = 'file_links'
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    target = Column(String, nullable=False)  # vault-relative path, or a [[wikilink]] name
+
+    __table_args__ = (Index('ix_file_links_source', 'source'), Index('ix_file_links_target', 'target'))
+
+class FileSymbol(IndexBase):
+    __tablename__ = 'file_symbols'
+
+    id = Column(Integer, primary_key=True)
+    path = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    kind = Column(String, nullable=False)
+    line = Column(Integer, nullable=False)
+
+    __table_args__ = (Index('ix_file_symbols_path', 'path'), Index('ix_file_symbols_name', 'name'))
+
+class TrigramDoc(IndexBase):
+    """A text file in the full-text index. Ids are never reused: a changed file gets a new
+    id, which turns its old postings into dead ids that lookups and merges skip."""
+    __tablename__ = 'trigram_docs'
+
+    id = Column(Integer, primary_key=True)
+    path = Column(String, nullable=False, unique=True)
+    indexed = Column(Boolean, nullable=False)  # False: too large to index, always verify
+
+    __table_args__ = {'sqlite_autoincrement': True}
+
+class TrigramSegment(IndexBase):
+    """Posting lists, written as append-only segments: each stored batch adds one row per
+    trigram, and segments are merged in tiers (see _merge_segments), so updates never
+    rewrite a long posting list in place."""
+    __tablename__ = 'trigram_postings'
+
+    segment = Column(Integer, primary_key=True)
+    trigram = Column(Integer, primary_key=True)
+    positions = Column(LargeBinary, nullable=False)  # uint32 indexes into the segment's doc_ids
+
+    # Clustered by segment: a new segment is appended at the end of the table and a merged
+    # one is a range delete, while lookups are one key seek per (segment, trigram)
+    __table_args__ = {'sqlite_with_rowid': False}
+
+class TrigramSegmentInfo(IndexBase):
+    __tablename__ = 'trigram_segments'
+
+    id = Column(Integer, primary_key=True)
+    level = Column(Integer, nullable=False)
+    doc_ids = Column(LargeBinary, nullable=False)  # int64 array: position -> TrigramDoc id
+
+    __table_args__ = {'sqlite_autoincrement': True}
+
+class IndexMeta(IndexBase):
+    __tablename__ = 'meta'
+
+    key = Column(String, primary_key=True)
+    value = Column(String)
+
+FILE_COLUMNS = (VaultFile.path, VaultFile.mtime, VaultFile.size, VaultFile.type)
+
+def _row_to_entry(row):
+    return {'path': row.path, 'mtime': row.mtime, 'size': row.size, 'type': row.type}
+
+def _file_row(entry, rel_dir=None):
+    path = entry['path']
+    return {'path': path, 'dir': os.path.dirname(path) if rel_dir is None else rel_dir,
+            'name': os.path.basename(path), 'mtime': entry['mtime'], 'size': entry['size'],
+            'type': entry['type']}
+
+def _like_escape(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+class VaultIndexDB:
+    """SQLite store for one vault's file index, lives next to the vault's config file."""
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.engine = create_engine(f'sqlite:///{self.db_path}', connect_args={'check_same_thread': False})
+        event.listen(self.engine, 'connect', self._configure_connection)
+        self.Session = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        IndexBase.metadata.create_all(self.engine)
+        with self.Session() as db:
+            meta = db.get(IndexMeta, 'schema_version')
+            if meta and meta.value == str(SCHEMA_VERSION):
+                return
+        logging.info(f"Vault index schema is not version {SCHEMA_VERSION}, resetting {self.db_path}")
+        IndexBase.metadata.drop_all(self.engine)
+        IndexBase.metadata.create_all(self.engine)
+        with self.Session() as db:
+            db.merge(IndexMeta(key='schema_version', value=str(SCHEMA_VERSION)))
+            db.commit()
+
+    @staticmethod
+    def _configure_connection(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers (search, explorer) run while the indexer writes
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA cache_size=-65536')  # 64MB; segment merges touch many pages
+        cursor.close()
+
+    def close(self):
+        self.engine.dispose()
+
+    # --- writes ---------------------------------------------------------
+
+    def apply_scan(self, dirs, rescanned, removed):
+        """Replaces the entries of every rescanned/removed directory in one transaction."""
+        with self.Session() as db:
+            stale = set(rescanned) | set(removed)
+            for chunk in _chunks(stale):
+                db.execute(delete(VaultFile).where(VaultFile.dir.in_(chunk)))
+                db.execute(delete(VaultDir).where(VaultDir.path.in_(chunk)))
+
+            rows = [_file_row(entry, rel_dir) for rel_dir, entries in rescanned.items() for entry in entries]
+            if rows:
+                db.execute(insert(VaultFile), rows)
+            dir_rows = [{'path': rel_dir, 'mtime': dirs[rel_dir]['mtime'],
+                         'subdirs': json.dumps(dirs[rel_dir]['subdirs'])} for rel_dir in rescanned]
+            if dir_rows:
+                db.execute(insert(VaultDir), dir_rows)
+            self._bump_generation(db)
+            db.commit()
+
+    def upsert_file(self, entry, rel_dir):
+        with self.Session() as db:
+            db.merge(VaultFile(**_file_row(entry, rel_dir)))
+            self._bump_generation(db)
+            db.commit()
+
+    def apply_file_changes(self, upserts, deletes):
+        """Applies a coalesced batch of single-file changes in one transaction."""
+        with self.Session() as db:
+            changed = 0
+            for chunk in _chunks(deletes):
+                changed += db.execute(delete(VaultFile).where(VaultFile.path.in_(chunk))).rowcount
+            for entry in upserts:
+                db.merge(VaultFile(**_file_row(entry)))
+            if changed or upserts:
+                self._bump_generation(db)
+            db.commit()
+
+    def delete_file(self, rel_path):
+        with self.Session() as db:
+            db.execute(delete(VaultFile).where(VaultFile.path == rel_path))
+            self._bump_generation(db)
+            db.commit()
+
+    def import_files(self, files):
+        """Loads a legacy/nix {'files': [...]} listing. Directory mtimes are left empty so
+        the first incremental run lists every directory once."""
+        with self.Session() as db:
+            db.execute(delete(VaultFile))
+            db.execute(delete(VaultDir))
+            rows = [_file_row(f) for f in files]
+            if rows:
+                db.execute(insert(VaultFile), rows)
+            self._bump_generation(db)
+            db.commit()
+
+    def apply_file_types(self, fingerprint):
+        """Records the index schema in use; when it changed, every directory is marked for
+        relisting so the next incremental scan picks up added or dropped extensions."""
+        with self.Session() as db:
+            meta = db.get(IndexMeta, 'file_types')
+            if meta and meta.value == fingerprint:
+                return False
+            db.execute(update(VaultDir).values(mtime=None))
+            db.merge(IndexMeta(key='file_types', value=fingerprint))
+            db.commit()
+            return True
+
+    def _bump_generation(self, db):
+        meta = db.get(IndexMeta, 'generation')
+        if meta:
+            meta.value = str(int(meta.value) + 1)
+        else:
+            db.add(IndexMeta(key='generation', value='1'))
+
+    # --- reads ----------------------------------------------------------
+
+    def generation(self):
+        with self.Session() as db:
+            meta = db.get(IndexMeta, 'generation')
+            return int(meta.value) if meta else 0
+
+    def get_dirs(self):
+        with self.Session() as db:
+            return {row.path: {'mtime': row.mtime, 'subdirs': json.loads(row.subdirs)}
+                    for row in db.execute(select(VaultDir.path, VaultDir.mtime, VaultDir.subdirs))}
+
+    def count_files(self):
+        with self.Session() as db:
+            return db.scalar(select(func.count()).select_from(VaultFile))
+
+    def file_stats_after(self, after, limit):
+        """Returns [(path, mtime, size)] for up to `limit` indexed files whose paths sort
+        after `after`, in path order."""
+        query = (select(VaultFile.path, VaultFile.mtime, VaultFile.size)
+                 .where(VaultFile.path > after).order_by(VaultFile.path).limit(limit))
+        with self.Session() as db:
+            return [tuple(row) for row in db.execute(query)]
+
+    def all_paths(self):
+        with self.Session() as db:
+            return list(db.scalars(select(VaultFile.path).order_by(VaultFile.path)))
+
+    def get_file(self, rel_path):
+        with self.Session() as db:
+            row = db.execute(select(*FILE_COLUMNS).where(VaultFile.path == rel_path)).first()
+            return _row_to_entry(row) if row else None
+
+    def get_files(self, file_type=None, limit=None, offset=0):
+        query = select(*FILE_COLUMNS)
+        if file_type:
+            query = query.where(VaultFile.type == file_type)
+        return self._fetch(query.order_by(VaultFile.path).limit(limit).offset(offset))
+
+    def recently_modified(self, limit=50, file_type=None, since=None):
+        query = select(*FILE_COLUMNS)
+        if file_type:
+            query = query.where(VaultFile.type == file_type)
+        if since is not None:
+            query = query.where(VaultFile.mtime >= since)
+        return self._fetch(query.order_by(VaultFile.mtime.desc()).limit(limit))
+
+    def largest(self, limit=50, min_size=0):
+        query = select(*FILE_COLUMNS).where(VaultFile.size >= min_size)
+        return self._fetch(query.order_by(VaultFile.size.desc()).limit(limit))
+
+    def query(self, name=None, file_type=None, min_size=None, max_size=None, since=None,
+              order='mtime', limit=None):
+        """Filtered file listing. `order` is 'mtime' (newest first), 'size' (largest first),
+        'name', or 'relevance' (exact name, then prefix, then substring; ties newest first).
+
+        Each entry carries a 'rank' (0 = exact name match) used when merging results.
+        """
+        rank = literal_column('2')
+        query = select(*FILE_COLUMNS)
+        if name:
+            pattern = _like_escape(name)
+            query = query.where(VaultFile.name.like(f'%{pattern}%', escape='\\'))
+            rank = case((func.lower(VaultFile.name) == name.lower(), 0),
+                        (VaultFile.name.like(f'{pattern}%', escape='\\'), 1), else_=2)
+        if file_type:
+            query = query.where(VaultFile.type == file_type)
+        if min_size is not None:
+            query = query.where(VaultFile.size >= min_size)
+        if max_size is not None:
+            query = query.where(VaultFile.size <= max_size)
+        if since is not None:
+            query = query.where(VaultFile.mtime >= since)
+
+        ordering = {
+            'mtime': (VaultFile.mtime.desc(),),
+            'size': (VaultFile.size.desc(),),
+            'name': (func.lower(VaultFile.name), VaultFile.path),
+            'relevance': (rank, VaultFile.mtime.desc()),
+        }[order]
+        query = query.add_columns(rank.label('rank')).order_by(*ordering).limit(limit)
+        with self.Session() as db:
+            return [dict(_row_to_entry(row), rank=row.rank) for row in db.execute(query)]
+
+    # --- content hashes ---------------------------------------------------
+
+    def size_counts(self):
+        """Returns {size: number of files} for non-empty files."""
+        query = select(VaultFile.size, func.count()).where(VaultFile.size > 0).group_by(VaultFile.size)
+        with self.Session() as db:
+            return dict(db.execute(query).all())
+
+    def files_with_sizes(self, sizes):
+        entries = []
+        for chunk in _chunks(sizes):
+            entries.extend(self._fetch(select(*FILE_COLUMNS).where(VaultFile.size.in_(chunk))))
+        return entries
+
+    def get_hashes(self, paths):
+        """Returns {path: hash row} for hashes still valid for the file's current size/mtime."""
+        hashes = {}
+        with self.Session() as db:
+            for chunk in _chunks(paths):
+                query = (select(FileHash.path, FileHash.partial_hash, FileHash.full_hash)
+                         .join(VaultFile, VaultFile.path == FileHash.path)
+                         .where(FileHash.path.in_(chunk), FileHash.size == VaultFile.size,
+                                FileHash.mtime == VaultFile.mtime))
+                for row in db.execute(query):
+                    hashes[row.path] = {'partial_hash': row.partial_hash, 'full_hash': row.full_hash}
+        return hashes
+
+    def store_hashes(self, rows):
+        """rows: dicts with path, size, mtime, partial_hash and optionally full_hash."""
+        with self.Session() as db:
+            for row in rows:
+                db.merge(FileHash(**row))
+            # Drop hashes of files that have left the index
+            db.execute(delete(FileHash).where(FileHash.path.not_in(select(VaultFile.path))))
+            db.commit()
+
+    def hashed_files(self):
+        """Returns [(path, size, full_hash)] for files with a valid full content hash."""
+        query = (select(FileHash.path, FileHash.size, FileHash.full_hash)
+                 .join(VaultFile, VaultFile.path == FileHash.path)
+                 .where(FileHash.full_hash.is_not(None), FileHash.size == VaultFile.size,
+                        FileHash.mtime == VaultFile.mtime))
+        with self.Session() as db:
+            return db.execute(query).all()
+
+    # --- extracted metadata -----------------------------------------------
+
+    def apply_extractors(self, fingerprint):
+        """Drops all extracted metadata when the extractor set or versions changed."""
+        with self.Session() as db:
+            meta = db.get(IndexMeta, 'extractors')
+            if meta and meta.value == fingerprint:
+                return
+            for table in (FileMetadata, FileLink, FileSymbol, TrigramDoc, TrigramSegment, TrigramSegmentInfo):
+                db.execute(delete(table))
+            db.merge(IndexMeta(key='extractors', value=fingerprint))
+            db.commit()
+
+    def pending_metadata(self, extensions, file_types=()):
+        """Entries with one of `extensions` or `file_types` whose metadata is missing or stale."""
+        if not extensions and not file_types:
+            return []
+        lower_name = func.lower(VaultFile.name)
+        query = (select(*FILE_COLUMNS)
+                 .outerjoin(FileMetadata, FileMetadata.path == VaultFile.path)
+                 .where(or_(VaultFile.type.in_(file_types), *(lower_name.like(f'%{ext}') for ext in extensions)))
+                 .where(or_(FileMetadata.path.is_(None), FileMetadata.mtime != VaultFile.mtime,
+                            FileMetadata.size != VaultFile.size)))
+        return self._fetch(query)
+
+    def store_metadata(self, results, postings=None):
+        """results: [(entry, data)] where data may carry 'links', 'symbols' and 'trigrams',
+        which are stored in their own tables for lookup; the rest is kept as JSON.
+        `postings` is the batch's inverted trigram index, as built by extract_batch."""
+        with self.Session() as db:
+            paths = [entry['path'] for entry, _ in results]
+            for chunk in _chunks(paths):
+                db.execute(delete(FileLink).where(FileLink.source.in_(chunk)))
+                db.execute(delete(FileSymbol).where(FileSymbol.path.in_(chunk)))
+            self._drop_trigram_docs(db, paths)
+            links = []
+            symbols = []
+            segment_docs = []
+            for entry, data in results:
+                data = dict(data or {})
+                if 'trigrams' in data:
+                    doc = TrigramDoc(path=entry['path'], indexed=bool(data.pop('trigrams')))
+                    db.add(doc)
+                    if doc.indexed:
+                        segment_docs.append(doc)
+                links.extend({'source': entry['path'], 'target': target} for target in data.pop('links', ()))
+                symbols.extend(dict(symbol, path=entry['path']) for symbol in data.pop('symbols', ()))
+                db.merge(FileMetadata(path=entry['path'], size=entry['size'], mtime=entry['mtime'],
+                                      data=json.dumps(data)))
+            if links:
+                db.execute(insert(FileLink), links)
+            if symbols:
+                db.execute(insert(FileSymbol), symbols)
+            if segment_docs:
+                db.flush()
+                self._write_segment(db, np.array([doc.id for doc in segment_docs], dtype=np.int64),
+                                    postings or [], level=0)
+                self._merge_segments(db)
+            db.commit()
+
+    def prune_metadata(self):
+        """Drops metadata of files that have left the index."""
+        with self.Session() as db:
+            gone = select(VaultFile.path)
+            db.execute(delete(FileMetadata).where(FileMetadata.path.not_in(gone)))
+            db.execute(delete(FileLink).where(FileLink.source.not_in(gone)))
+            db.execute(delete(FileSymbol).where(FileSymbol.path.not_in(gone)))
+            db.execute(delete(TrigramDoc).where(TrigramDoc.path.not_in(gone)))
+            db.commit()
+
+    def _drop_trigram_docs(self, db, paths):
+        for chunk in _chunks(paths):
+            db.execute(delete(TrigramDoc).where(TrigramDoc.path.in_(chunk)))
+
+    @staticmethod
+    def _write_segment(db, doc_ids, postings, level):
+        """Writes one segment: `doc_ids` numbers its documents and `postings` is a list of
+        (trigram, packed positions) sorted by trigram. Uses DB-API executemany with tuples:
+        a batch has tens of thousands of rows and SQLAlchemy's per-row parameter dicts
+        would dominate."""
+        info = TrigramSegmentInfo(level=level, doc_ids=doc_ids.tobytes())
+        db.add(info)
+        db.flush()
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.executemany('INSERT INTO trigram_postings (segment, trigram, positions) VALUES (?, ?, ?)',
+                               ((info.id, trigram, positions) for trigram, positions in postings))
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _segment_docs(db, segment_ids):
+        docs = {}
+        for chunk in _chunks(segment_ids):
+            for segment, doc_ids in db.execute(select(TrigramSegmentInfo.id, TrigramSegmentInfo.doc_ids)
+                                               .where(TrigramSegmentInfo.id.in_(chunk))):
+                docs[segment] = np.frombuffer(doc_ids, dtype=np.int64)
+        return docs
+
+    def _merge_segments(self, db):
+        """Tiered merge: SEGMENT_MERGE_FACTOR segments of one level become one segment of
+        the next, dropping dead doc ids. Each posting is rewritten O(log n) times overall."""
+        level = 0
+        while True:
+            segments = list(db.scalars(select(TrigramSegmentInfo.id).where(TrigramSegmentInfo.level == level)))
+            if len(segments) < SEGMENT_MERGE_FACTOR:
+                return
+            live = np.fromiter(db.scalars(select(TrigramDoc.id).where(TrigramDoc.indexed.is_(True))), dtype=np.int64)
+            segment_docs = self._segment_docs(db, segments)
+            # A doc id lives in exactly one segment, so the merged numbering is the live docs
+            # of each segment laid end to end; `remap` maps (segment base + old position) to
+            # the new position, or -1 for a dead doc
+            base = {}
+            remap = []
+            doc_ids = []
+            offset = 0
+            for segment in segments:
+                docs = segment_docs[segment]
+                alive = np.isin(docs, live)
+                mapping = np.full(len(docs), -1, dtype=np.int64)
+                mapping[alive] = np.arange(offset, offset + int(alive.sum()))
+                base[segment] = sum(len(m) for m in remap)
+                remap.append(mapping)
+                doc_ids.append(docs[alive])
+                offset += int(alive.sum())
+
+            trigrams = []
+            row_bases = []
+            blobs = []
+            for chunk in _chunks(segments):
+                for segment, trigram, positions in db.execute(
+                        select(TrigramSegment.segment, TrigramSegment.trigram, TrigramSegment.positions)
+                        .where(TrigramSegment.segment.in_(chunk))):
+                    trigrams.append(trigram)
+                    row_bases.append(base[segment])
+                    blobs.append(positions)
+                db.execute(delete(TrigramSegment).where(TrigramSegment.segment.in_(chunk)))
+                db.execute(delete(TrigramSegmentInfo).where(TrigramSegmentInfo.id.in_(chunk)))
+            if offset and blobs:
+                lengths = np.fromiter((len(blob) // 4 for blob in blobs), dtype=np.int64, count=len(blobs))
+                positions = np.frombuffer(b''.join(blobs), dtype=np.uint32).astype(np.int64)
+                mapped = np.concatenate(remap)[positions + np.repeat(np.array(row_bases, dtype=np.int64), lengths)]
+                keys = np.repeat(np.array(trigrams, dtype=np.int64), lengths)
+                keep = mapped >= 0
+                mapped = mapped[keep]
+                keys = keys[keep]
+                order = np.lexsort((mapped, keys))
+                mapped = mapped[order].astype(np.uint32)
+                keys, starts = np.unique(keys[order], return_index=True)
+                postings = [(trigram, chunk.tobytes())
+                            for trigram, chunk in zip(keys.tolist(), np.split(mapped, starts[1:]))]
+                self._write_segment(db, np.concatenate(doc_ids), postings, level + 1)
+            level += 1
+
+    def trigram_candidates(self, trigrams):
+        """Paths of indexed text files containing every one of `trigrams`, plus files too
+        large to index (which must always be checked). Posting lists are intersected
+        smallest first, stopping as soon as the intersection is empty."""
+        with self.Session() as db:
+            unindexed = set(db.scalars(select(TrigramDoc.path).where(TrigramDoc.indexed.is_(False))))
+            wanted = set(int(trigram) for trigram in trigrams)
+            if not wanted:
+                return set(db.scalars(select(TrigramDoc.path))), unindexed
+            segment_docs = self._segment_docs(db, list(db.scalars(select(TrigramSegmentInfo.id))))
+            lists = defaultdict(list)
+            for chunk in _chunks(segment_docs):
+                for segment, trigram, positions in db.execute(
+                        select(TrigramSegment.segment, TrigramSegment.trigram, TrigramSegment.positions)
+                        .where(TrigramSegment.segment.in_(chunk), TrigramSegment.trigram.in_(wanted))):
+                    lists[trigram].append(segment_docs[segment][np.frombuffer(positions, dtype=np.uint32)])
+            if len(lists) < len(wanted):
+                return set(), unindexed  # some trigram occurs nowhere
+            doc_ids = None
+            for trigram in sorted(lists, key=lambda t: sum(len(ids) for ids in lists[t])):
+                ids = np.concatenate(lists[trigram])
+                doc_ids = np.unique(ids) if doc_ids is None else np.intersect1d(doc_ids, ids)
+                if not len(doc_ids):
+                    return set(), unindexed
+            # Dead ids (files changed or removed since) simply do not resolve to a path
+            paths = set()
+            for chunk in _chunks(doc_ids.tolist()):
+                paths.update(db.scalars(select(TrigramDoc.path).where(TrigramDoc.id.in_(chunk))))
+            return paths, unindexed
+
+    def get_metadata(self, rel_path):
+        with self.Session() as db:
+            row = db.get(FileMetadata, rel_path)
+            return json.loads(row.data) if row else None
+
+    def get_symbols(self, rel_path):
+        query = (select(FileSymbol.name, FileSymbol.kind, FileSymbol.line)
+                 .where(FileSymbol.path == rel_path).order_by(FileSymbol.line))
+        with self.Session() as db:
+            return [{'name': row.name, 'kind': row.kind, 'line': row.line} for row in db.execute(query)]
+
+    def find_symbols(self, name, kind=None, limit=100):
+        """Symbols whose name starts with `name`, exact matches first."""
+        pattern = _like_escape(name)
+        query = select(FileSymbol.path, FileSymbol.name, FileSymbol.kind, FileSymbol.line).where(
+            FileSymbol.name.like(f'{pattern}%', escape='\\'))
+        if kind:
+            query = query.where(FileSymbol.kind == kind)
+        query = query.order_by(case((FileSymbol.name == name, 0), else_=1), FileSymbol.name).limit(limit)
+        with self.Session() as db:
+            return [{'path': row.path, 'name': row.name, 'kind': row.kind, 'line': row.line}
+                    for row in db.execute(query)]
+
+    def get_links(self, rel_path):
+        with self.Session() as db:
+            return list(db.scalars(select(FileLink.target).where(FileLink.source == rel_path)))
+
+    def get_backlinks(self, rel_path):
+        """Files linking to `rel_path` by path or by [[wikilink]] name."""
+        stem = os.path.splitext(os.path.basename(rel_path))[0]
+        query = select(FileLink.source).where(FileLink.target.in_((rel_path, stem))).distinct()
+        with self.Session() as db:
+            return list(db.scalars(query.order_by(FileLink.source)))
+
+    def _fetch(self, query):
+        with self.Session() as db:
+            return [_row_to_entry(row) for row in db.execute(query)]
@@ -0,0 +1,157 @@
+#vault_indexer.py
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Default index schema: extension -> file type. Vaults can add or drop extensions
+# through the 'index_types' section of their .vault_config.json.
+FILE_TYPES = {
+    **dict.fromkeys(('.md', '.txt', '.rst', '.org'), 'document'),
+    **dict.fromkeys(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.svg'), 'image'),
+    **dict.fromkeys(('.mp3', '.wav', '.flac', '.ogg', '.m4a'), 'audio'),
+    **dict.fromkeys(('.py', '.js', '.jsx', '.ts', '.tsx', '.java', '.kt', '.c', '.h', '.cpp', '.hpp',
+                     '.cs', '.go', '.rs', '.rb', '.php', '.lua', '.sh', '.zig', '.nix', '.ex', '.exs'), 'code'),
+}
+# Directory mtimes this close to the scan start may still change within the same
+# timestamp tick, so they are not trusted on the next run (same idea as git's racy index).
+MTIME_SLACK = 2.0
+PROGRESS_EVERY = 200  # directories
+# Directory listing is I/O bound (and slow on network mounts), so oversubscribe the CPUs
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def extension(name):
+    return os.path.splitext(name)[1].lower()
+
+def is_indexed(name, file_types=FILE_TYPES):
+    return extension(name) in file_types
+
+def file_type(name, file_types=FILE_TYPES):
+    return file_types.get(extension(name), 'document')
+
+def schema_fingerprint(file_types):
+    """Identifies an index schema; a change means every directory must be relisted."""
+    return ','.join(f'{ext}={kind}' for ext, kind in sorted(file_types.items()))
+
+def build_file_types(overrides=None):
+    """Merges a vault's {'.ext': type or None} overrides into the defaults; None drops an extension."""
+    file_types = dict(FILE_TYPES)
+    for ext, kind in (overrides or {}).items():
+        ext = ext.lower() if ext.startswith('.') else f'.{ext.lower()}'
+        if kind:
+            file_types[ext] = kind
+        else:
+            file_types.pop(ext, None)
+    return file_types
+
+def entry_dir(rel_path):
+    return os.path.dirname(rel_path)
+
+class VaultIndexer:
+    """Rescans only the vault directories whose mtime changed since the last run.
+
+    A directory's mtime changes when entries are created, deleted or renamed inside
+    it (which includes editors that save through a temp file + rename). In-place
+    content writes do not touch the directory, so callers that know a file changed
+    should restat it with stat_file(), or scan with force=True to relist everything.
+    """
+    def __init__(self, root, workers=SCAN_WORKERS, file_types=None):
+        self.root = str(root)
+        self.workers = workers
+        self.file_types = file_types or FILE_TYPES
+
+    def is_indexed(self, name):
+        return is_indexed(name, self.file_types)
+
+    def entry(self, rel_path, stat):
+        return {
+            'path': rel_path,
+            'mtime': stat.st_mtime,
+            'size': stat.st_size,
+            'type': file_type(rel_path, self.file_types),
+        }
+
+    def scan(self, known_dirs, progress=None, force=False, is_cancelled=None):
+        """Walks the directory tree, listing only directories that are new or modified
+        (every directory with `force`).
+
+        Returns (dirs, rescanned, removed): the new directory map, {rel_dir: [file entries]}
+        for every listed directory, and the set of directories that no longer exist.
+        `progress`, if given, is called with the number of directories visited so far.
+        Returns None if `is_cancelled` returns True before the walk completes.
+        """
+        started = time.time()
+        previous = {} if force else known_dirs
+        dirs = {}
+        rescanned = {}
+        # Each directory is visited on the pool; its subdirectories are queued as it completes
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='VaultScan') as pool:
+            pending = {pool.submit(self.visit_dir, '', previous.get(''), started)}
+            while pending:
+                if is_cancelled and is_cancelled():
+                    for future in pending:
+                        future.cancel()
+                    return None
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result is None:
+                        continue
+                    rel_dir, info, entries = result
+                    dirs[rel_dir] = info
+                    if entries is not None:
+                        rescanned[rel_dir] = entries
+                    for name in info['subdirs']:
+                        child = os.path.join(rel_dir, name)
+                        pending.add(pool.submit(self.visit_dir, child, previous.get(child), started))
+                    if progress and len(dirs) % PROGRESS_EVERY == 0:
+                        progress(len(dirs))
+
+        removed = set(known_dirs) - set(dirs)
+        return dirs, rescanned, removed
+
+    def visit_dir(self, rel_dir, previous, started):
+        """Returns (rel_dir, dir info, file entries or None if unchanged), or None if it is gone."""
+        try:
+            mtime = os.stat(os.path.join(self.root, rel_dir)).st_mtime
+        except OSError:
+            return None
+        if previous and previous['mtime'] is not None and previous['mtime'] == mtime:
+            return rel_dir, previous, None
+        entries, subdirs = self.scan_dir(rel_dir)
+        return rel_dir, {
+            'mtime': mtime if mtime < started - MTIME_SLACK else None,
+            'subdirs': subdirs,
+        }, entries
+
+    def scan_dir(self, rel_dir):
+        """Lists one directory, returning (file entries, subdirectory names).
+
+        File type checks use the readdir d_type and sizes/mtimes the DirEntry stat
+        cache (free on Windows) instead of a separate Path.stat() per file.
+        """
+        entries = []
+        subdirs = []
+        try:
+            with os.scandir(os.path.join(self.root, rel_dir)) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif self.is_indexed(entry.name):
+                            entries.append(self.entry(os.path.join(rel_dir, entry.name), entry.stat()))
+                    except OSError as e:
+                        logging.debug(f"Skipping {entry.path}: {e}")
+        except OSError as e:
+            logging.warning(f"Could not list {rel_dir or self.root}: {e}")
+        return entries, subdirs
+
+    def stat_file(self, rel_path):
+        """Returns a fresh index entry for one file, or None if it is gone or not indexed."""
+        if not self.is_indexed(rel_path):
+            return None
+        try:
+            stat = os.stat(os.path.join(self.root, rel_path))
+        except OSError:
+            return None
+        return self.entry(rel_path, stat)
@@ -0,0 +1,260 @@
+#vault_watcher.py
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+
+# inotify(7) event bits
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_ATTRIB | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+# Events that add/remove/rename entries; they change a directory's mtime, so the
+# incremental directory scan picks them up. Anything else is an in-place content change.
+STRUCTURAL_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct('iIII')
+
+DEBOUNCE_SECONDS = 0.3   # flush once the vault has been quiet this long...
+MAX_LATENCY_SECONDS = 2.0  # ...but never hold a burst longer than this
+POLL_INTERVAL_SECONDS = 5.0
+# Indexed files restatted per poll for in-place edits; the vault is covered in rotation
+POLL_STAT_BATCH = 2000
+
+class InotifyBackend:
+    """Thin ctypes wrapper over Linux inotify; one watch per vault directory."""
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.wd_to_dir = {}
+        self.dir_to_wd = {}
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith('linux') and ctypes.util.find_library('c') is not None
+
+    def add_watch(self, abs_dir, rel_dir):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(abs_dir), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            return None  # directory vanished between scan and watch
+        self.wd_to_dir[wd] = rel_dir
+        self.dir_to_wd[rel_dir] = wd
+        return wd
+
+    def remove_watch(self, rel_dir):
+        wd = self.dir_to_wd.pop(rel_dir, None)
+        if wd is not None:
+            self.wd_to_dir.pop(wd, None)
+            self.libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout):
+        """Returns [(mask, rel_path)] read within `timeout` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & IN_IGNORED:
+                rel_dir = self.wd_to_dir.pop(wd, None)
+                if rel_dir is not None:
+                    self.dir_to_wd.pop(rel_dir, None)
+                continue
+            rel_dir = self.wd_to_dir.get(wd, '')
+            events.append((mask, os.path.join(rel_dir, name) if name else rel_dir))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class VaultWatcher(QObject):
+    """Streams filesystem changes in a vault into its index.
+
+    Uses inotify where available and falls back to polling: the incremental
+    directory-mtime scan for creates/deletes/renames, plus a stat of a rotating
+    slice of the indexed files for in-place edits. Events are debounced and
+    coalesced so a burst (a git checkout, an unzip) lands as one batched index
+    transaction.
+    """
+    index_updated = pyqtSignal(int)  # new index generation
+
+    def __init__(self, vault, debounce=DEBOUNCE_SECONDS, poll_interval=POLL_INTERVAL_SECONDS):
+        super().__init__()
+        self.vault = vault
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._poll_cursor = ''  # path the next polled slice starts after
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            if self._stop_event.is_set():
+                # Clearing the event would let the old thread run on beside a new one
+                logging.warning(f"Vault watcher for {self.vault.name} is still stopping; not restarted")
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"VaultWatcher-{self.vault.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    def is_polling(self):
+        return self.backend is None
+
+    def _run(self):
+        if InotifyBackend.available():
+            try:
+                self.backend = InotifyBackend()
+                self._sync_watches()
+            except OSError as e:
+                logging.warning(f"inotify unavailable for vault {self.vault.name}, polling instead: {e}")
+                self._close_backend()
+        try:
+            if self.backend:
+                self._run_inotify()
+            # Also reached when inotify gives out mid-run (e.g. watch limit hit)
+            if not self._stop_event.is_set():
+                self._run_polling()
+        except Exception as e:
+            logging.critical(f"Vault watcher for {self.vault.name} stopped:")
+            logging.exception(e)
+        finally:
+            self._close_backend()
+
+    def _run_polling(self):
+        while not self._stop_event.wait(self.poll_interval):
+            self._flush(self._poll_modified(), structural=True)
+
+    def _poll_modified(self):
+        """Files of the next POLL_STAT_BATCH-sized slice of the index whose size or mtime
+        no longer match it. In-place edits leave the directory mtime alone, so the
+        directory scan alone would miss them; a slice keeps each poll's cost bounded."""
+        root = str(self.vault.path)
+        modified = set()
+        rows = self.vault.open_index().file_stats_after(self._poll_cursor, POLL_STAT_BATCH)
+        self._poll_cursor = rows[-1][0] if len(rows) == POLL_STAT_BATCH else ''
+        for rel_path, mtime, size in rows:
+            if self._stop_event.is_set():
+                break
+            try:
+                stat = os.stat(os.path.join(root, rel_path))
+            except OSError:
+                modified.add(rel_path)  # gone; dropped from the index by _flush
+                continue
+            if stat.st_mtime != mtime or stat.st_size != size:
+                modified.add(rel_path)
+        return modified
+
+    def _run_inotify(self):
+        modified = set()
+        structural = False
+        first_event = last_event = None
+        while self.backend and not self._stop_event.is_set():
+            if first_event is None:
+                timeout = 1.0  # idle; wake up periodically to notice stop()
+            else:
+                now = time.monotonic()
+                timeout = max(0.0, min(last_event + self.debounce, first_event + MAX_LATENCY_SECONDS) - now)
+
+            for mask, rel_path in self.backend.read_events(timeout):
+                if mask & IN_Q_OVERFLOW or mask & STRUCTURAL_MASK:
+                    structural = True
+                else:
+                    modified.add(rel_path)
+                last_event = time.monotonic()
+                if first_event is None:
+                    first_event = last_event
+
+            if first_event is None:
+                continue
+            now = time.monotonic()
+            if now - last_event >= self.debounce or now - first_event >= MAX_LATENCY_SECONDS:
+                self._flush(modified, structural)
+                modified = set()
+                structural = False
+                first_event = last_event = None
+
+    def _flush(self, modified, structural):
+        with self.vault.index_lock:
+            changed = self._flush_locked(modified, structural)
+        if changed:
+            # Outside the lock: extraction of a large batch can take a while
+            self.vault.update_metadata(is_cancelled=self._stop_event.is_set)
+
+    def _flush_locked(self, modified, structural):
+        index_db = self.vault.open_index()
+        before = index_db.generation()
+        if structural:
+            self.vault.update_index_python()
+            if self.backend:
+                try:
+                    self._sync_watches()
+                except OSError as e:
+                    logging.warning(f"Falling back to polling for vault {self.vault.name}: {e}")
+                    self._close_backend()
+        if modified:
+            upserts = []
+            deletes = []
+            for rel_path in modified:
+                entry = self.vault.indexer.stat_file(rel_path)
+                if entry:
+                    upserts.append(entry)
+                elif self.vault.indexer.is_indexed(rel_path):
+                    deletes.append(rel_path)
+            index_db.apply_file_changes(upserts, deletes)
+        generation = index_db.generation()
+        if generation != before:
+            self.index_updated.emit(generation)
+            return True
+        return False
+
+    def _sync_watches(self):
+        """Adds watches for new index directories and drops watches for removed ones."""
+        dirs = set(self.vault.open_index().get_dirs())
+        for rel_dir in set(self.backend.dir_to_wd) - dirs:
+            self.backend.remove_watch(rel_dir)
+        for rel_dir in dirs - set(self.backend.dir_to_wd):
+            self.backend.add_watch(os.path.join(str(self.vault.path), rel_dir), rel_dir)
+
+    def _close_backend(self):
+        if self.backend:
+            self.backend.close()
+            self.backend = None
@@ -310,6 +310,10 @@ class MainApplication(QMainWindow):
             self.tab_widget.currentChanged.connect(self.handle_tab_change)
         self.workspace_selector.currentTextChanged.connect(self.on_workspace_changed)
         self.cccore.theme_manager.theme_changed.connect(self.on_theme_changed)
+        self.cccore.vault_manager.index_progress.connect(
+            lambda name, count: self.statusBar().showMessage(f"Indexing {name}: {count} folders scanned"))
+        self.cccore.vault_manager.index_ready.connect(
+            lambda name: self.statusBar().showMessage(f"Vault {name} ready", 3000))
 
     def load_settings(self):
         self.load_layout()